@@ -5,6 +5,7 @@ from typing import Mapping, Optional
 
 from securitm_audit_agent.core.base import BaseCheck, CheckMeta, Status
 from securitm_audit_agent.core.report import AuditResult
+from securitm_audit_agent.platform.accounts import iter_passwd
 from securitm_audit_agent.platform.protocols import AuditContextProtocol
 
 
@@ -86,22 +87,12 @@ class Uid0OnlyRootCheck(BaseCheck):
     )
 
     def check(self, ctx: AuditContextProtocol, params: Mapping[str, object]) -> AuditResult:
-        content = ctx.read_file("/etc/passwd")
-        if content is None:
+        entries = iter_passwd(ctx)
+        if entries is None:
             return self._result(Status.SKIP, "/etc/passwd not readable", None)
 
-        uid0 = []
-        for line in content.splitlines():
-            if not line.strip():
-                continue
-            parts = line.split(":")
-            if len(parts) < 3:
-                continue
-            username = parts[0]
-            uid = parts[2]
-            if uid == "0":
-                # Любые дополнительные UID 0 считаются нарушением.
-                uid0.append(username)
+        # Любые дополнительные UID 0 считаются нарушением.
+        uid0 = [entry.name for entry in entries if entry.uid == "0"]
 
         if uid0 == ["root"]:
             return self._result(Status.OK, "Only root has UID 0", "root")
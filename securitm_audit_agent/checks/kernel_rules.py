@@ -0,0 +1,209 @@
+# Табличный движок правил ядра: sysctl и параметры загрузки из файла данных.
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from securitm_audit_agent.config import load_config
+from securitm_audit_agent.core.base import BaseCheck, CheckMeta, Status
+from securitm_audit_agent.core.report import AuditResult
+from securitm_audit_agent.platform.kernel import KernelSnapshot, take_kernel_snapshot
+from securitm_audit_agent.platform.protocols import AuditContextProtocol
+
+RULE_TYPES = {"sysctl", "sysctl_min", "cmdline", "cmdline_all", "cmdline_any"}
+
+Outcome = Tuple[Status, str, Optional[str]]
+
+
+@dataclass(frozen=True)
+class KernelRule:
+    check_id: str
+    title: str
+    description: str
+    type: str
+    key: Optional[str] = None
+    expected: Optional[str] = None
+    min_value: Optional[int] = None
+    values: Tuple[str, ...] = ()
+    params: Tuple[Tuple[str, str], ...] = ()
+    severity: str = "medium"
+    remediation: Optional[str] = None
+
+    def default_remediation(self) -> str:
+        if self.type == "sysctl":
+            return f"Set {self.key} to {self.expected}"
+        if self.type == "sysctl_min":
+            return f"Set {self.key} to {self.min_value} or higher"
+        if self.type == "cmdline":
+            if self.expected is None:
+                return f"Set {self.key} in kernel cmdline"
+            return f"Set {self.key}={self.expected} in kernel cmdline"
+        if self.type == "cmdline_any":
+            return f"Set {self.key} to one of {', '.join(self.values)} in kernel cmdline"
+        return "Set required kernel cmdline parameters"
+
+
+def _as_text(value: Any, where: str) -> str:
+    # YAML превращает off/no/1 в bool/int; bool не угадываем, а требуем кавычки.
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"{where}: value {value!r} must be a quoted string")
+    return str(value)
+
+
+def parse_kernel_rule(data: Mapping[str, Any]) -> KernelRule:
+    check_id = data.get("check_id")
+    if not isinstance(check_id, str) or not check_id:
+        raise ValueError("Kernel rule without check_id")
+    rule_type = data.get("type")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"{check_id}: unsupported rule type {rule_type!r}")
+
+    key = data.get("key")
+    if rule_type != "cmdline_all" and (not isinstance(key, str) or not key):
+        raise ValueError(f"{check_id}: rule type {rule_type} requires key")
+
+    expected: Optional[str] = None
+    min_value: Optional[int] = None
+    values: Tuple[str, ...] = ()
+    params: Tuple[Tuple[str, str], ...] = ()
+    if rule_type == "sysctl":
+        expected = _as_text(data.get("expected"), check_id)
+    elif rule_type == "sysctl_min":
+        raw_min = data.get("min")
+        if isinstance(raw_min, bool) or not isinstance(raw_min, int):
+            raise ValueError(f"{check_id}: sysctl_min requires integer min")
+        min_value = raw_min
+    elif rule_type == "cmdline":
+        if data.get("expected") is not None:
+            expected = _as_text(data["expected"], check_id)
+    elif rule_type == "cmdline_any":
+        raw_values = data.get("values")
+        if not isinstance(raw_values, list) or not raw_values:
+            raise ValueError(f"{check_id}: cmdline_any requires non-empty values")
+        values = tuple(_as_text(item, check_id) for item in raw_values)
+    else:
+        raw_params = data.get("expected")
+        if not isinstance(raw_params, Mapping) or not raw_params:
+            raise ValueError(f"{check_id}: cmdline_all requires expected mapping")
+        params = tuple((str(name), _as_text(value, check_id)) for name, value in raw_params.items())
+
+    return KernelRule(
+        check_id=check_id,
+        title=str(data.get("title") or check_id),
+        description=str(data.get("description") or ""),
+        type=rule_type,
+        key=key,
+        expected=expected,
+        min_value=min_value,
+        values=values,
+        params=params,
+        severity=str(data.get("severity") or "medium"),
+        remediation=data.get("remediation"),
+    )
+
+
+def load_kernel_rules(path: str | Path) -> List[KernelRule]:
+    # Формат файла (YAML/JSON) определяется так же, как для основного конфига.
+    data = load_config(path)
+    raw_rules = data.get("rules") if isinstance(data, Mapping) else None
+    if not isinstance(raw_rules, list):
+        raise ValueError(f"{path}: expected top-level 'rules' list")
+    return [parse_kernel_rule(item) for item in raw_rules]
+
+
+def evaluate_rule(rule: KernelRule, snapshot: KernelSnapshot) -> Outcome:
+    if rule.type in {"sysctl", "sysctl_min"}:
+        value = snapshot.sysctl.get(rule.key or "")
+        if value is None:
+            return Status.SKIP, f"{rule.key} not readable", None
+        if rule.type == "sysctl":
+            status = Status.OK if value == rule.expected else Status.FAIL
+            return status, f"{rule.key}={value}", value
+        try:
+            current = int(value)
+        except ValueError:
+            return Status.FAIL, f"{rule.key} not an integer", value
+        status = Status.OK if current >= (rule.min_value or 0) else Status.FAIL
+        return status, f"{rule.key}={current}", value
+
+    cmdline = snapshot.cmdline
+    if cmdline is None:
+        return Status.SKIP, "/proc/cmdline not readable", None
+
+    if rule.type == "cmdline_all":
+        missing = [f"{key}={expected}" for key, expected in rule.params if cmdline.params.get(key) != expected]
+        if missing:
+            return Status.FAIL, "Missing kernel params", ", ".join(missing)
+        return Status.OK, "Kernel params configured", None
+
+    if rule.type == "cmdline" and rule.expected is None:
+        if rule.key in cmdline.flags:
+            return Status.OK, f"{rule.key} enabled", None
+        return Status.FAIL, f"{rule.key} not set", None
+
+    value = cmdline.params.get(rule.key or "")
+    if rule.type == "cmdline_any":
+        passed = value in rule.values
+    else:
+        passed = value == rule.expected
+    return (Status.OK if passed else Status.FAIL), f"{rule.key}={value}", value
+
+
+@dataclass
+class KernelRuleEngine:
+    """Оценивает все правила ядра за один снимок /proc.
+
+    Первая проверка из набора снимает снимок и считает результаты для всех правил,
+    остальные забирают готовый результат. Результаты привязаны к прогону
+    (ctx.run_id): новый прогон или повторный запрос того же check_id снимает
+    новый снимок, даже если в прошлом прогоне часть правил не запрашивалась.
+    """
+
+    rules: List[KernelRule]
+    _sysctl_keys: List[str] = field(init=False)
+    _needs_cmdline: bool = field(init=False)
+    _run: Optional[Tuple[int, int]] = field(default=None, init=False)
+    _pending: Dict[str, Outcome] = field(default_factory=dict, init=False)
+    # Асинхронный runner выполняет синхронные проверки из нескольких потоков.
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        keys = [rule.key for rule in self.rules if rule.type in {"sysctl", "sysctl_min"} and rule.key]
+        self._sysctl_keys = list(dict.fromkeys(keys))
+        self._needs_cmdline = any(rule.type.startswith("cmdline") for rule in self.rules)
+
+    def evaluate(self, ctx: AuditContextProtocol) -> Dict[str, Outcome]:
+        snapshot = take_kernel_snapshot(ctx, self._sysctl_keys, with_cmdline=self._needs_cmdline)
+        return {rule.check_id: evaluate_rule(rule, snapshot) for rule in self.rules}
+
+    def outcome(self, ctx: AuditContextProtocol, check_id: str) -> Outcome:
+        with self._lock:
+            # Ключ — номер прогона, а не сам контекст: ссылка на ctx между прогонами не хранится.
+            run = (id(ctx), getattr(ctx, "run_id", 0))
+            if run != self._run or check_id not in self._pending:
+                self._pending = self.evaluate(ctx)
+                self._run = run
+            return self._pending.pop(check_id)
+
+
+class KernelRuleCheck(BaseCheck):
+    def __init__(self, engine: KernelRuleEngine, rule: KernelRule) -> None:
+        self.meta = CheckMeta(
+            check_id=rule.check_id,
+            title=rule.title,
+            description=rule.description,
+            severity=rule.severity,
+            remediation=rule.remediation or rule.default_remediation(),
+        )
+        self._engine = engine
+
+    def check(self, ctx: AuditContextProtocol, params: Mapping[str, Any]) -> AuditResult:
+        status, message, evidence = self._engine.outcome(ctx, self.meta.check_id)
+        return self._result(status, message, evidence)
+
+
+def build_kernel_checks(rules: Iterable[KernelRule]) -> List[KernelRuleCheck]:
+    engine = KernelRuleEngine(list(rules))
+    return [KernelRuleCheck(engine, rule) for rule in engine.rules]
@@ -5,11 +5,20 @@ CLI entrypoint для запуска Linux-аудита.
 Функции файла:
 - Загружает конфиг (YAML/JSON) и нормализует параметры запуска.
 - Собирает реестр проверок: встроенные + плагины (plugins.register(registry)).
-- Формирует план проверок (enabled) и выполняет их через AuditRunner.
-- Сохраняет отчёт (JSON и опционально PDF).
+- Формирует план проверок (enabled) и выполняет их через AuditRunner
+  (или AsyncAuditRunner на цикле событий asyncio при --async).
+- Сохраняет отчёт (JSON и опционально PDF) и, по запросу, только изменения
+  относительно прошлого отчёта (--delta-output, core/diff.py).
+- Офлайн-аудит смонтированных деревьев ФС (--root) и архивов образов (--image),
+  в том числе пакетно в пуле процессов.
 - Опционально интегрируется с SecurITM API:
   - создаёт/обновляет актив хоста (ensure_asset),
-  - создаёт задачи по результатам FAIL.
+  - создаёт задачи по результатам FAIL;
+  либо отправляет отчёт в шлюз синхронизации (securitm.gateway.url).
+- gateway_main: шлюз, принимающий отчёты агентов и синхронизирующий их с SecurITM.
+- reconcile_main: сверка задач SecurITM по каталогу отчётов всего парка.
+- history_main: запросы к локальной истории прогонов (audit.history, SQLite).
+- warehouse_main: загрузка отчётов парка в хранилище результатов и запросы по срезам.
 
 Заметки по семантике статусов:
 - FAIL  = контроль выполнен и НЕ соответствует требованиям → нужна задача.
@@ -19,12 +28,17 @@ CLI entrypoint для запуска Linux-аудита.
 from __future__ import annotations
 
 import argparse
+import asyncio
 import importlib
 import json
 import logging
 import os
+import sqlite3
 import sys
-from datetime import date, timedelta
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import date
 from pathlib import Path
 from typing import Any, Dict, List, Mapping, Optional
 
@@ -33,8 +47,16 @@ import requests
 from securitm_audit_agent import __version__
 from securitm_audit_agent.checks import register_builtin_checks
 from securitm_audit_agent.config import load_config, resolve_config_path
-from securitm_audit_agent.core import AuditRunner, CheckRegistry, Status
-from securitm_audit_agent.platform import AuditContext
+from securitm_audit_agent.core import AsyncAuditRunner, AuditRunner, CheckRegistry, IsolationPolicy, Status
+from securitm_audit_agent.core.diff import ReportDiff, diff_reports
+from securitm_audit_agent.core.report import AuditReport
+from securitm_audit_agent.core.runner import DEFAULT_ASYNC_CONCURRENCY
+from securitm_audit_agent.integrations.payloads import build_asset_fields, build_task_payload
+from securitm_audit_agent.platform import AsyncAuditContext, AuditContext, AuditContextProtocol
+from securitm_audit_agent.platform.archive import ArchiveAuditContext
+from securitm_audit_agent.platform.facts import DEFAULT_DNS_TIMEOUT
+from securitm_audit_agent.platform.governor import ResourceGovernor, apply_process_priority
+from securitm_audit_agent.platform.rootfs import RootfsAuditContext
 
 
 def _get_nested(config: Mapping[str, Any], path: list[str], default: Any) -> Any:
@@ -49,80 +71,6 @@ def _get_nested(config: Mapping[str, Any], path: list[str], default: Any) -> Any
     return current
 
 
-def _render_fields(fields: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
-    """Рендерит поля для импорт-шаблона SecurITM.
-
-    Если значение поля — строка, применяем format_map(values),
-    чтобы поддерживать шаблоны вида "{hostname}" / "{fqdn}" / "{ip}".
-    Остальные типы (числа/булевы/вложенные структуры) оставляем как есть.
-    """
-    rendered: Dict[str, Any] = {}
-    for key, value in fields.items():
-        if isinstance(value, str):
-            rendered[key] = value.format_map(values)
-        else:
-            rendered[key] = value
-    return rendered
-
-
-def _build_task_payload(
-    result,
-    tasks_cfg: Mapping[str, Any],
-    host: Mapping[str, Any],
-    asset_uuid: Optional[str],
-) -> Dict[str, Any]:
-    author_name = tasks_cfg.get("author_name", "audit_agent")
-    desc_template = tasks_cfg.get(
-        "desc_template",
-        "Author: {author}\\nHost: {hostname}\\nCheck: {check_id}\\nStatus: {status}",
-    )
-    name_template = tasks_cfg.get("name_template", "[{status}] {check_id}")
-    desc_max_length = int(tasks_cfg.get("desc_max_length", 5000))
-
-    values = {
-        "author": author_name,
-        "hostname": host.get("hostname") or "",
-        "fqdn": host.get("fqdn") or "",
-        "ip": host.get("ip") or "",
-        "check_id": result.check_id,
-        "status": result.status.value,
-        "message": result.message,
-        "evidence": result.evidence or "",
-        "remediation": result.remediation,
-        "severity": result.severity,
-    }
-
-    name = name_template.format_map(values)
-    desc = desc_template.format_map(values)
-    if len(desc) > desc_max_length:
-        desc = desc[:desc_max_length]
-
-    payload: Dict[str, Any] = {
-        "name": name,
-        "desc": desc,
-        "is_done": 0,
-    }
-
-    author_uuid = tasks_cfg.get("author_uuid") or None
-    responsible_uuid = tasks_cfg.get("responsible_uuid") or None
-    priority = tasks_cfg.get("priority")
-    deadline_days = tasks_cfg.get("deadline_days")
-
-    if author_uuid:
-        payload["author_uuid"] = author_uuid
-    if responsible_uuid:
-        payload["responsible_uuid"] = responsible_uuid
-    if priority is not None:
-        payload["priority"] = int(priority)
-    if deadline_days:
-        deadline = date.today() + timedelta(days=int(deadline_days))
-        payload["deadline_at"] = deadline.strftime("%d.%m.%Y")
-    if asset_uuid:
-        payload["assets"] = [asset_uuid]
-
-    return payload
-
-
 def _load_plugins(registry: CheckRegistry, plugins: Any) -> None:
     if not plugins:
         return
@@ -139,6 +87,143 @@ def _load_plugins(registry: CheckRegistry, plugins: Any) -> None:
         register(registry)
 
 
+def _build_registry(config: Mapping[str, Any]) -> CheckRegistry:
+    registry = CheckRegistry()
+    builtin_enabled = _get_nested(config, ["audit", "checks", "builtin"], True)
+    if builtin_enabled:
+        register_builtin_checks(registry)
+    _load_plugins(registry, _get_nested(config, ["audit", "plugins"], []))
+    return registry
+
+
+def _isolation_policy(config: Mapping[str, Any]) -> Optional[IsolationPolicy]:
+    """Политика выполнения проверок в отдельных процессах из audit.isolation."""
+    isolation_cfg = _get_nested(config, ["audit", "isolation"], {})
+    if not isinstance(isolation_cfg, Mapping) or not isolation_cfg.get("enabled", False):
+        return None
+    defaults = IsolationPolicy()
+    memory_mb = isolation_cfg.get("memory_mb")
+    cpu_seconds = isolation_cfg.get("cpu_seconds")
+    return IsolationPolicy(
+        tags=tuple(isolation_cfg.get("tags") or ()),
+        plugins=tuple(isolation_cfg.get("plugins") or ()),
+        workers=int(isolation_cfg.get("workers", defaults.workers)),
+        max_checks_per_worker=int(isolation_cfg.get("max_checks_per_worker", defaults.max_checks_per_worker)),
+        memory_mb=int(memory_mb) if memory_mb else None,
+        cpu_seconds=int(cpu_seconds) if cpu_seconds else None,
+    )
+
+
+def _governor_config(config: Mapping[str, Any]) -> Mapping[str, Any]:
+    governor_cfg = _get_nested(config, ["audit", "governor"], {})
+    if not isinstance(governor_cfg, Mapping) or not governor_cfg.get("enabled", False):
+        return {}
+    return governor_cfg
+
+
+def _apply_priority(config: Mapping[str, Any]) -> None:
+    # Приоритеты задаются до создания потоков и процессов аудита, чтобы они их унаследовали.
+    governor_cfg = _governor_config(config)
+    if not governor_cfg:
+        return
+    io_level = governor_cfg.get("ionice_level")
+    for warning in apply_process_priority(
+        governor_cfg.get("nice"),
+        governor_cfg.get("ionice_class"),
+        int(io_level) if io_level is not None else None,
+    ):
+        logging.warning("%s", warning)
+
+
+def _build_governor(config: Mapping[str, Any]) -> Optional[ResourceGovernor]:
+    """Ограничитель файловых операций из audit.governor (None, если выключен)."""
+    governor_cfg = _governor_config(config)
+    if not governor_cfg:
+        return None
+
+    def number(key: str) -> Optional[float]:
+        value = governor_cfg.get(key)
+        return float(value) if value is not None else None
+
+    return ResourceGovernor(
+        ops_per_second=number("ops_per_second"),
+        burst=number("burst"),
+        max_load_per_cpu=number("max_load_per_cpu"),
+        max_io_pressure=number("max_io_pressure"),
+        backoff_seconds=float(governor_cfg.get("backoff_seconds", 0.5)),
+        max_backoff_seconds=float(governor_cfg.get("max_backoff_seconds", 30.0)),
+    )
+
+
+def _offline_report_name(target: str) -> str:
+    # Имя файла отчёта из пути целиком: у разных образов часто одинаковый basename (rootfs).
+    name = os.path.abspath(target).strip("/").replace("/", "_")
+    return name or "root"
+
+
+def _offline_context(config: Mapping[str, Any], target: str, image: bool = False):
+    host_values = _get_nested(config, ["audit", "offline", "host_values"], {})
+    if image:
+        return ArchiveAuditContext(target, __version__, host_values)
+    return RootfsAuditContext(target, __version__, host_values)
+
+
+def _audit_offline(config: Mapping[str, Any], target: str, output_dir: str, image: bool = False) -> Dict[str, Any]:
+    """Аудит одного rootfs или образа; выполняется в отдельном процессе пула.
+
+    Реестр проверок собирается заново в каждом процессе: плагины и их кеши
+    не передаются между процессами.
+    """
+    registry = _build_registry(config)
+    ctx = _offline_context(config, target, image)
+    ctx.governor = _build_governor(config)
+    try:
+        report = AuditRunner(registry, _isolation_policy(config)).run(
+            ctx,
+            _get_nested(config, ["audit", "checks", "enabled"], None),
+            _get_nested(config, ["audit", "params"], {}),
+        )
+    finally:
+        if image:
+            ctx.close()
+
+    output_path = Path(output_dir) / f"{_offline_report_name(target)}.json"
+    output_path.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    summary: Dict[str, Any] = {"image" if image else "root": target, "report": str(output_path)}
+    for result in report.results:
+        summary[result.status.value] = summary.get(result.status.value, 0) + 1
+    return summary
+
+
+def _run_offline_batch(
+    config: Mapping[str, Any],
+    targets: List[str],
+    jobs: int,
+    output_dir: str,
+    image: bool = False,
+) -> int:
+    """Параллельный аудит многих rootfs или образов в пуле процессов.
+
+    По одной JSON-строке сводки на каждую цель в stdout. Возвращает число
+    целей, аудит которых не удалось выполнить.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_audit_offline, config, target, output_dir, image): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                summary = future.result()
+            except Exception as exc:
+                # Сбой одного образа не должен останавливать аудит остальных.
+                logging.error("Offline audit failed for %s: %s", target, exc)
+                failed += 1
+                continue
+            print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return failed
+
+
 def _sync_fail_tasks(
     client,
     report,
@@ -156,7 +241,7 @@ def _sync_fail_tasks(
         if result.status != Status.FAIL:
             continue
 
-        payload = _build_task_payload(result, tasks_cfg, host, asset_uuid)
+        payload = build_task_payload(result, tasks_cfg, host, asset_uuid)
         logging.debug("Task sync payload for %s: %s", result.check_id, json.dumps(payload, ensure_ascii=False))
         try:
             _task, created = client.create_task_if_missing(payload)
@@ -193,6 +278,40 @@ def _sync_fail_tasks(
     return unsynced
 
 
+def _close_resolved_tasks(
+    client,
+    results: List[Any],
+    tasks_cfg: Mapping[str, Any],
+    host: Mapping[str, Any],
+    asset_uuid: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Закрывает открытые задачи по прошлым FAIL-результатам проверок, перешедших в OK.
+
+    results — результаты из базового отчёта: задача создавалась по ним, поэтому
+    имя и описание совпадут при любых шаблонах. Возвращает незакрытые задачи.
+    """
+    unsynced: List[Dict[str, Any]] = []
+    for result in results:
+        payload = build_task_payload(result, tasks_cfg, host, asset_uuid)
+        try:
+            task = client.close_open_task(payload)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            logging.error("Failed to close task for %s: %s", result.check_id, exc)
+            unsynced.append(
+                {
+                    "check_id": result.check_id,
+                    "host": dict(host),
+                    "payload": payload,
+                    "action": "close",
+                    "error": str(exc),
+                }
+            )
+            continue
+        if task is not None:
+            logging.info("Closed task for %s", result.check_id)
+    return unsynced
+
+
 def _write_unsynced_tasks(path: str, tasks: List[Dict[str, Any]]) -> None:
     Path(path).write_text(
         json.dumps({"generated_at": date.today().isoformat(), "tasks": tasks}, ensure_ascii=False, indent=2),
@@ -200,24 +319,22 @@ def _write_unsynced_tasks(path: str, tasks: List[Dict[str, Any]]) -> None:
     )
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Linux audit runner (core)")
-    parser.add_argument("-c", "--config", default="configs/audit.yml")
-    parser.add_argument("-o", "--output", default=None)
-    parser.add_argument("--no-api", action="store_true", help="Disable SecurITM API integration")
-    parser.add_argument("--dry-run", action="store_true", help="Print planned checks and exit")
-    parser.add_argument("-v", "--verbose", action="count", default=0)
-    args = parser.parse_args()
+# Последний отчёт, полностью синхронизированный с SecurITM, — база для --delta-sync.
+DEFAULT_DELTA_BASELINE = "securitm-synced-report.json"
+
 
+def _setup_logging(verbose: int) -> None:
     log_level = logging.WARNING
-    if args.verbose == 1:
+    if verbose == 1:
         log_level = logging.INFO
-    elif args.verbose >= 2:
+    elif verbose >= 2:
         log_level = logging.DEBUG
     logging.basicConfig(level=log_level, format="%(levelname)s %(message)s")
 
+
+def _load_cli_config(path: str) -> Dict[str, Any]:
     try:
-        config_path, used_example = resolve_config_path(args.config)
+        config_path, used_example = resolve_config_path(path)
         config = load_config(config_path)
     except (FileNotFoundError, RuntimeError, ValueError) as exc:
         logging.error("%s", exc)
@@ -226,18 +343,271 @@ def main() -> None:
     if used_example:
         logging.warning(
             "Config %s not found; using template %s. Copy the template to %s to customize local settings.",
-            args.config,
+            path,
             config_path,
-            args.config,
+            path,
         )
+    return config
 
-    registry = CheckRegistry()
-    builtin_enabled = _get_nested(config, ["audit", "checks", "builtin"], True)
-    if builtin_enabled:
-        register_builtin_checks(registry)
-    plugins = _get_nested(config, ["audit", "plugins"], [])
+
+def _token_from_env(token_env: Optional[str], setting: str) -> str:
+    if not token_env:
+        logging.error("%s is not set", setting)
+        sys.exit(2)
+    token = os.getenv(token_env)
+    if not token:
+        logging.error("Missing token in environment: %s", token_env)
+        sys.exit(2)
+    return token
+
+
+def _securitm_client(securitm_cfg: Mapping[str, Any]):
+    token = _token_from_env(securitm_cfg.get("token_env"), "securitm.token_env")
+    base_url = securitm_cfg.get("base_url", "").strip()
+    if not base_url:
+        logging.error("securitm.base_url is not set")
+        sys.exit(2)
+
+    from securitm_audit_agent.integrations import SecurITMClient
+
+    return SecurITMClient(base_url=base_url, token=token, verify_ssl=bool(securitm_cfg.get("verify_ssl", True)))
+
+
+def _check_assets_config(assets_cfg: Mapping[str, Any]) -> None:
+    if not assets_cfg.get("asset_type_slug") or not assets_cfg.get("import_template"):
+        logging.error("securitm.assets.asset_type_slug or import_template is missing")
+        sys.exit(2)
+
+    if not isinstance(assets_cfg.get("import_fields", {}), Mapping):
+        logging.error("securitm.assets.import_fields must be a mapping")
+        sys.exit(2)
+
+
+def _task_ledger(tasks_cfg: Mapping[str, Any]):
+    """Журнал задач из securitm.tasks.ledger (None, если путь не задан)."""
+    ledger_cfg = tasks_cfg.get("ledger") or {}
+    if not isinstance(ledger_cfg, Mapping) or not ledger_cfg.get("path"):
+        return None
+    from securitm_audit_agent.integrations.ledger import TaskLedger
+
+    reconcile_hours = float(ledger_cfg.get("reconcile_hours", 168))
+    # Без ttl_hours запись доверяется до сверки: срок короче интервала запусков делает журнал бесполезным.
+    return TaskLedger(
+        str(ledger_cfg["path"]),
+        ttl_seconds=float(ledger_cfg.get("ttl_hours", reconcile_hours)) * 3600,
+        reconcile_seconds=reconcile_hours * 3600,
+    )
+
+
+def _asset_sync(client, assets_cfg: Mapping[str, Any]):
+    """Пакетный импорт активов по securitm.assets.sync (состояние — только при заданном state_path)."""
+    from securitm_audit_agent.integrations.assets import DEFAULT_ASSET_CHUNK_SIZE, AssetBatchSync, AssetSyncState
+
+    sync_cfg = assets_cfg.get("sync") or {}
+    if not isinstance(sync_cfg, Mapping):
+        sync_cfg = {}
+    state = AssetSyncState(str(sync_cfg["state_path"])) if sync_cfg.get("state_path") else None
+    chunk_size = int(sync_cfg.get("chunk_size", DEFAULT_ASSET_CHUNK_SIZE))
+    return AssetBatchSync(client, assets_cfg["import_template"], state=state, chunk_size=chunk_size)
+
+
+def _save_asset_state(asset_sync) -> None:
+    if asset_sync.state is None:
+        return
     try:
-        _load_plugins(registry, plugins)
+        asset_sync.state.save()
+    except OSError as exc:
+        logging.error("Failed to save asset sync state: %s", exc)
+
+
+def _sync_direct(
+    securitm_cfg: Mapping[str, Any],
+    report: AuditReport,
+    delta: Optional[ReportDiff] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Синхронизация отчёта напрямую с SecurITM; возвращает несинхронизированные задачи.
+
+    None — синхронизация не состоялась (актив не получен). С delta задачи
+    создаются только для новых FAIL, а задачи проверок, перешедших из FAIL
+    в OK, закрываются.
+    """
+    client = _securitm_client(securitm_cfg)
+    assets_cfg = securitm_cfg.get("assets", {})
+    _check_assets_config(assets_cfg)
+
+    rendered_fields, asset_name = build_asset_fields(assets_cfg, report.host)
+    if not asset_name:
+        logging.error("Asset name is missing; set securitm.assets.import_name_field")
+        sys.exit(2)
+
+    try:
+        asset = client.ensure_asset(
+            asset_type_slug=assets_cfg["asset_type_slug"],
+            name_field=assets_cfg.get("name_field", "name"),
+            template=assets_cfg["import_template"],
+            import_fields=rendered_fields,
+            asset_name=asset_name,
+        )
+    except (requests.RequestException, RuntimeError, ValueError) as exc:
+        logging.error("Failed to sync asset with SecurITM: %s", exc)
+        return None
+    asset_uuid = asset.get("uuid")
+
+    # ensure_asset не обновляет найденный актив: изменившиеся IP/FQDN отправляются повторным импортом.
+    asset_sync = _asset_sync(client, assets_cfg)
+    if asset_sync.state is not None:
+        asset_sync.sync({asset_name: rendered_fields})
+        _save_asset_state(asset_sync)
+
+    tasks_cfg = securitm_cfg.get("tasks", {})
+    if not tasks_cfg.get("enabled", True):
+        return []
+    client.ledger = _task_ledger(tasks_cfg)
+    if client.ledger is not None and client.ledger.reconcile_due():
+        try:
+            removed = client.ledger.reconcile(client)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            logging.warning("Task ledger reconcile failed: %s", exc)
+        else:
+            logging.info("Task ledger reconciled, %d closed task(s) removed", removed)
+
+    if delta is None:
+        unsynced_tasks = _sync_fail_tasks(client, report, tasks_cfg, report.host, asset_uuid)
+    else:
+        failures = replace(report, results=delta.new_failures())
+        unsynced_tasks = _sync_fail_tasks(client, failures, tasks_cfg, report.host, asset_uuid)
+        unsynced_tasks += _close_resolved_tasks(client, delta.resolved(), tasks_cfg, report.host, asset_uuid)
+    client.log_cache_stats()
+    if client.ledger is not None:
+        logging.debug("Task ledger resolved %d task(s) without API calls", client.ledger.hits)
+        try:
+            client.ledger.save()
+        except OSError as exc:
+            logging.error("Failed to save task ledger: %s", exc)
+    return unsynced_tasks
+
+
+def _sync_via_gateway(
+    gateway_cfg: Mapping[str, Any],
+    report: AuditReport,
+    resolved: Optional[List[Any]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Отправка отчёта в шлюз синхронизации; None, если шлюз отчёт не принял.
+
+    resolved — прошлые FAIL исправленных проверок (--delta-sync): шлюз закрывает их задачи.
+    """
+    from securitm_audit_agent.integrations.gateway import GatewayClient
+
+    token_env = gateway_cfg.get("token_env")
+    token = _token_from_env(token_env, "securitm.gateway.token_env") if token_env else None
+    client = GatewayClient(
+        str(gateway_cfg["url"]),
+        token=token,
+        verify_ssl=bool(gateway_cfg.get("verify_ssl", True)),
+        timeout=int(gateway_cfg.get("timeout", 120)),
+    )
+    try:
+        summary = client.submit_report(report, resolved or [])
+    except (requests.RequestException, ValueError) as exc:
+        logging.error("Failed to send report to SecurITM gateway: %s", exc)
+        return None
+    logging.info(
+        "Gateway synced report: %d task(s) created, %d already open, %d closed",
+        len(summary.get("created", [])),
+        len(summary.get("existing", [])),
+        len(summary.get("closed", [])),
+    )
+    return list(summary.get("unsynced", []))
+
+
+def _record_history(history_cfg: Mapping[str, Any], report: AuditReport) -> None:
+    """Добавляет прогон в историю audit.history и применяет хранение и сжатие."""
+    from securitm_audit_agent.reporting.history import RunHistory
+
+    def days(key: str) -> Optional[float]:
+        value = history_cfg.get(key)
+        return float(value) if value not in (None, "") else None
+
+    try:
+        with RunHistory(str(history_cfg["path"])) as history:
+            history.record(report)
+            history.prune(retain_days=days("retain_days"), compact_after_days=days("compact_after_days"))
+    except (OSError, sqlite3.Error) as exc:
+        logging.error("Failed to record run history: %s", exc)
+    else:
+        logging.info("Run recorded in history %s", history_cfg["path"])
+
+
+def _load_baseline(path: str) -> Optional[AuditReport]:
+    """Прошлый отчёт для сравнения; None, если файла нет или он не читается."""
+    try:
+        return AuditReport.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logging.warning("Baseline report %s is unreadable, comparing against an empty report: %s", path, exc)
+        return None
+
+
+def _write_report(path: str, report: AuditReport) -> None:
+    Path(path).write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _write_delta(path: str, delta: ReportDiff) -> None:
+    # Формат по расширению: .jsonl — строка на изменение, иначе один JSON-документ.
+    if path.endswith(".jsonl"):
+        lines = list(delta.iter_jsonl())
+        Path(path).write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+    else:
+        Path(path).write_text(json.dumps(delta.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Linux audit runner (core)")
+    parser.add_argument("-c", "--config", default="configs/audit.yml")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("--no-api", action="store_true", help="Disable SecurITM API integration")
+    parser.add_argument("--dry-run", action="store_true", help="Print planned checks and exit")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument(
+        "--root",
+        nargs="+",
+        default=None,
+        help="Audit mounted filesystem trees offline (several roots run as a batch)",
+    )
+    offline.add_argument(
+        "--image",
+        nargs="+",
+        default=None,
+        help="Audit image tarballs / OCI layouts without extraction (several images run as a batch)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run checks concurrently on an asyncio event loop",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for batch mode")
+    parser.add_argument("--output-dir", default="audit-reports", help="Report directory for batch mode")
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Previous report for --delta-output (default: the existing JSON report at the output path)",
+    )
+    parser.add_argument("--delta-output", default=None, help="Write only changed results (.json or .jsonl)")
+    parser.add_argument(
+        "--delta-sync",
+        action="store_true",
+        help="Sync SecurITM from the diff: create tasks for new FAILs and close tasks of fixed checks",
+    )
+    args = parser.parse_args()
+
+    _setup_logging(args.verbose)
+    config = _load_cli_config(args.config)
+
+    try:
+        registry = _build_registry(config)
     except (ImportError, AttributeError, RuntimeError, TypeError, ValueError) as exc:
         logging.error("Failed to load plugins: %s", exc)
         sys.exit(2)
@@ -252,18 +622,57 @@ def main() -> None:
             print(f"- {check_id}")
         return
 
-    ctx = AuditContext(agent_version=__version__)
-    runner = AuditRunner(registry)
-    report = runner.run(ctx, enabled_checks, params)
+    _apply_priority(config)
+
+    targets = args.image or args.root
+    if targets and len(targets) > 1:
+        # Пакетный режим: только JSON-отчёты по целям, без PDF и синхронизации с API.
+        failed = _run_offline_batch(config, targets, max(args.jobs, 1), args.output_dir, bool(args.image))
+        if failed:
+            sys.exit(1)
+        return
+
+    dns_timeout = float(_get_nested(config, ["audit", "facts", "dns_timeout"], DEFAULT_DNS_TIMEOUT))
+    ctx: AuditContextProtocol
+    if targets:
+        try:
+            ctx = _offline_context(config, targets[0], bool(args.image))
+        except (OSError, ValueError, tarfile.TarError) as exc:
+            logging.error("%s", exc)
+            sys.exit(2)
+    else:
+        ctx = AuditContext(agent_version=__version__, dns_timeout=dns_timeout)
+    ctx.governor = _build_governor(config)
+    if args.use_async:
+        if _isolation_policy(config) is not None:
+            # AsyncAuditRunner выполняет все проверки в своём процессе: лимиты изоляции не действуют.
+            logging.warning("audit.isolation is ignored with --async; all checks run in this process")
+        concurrency = int(_get_nested(config, ["audit", "async", "concurrency"], DEFAULT_ASYNC_CONCURRENCY))
+        async_runner = AsyncAuditRunner(registry, concurrency)
+        report = asyncio.run(async_runner.run(AsyncAuditContext(ctx), enabled_checks, params))
+    else:
+        report = AuditRunner(registry, _isolation_policy(config)).run(ctx, enabled_checks, params)
 
     output_path = args.output or _get_nested(config, ["audit", "output", "json"], None)
+    delta_output = args.delta_output or _get_nested(config, ["audit", "output", "delta"], None)
+    delta_sync = args.delta_sync or bool(_get_nested(config, ["securitm", "tasks", "delta_only"], False))
+    if delta_output:
+        # Прошлый отчёт читается до перезаписи файла текущим.
+        baseline_path = args.baseline or output_path
+        baseline = _load_baseline(str(baseline_path)) if baseline_path else None
+        delta = diff_reports(baseline, report)
+        logging.info("Report diff: %s", delta.summary())
+        _write_delta(str(delta_output), delta)
+        logging.info("Report delta saved to %s", delta_output)
+
     if output_path:
-        Path(output_path).write_text(
-            json.dumps(report.to_dict(), ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        _write_report(str(output_path), report)
         logging.info("Report saved to %s", output_path)
 
+    history_cfg = _get_nested(config, ["audit", "history"], {})
+    if isinstance(history_cfg, Mapping) and history_cfg.get("path"):
+        _record_history(history_cfg, report)
+
     pdf_output_path = _get_nested(config, ["audit", "output", "pdf"], None)
     pdf_font_path = _get_nested(config, ["audit", "output", "pdf_font_path"], None)
     if pdf_output_path:
@@ -283,77 +692,203 @@ def main() -> None:
     if not securitm_cfg or not securitm_cfg.get("enabled", False):
         return
 
-    token_env = securitm_cfg.get("token_env")
-    if not token_env:
-        logging.error("securitm.token_env is not set")
-        sys.exit(2)
-    token = os.getenv(token_env)
-    if not token:
-        logging.error("Missing token in environment: %s", token_env)
-        sys.exit(2)
+    gateway_cfg = securitm_cfg.get("gateway") or {}
+    sync_delta: Optional[ReportDiff] = None
+    synced_path = str(securitm_cfg.get("tasks", {}).get("delta_baseline") or DEFAULT_DELTA_BASELINE)
+    if delta_sync:
+        # База синхронизации — последний отчёт, полностью синхронизированный с SecurITM, а не прошлый прогон:
+        # FAIL, задачу по которому не удалось создать, останется новым и в следующем прогоне.
+        sync_delta = diff_reports(_load_baseline(synced_path), report)
+    if gateway_cfg.get("url"):
+        # Шлюз создаёт задачи по FAIL из присланного отчёта и закрывает задачи по resolved.
+        if sync_delta is not None:
+            gateway_report = replace(report, results=sync_delta.new_failures())
+            unsynced_tasks = _sync_via_gateway(gateway_cfg, gateway_report, sync_delta.resolved())
+        else:
+            unsynced_tasks = _sync_via_gateway(gateway_cfg, report)
+    else:
+        unsynced_tasks = _sync_direct(securitm_cfg, report, sync_delta)
 
-    base_url = securitm_cfg.get("base_url", "").strip()
-    if not base_url:
-        logging.error("securitm.base_url is not set")
-        sys.exit(2)
+    if sync_delta is not None:
+        if unsynced_tasks == []:
+            _write_report(synced_path, report)
+        else:
+            logging.warning("SecurITM sync incomplete; delta baseline %s is not advanced", synced_path)
+    unsynced_tasks = unsynced_tasks or []
 
-    verify_ssl = bool(securitm_cfg.get("verify_ssl", True))
-    from securitm_audit_agent.integrations import SecurITMClient
+    fallback_output_path = securitm_cfg.get("tasks", {}).get("fallback_output_json")
+    if unsynced_tasks and fallback_output_path:
+        _write_unsynced_tasks(str(fallback_output_path), unsynced_tasks)
+        logging.warning("Unsynced task payloads saved to %s", fallback_output_path)
 
-    client = SecurITMClient(base_url=base_url, token=token, verify_ssl=verify_ssl)
 
-    assets_cfg = securitm_cfg.get("assets", {})
-    asset_type_slug = assets_cfg.get("asset_type_slug")
-    import_template = assets_cfg.get("import_template")
-    name_field = assets_cfg.get("name_field", "name")
-    import_name_field = assets_cfg.get("import_name_field")
-    import_fields = assets_cfg.get("import_fields", {})
+def gateway_main() -> None:
+    """Шлюз синхронизации с SecurITM для парка агентов (securitm-gateway)."""
+    parser = argparse.ArgumentParser(description="SecurITM sync gateway for audit agents")
+    parser.add_argument("-c", "--config", default="configs/audit.yml")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    args = parser.parse_args()
 
-    if not asset_type_slug or not import_template:
-        logging.error("securitm.assets.asset_type_slug or import_template is missing")
+    _setup_logging(args.verbose)
+    config = _load_cli_config(args.config)
+    securitm_cfg = _get_nested(config, ["securitm"], {})
+    client = _securitm_client(securitm_cfg)
+    _check_assets_config(securitm_cfg.get("assets", {}))
+
+    from securitm_audit_agent.integrations.gateway import DEFAULT_GATEWAY_PORT, GatewayServer, SyncGateway
+
+    gateway_cfg = _get_nested(config, ["gateway"], {})
+    token_env = gateway_cfg.get("token_env")
+    token = _token_from_env(token_env, "gateway.token_env") if token_env else None
+    gateway = SyncGateway(
+        client,
+        securitm_cfg,
+        concurrency=int(gateway_cfg.get("concurrency", 4)),
+        batch_window=float(gateway_cfg.get("batch_window", 0.5)),
+        batch_size=int(gateway_cfg.get("batch_size", 50)),
+        refresh_seconds=float(gateway_cfg.get("refresh_seconds", 300)),
+    )
+    address = (
+        str(gateway_cfg.get("listen_host", "127.0.0.1")),
+        int(gateway_cfg.get("listen_port", DEFAULT_GATEWAY_PORT)),
+    )
+    try:
+        server = GatewayServer(address, gateway, token, gateway_cfg.get("tls_cert"), gateway_cfg.get("tls_key"))
+    except OSError as exc:
+        logging.error("Failed to start gateway on %s:%s: %s", address[0], address[1], exc)
         sys.exit(2)
+    logging.warning("SecurITM gateway listening on %s:%s", address[0], address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        gateway.close()
+
+
+def reconcile_main() -> None:
+    """Сверка задач SecurITM по каталогу отчётов всего парка (securitm-reconcile)."""
+    parser = argparse.ArgumentParser(description="Reconcile SecurITM audit tasks with fleet reports")
+    parser.add_argument("reports", help="Directory with JSON audit reports (latest report per host is used)")
+    parser.add_argument("-c", "--config", default="configs/audit.yml")
+    parser.add_argument("--dry-run", action="store_true", help="Only compute the create/close plan")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel create/close requests")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    args = parser.parse_args()
 
-    if not isinstance(import_fields, Mapping):
-        logging.error("securitm.assets.import_fields must be a mapping")
-        sys.exit(2)
+    _setup_logging(args.verbose)
+    config = _load_cli_config(args.config)
+    securitm_cfg = _get_nested(config, ["securitm"], {})
+    client = _securitm_client(securitm_cfg)
+    _check_assets_config(securitm_cfg.get("assets", {}))
 
-    values = {
-        "hostname": ctx.host_facts.get("hostname"),
-        "fqdn": ctx.host_facts.get("fqdn"),
-        "ip": ctx.host_facts.get("ip") or "",
-    }
-    rendered_fields = _render_fields(import_fields, values)
+    from securitm_audit_agent.integrations.reconcile import FleetReconciler, load_reports
 
-    if import_name_field:
-        asset_name = str(rendered_fields.get(import_name_field, ""))
-    else:
-        asset_name = str(rendered_fields.get("name") or rendered_fields.get("Название") or "")
-    if not asset_name:
-        logging.error("Asset name is missing; set securitm.assets.import_name_field")
+    reports = load_reports(args.reports)
+    if not reports:
+        logging.error("No audit reports found in %s", args.reports)
         sys.exit(2)
-
+    asset_sync = _asset_sync(client, securitm_cfg.get("assets", {}))
+    reconciler = FleetReconciler(client, securitm_cfg, concurrency=args.concurrency, asset_sync=asset_sync)
     try:
-        asset = client.ensure_asset(
-            asset_type_slug=asset_type_slug,
-            name_field=name_field,
-            template=import_template,
-            import_fields=rendered_fields,
-            asset_name=asset_name,
-        )
+        summary = reconciler.run(reports, dry_run=args.dry_run)
     except (requests.RequestException, RuntimeError, ValueError) as exc:
-        logging.error("Failed to sync asset with SecurITM: %s", exc)
-        return
-    asset_uuid = asset.get("uuid")
+        logging.error("Reconciliation failed: %s", exc)
+        sys.exit(1)
+    finally:
+        if not args.dry_run:
+            _save_asset_state(asset_sync)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if summary.get("errors") or summary.get("assets", {}).get("errors"):
+        sys.exit(1)
+
+
+def history_main() -> None:
+    """Запросы к локальной истории прогонов (securitm-history)."""
+    parser = argparse.ArgumentParser(description="Query the local audit run history")
+    parser.add_argument("-c", "--config", default="configs/audit.yml")
+    parser.add_argument("--db", default=None, help="History database (overrides audit.history.path)")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    commands = parser.add_subparsers(dest="command", required=True)
+    last_change = commands.add_parser("last-change", help="When a check last changed status or evidence on a host")
+    last_change.add_argument("hostname")
+    last_change.add_argument("check_id")
+    duration = commands.add_parser("duration", help="Duration percentile of a check over a period")
+    duration.add_argument("check_id")
+    duration.add_argument("--percentile", type=float, default=95.0)
+    duration.add_argument("--days", type=float, default=30.0)
+    duration.add_argument("--host", default=None)
+    trend = commands.add_parser("trend", help="Latest results of a check on a host")
+    trend.add_argument("hostname")
+    trend.add_argument("check_id")
+    trend.add_argument("--limit", type=int, default=30)
+    prune = commands.add_parser("prune", help="Apply retention and compaction, then vacuum")
+    prune.add_argument("--retain-days", type=float, default=None)
+    prune.add_argument("--compact-after-days", type=float, default=None)
+    args = parser.parse_args()
 
-    tasks_cfg = securitm_cfg.get("tasks", {})
-    if not tasks_cfg.get("enabled", True):
-        return
+    _setup_logging(args.verbose)
+    path = args.db
+    if not path:
+        path = _get_nested(_load_cli_config(args.config), ["audit", "history", "path"], None)
+    if not path:
+        logging.error("audit.history.path is not set; pass --db")
+        sys.exit(2)
+    if not Path(str(path)).exists():
+        logging.error("Run history %s does not exist", path)
+        sys.exit(2)
 
-    unsynced_tasks = _sync_fail_tasks(client, report, tasks_cfg, ctx.host_facts, asset_uuid)
-    fallback_output_path = tasks_cfg.get("fallback_output_json")
-    if unsynced_tasks and fallback_output_path:
-        _write_unsynced_tasks(str(fallback_output_path), unsynced_tasks)
-        logging.warning("Unsynced task payloads saved to %s", fallback_output_path)
+    from securitm_audit_agent.reporting.history import RunHistory
+
+    with RunHistory(str(path)) as history:
+        if args.command == "last-change":
+            output: Any = history.last_change(args.hostname, args.check_id)
+        elif args.command == "duration":
+            value = history.duration_percentile(args.check_id, args.percentile, args.days, args.host)
+            output = {"check_id": args.check_id, "percentile": args.percentile, "days": args.days, "seconds": value}
+        elif args.command == "trend":
+            output = history.status_history(args.hostname, args.check_id, args.limit)
+        else:
+            output = history.prune(retain_days=args.retain_days, compact_after_days=args.compact_after_days)
+            history.vacuum()
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+def warehouse_main() -> None:
+    """Загрузка отчётов парка в хранилище результатов и запросы к нему (securitm-warehouse)."""
+    parser = argparse.ArgumentParser(description="Fleet audit results warehouse")
+    parser.add_argument("--db", default="audit-warehouse.db", help="Warehouse SQLite database")
+    parser.add_argument("-v", "--verbose", action="count", default=0)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Load JSON audit reports (files or directories)")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--batch-size", type=int, default=500, help="Reports per transaction")
+    query = commands.add_parser("query", help="Query the latest report of every host")
+    query.add_argument("question", choices=["failing-hosts", "severity", "compliance"])
+    query.add_argument("--check", default=None, help="check_id for failing-hosts")
+    query.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    _setup_logging(args.verbose)
+    if args.command == "query" and not Path(args.db).exists():
+        logging.error("Warehouse %s does not exist; run ingest first", args.db)
+        sys.exit(2)
+
+    from securitm_audit_agent.reporting.warehouse import ResultsWarehouse, iter_report_files
+
+    with ResultsWarehouse(args.db) as warehouse:
+        if args.command == "ingest":
+            output: Any = warehouse.ingest(iter_report_files(args.paths), batch_size=max(args.batch_size, 1))
+        elif args.question == "failing-hosts":
+            output = warehouse.failing_hosts(args.check, args.limit)
+        elif args.question == "severity":
+            output = warehouse.severity_breakdown()
+        else:
+            output = warehouse.compliance_by_os()
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+    if args.command == "ingest" and output["errors"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
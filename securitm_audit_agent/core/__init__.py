@@ -1,8 +1,10 @@
 # Публичные объекты ядра для внешнего импорта.
 from securitm_audit_agent.core.base import BaseCheck, CheckMeta, Status
+from securitm_audit_agent.core.diff import ReportDiff, diff_reports
+from securitm_audit_agent.core.isolation import IsolationPolicy
 from securitm_audit_agent.core.registry import CheckRegistry
 from securitm_audit_agent.core.report import AuditReport, AuditResult
-from securitm_audit_agent.core.runner import AuditRunner
+from securitm_audit_agent.core.runner import AsyncAuditRunner, AuditRunner
 
 __all__ = [
     "BaseCheck",
@@ -12,4 +14,8 @@ __all__ = [
     "AuditReport",
     "AuditResult",
     "AuditRunner",
+    "AsyncAuditRunner",
+    "IsolationPolicy",
+    "ReportDiff",
+    "diff_reports",
 ]
@@ -4,9 +4,9 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Mapping
+from typing import TYPE_CHECKING, Any, Hashable, Mapping, Optional, Tuple
 
-from securitm_audit_agent.platform.protocols import AuditContextProtocol
+from securitm_audit_agent.platform.protocols import AsyncAuditContextProtocol, AuditContextProtocol
 
 if TYPE_CHECKING:
     from securitm_audit_agent.core.report import AuditResult
@@ -25,10 +25,14 @@ class CheckMeta:
     description: str
     severity: str
     remediation: str
+    # Произвольные метки проверки, например "heavy" для выбора изолированного выполнения.
+    tags: Tuple[str, ...] = ()
 
 
 class BaseCheck(ABC):
     meta: CheckMeta
+    # Проверки с общим ключом (например, общим FsScanEngine) изолированно выполняются подряд в одном процессе.
+    isolation_group: Optional[Hashable] = None
 
     def _result(self, status: Status, message: str, evidence: str | None) -> "AuditResult":
         # Локальный импорт убирает runtime-цикл между base.py и report.py.
@@ -46,3 +50,8 @@ class BaseCheck(ABC):
     @abstractmethod
     def check(self, ctx: AuditContextProtocol, params: Mapping[str, Any]) -> "AuditResult":
         raise NotImplementedError
+
+    async def acheck(self, actx: AsyncAuditContextProtocol, params: Mapping[str, Any]) -> "AuditResult":
+        # По умолчанию синхронная check выполняется в пуле потоков цикла событий.
+        # Проверки с асинхронным вводом-выводом переопределяют этот метод.
+        return await actx.run_sync(self.check, actx.sync, params)
@@ -0,0 +1,137 @@
+# Сравнение двух отчётов аудита: переходы статусов и изменения evidence по check_id.
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+
+CHANGE_NEW = "new"
+CHANGE_REMOVED = "removed"
+CHANGE_STATUS = "status"
+CHANGE_EVIDENCE = "evidence"
+
+
+@dataclass
+class ResultChange:
+    check_id: str
+    kind: str
+    previous: Optional[AuditResult]
+    current: Optional[AuditResult]
+
+    @property
+    def previous_status(self) -> Optional[Status]:
+        return self.previous.status if self.previous is not None else None
+
+    @property
+    def current_status(self) -> Optional[Status]:
+        return self.current.status if self.current is not None else None
+
+    @property
+    def transition(self) -> str:
+        # "OK->FAIL"; для новой или удалённой проверки недостающая сторона пишется как "-".
+        before = self.previous_status.value if self.previous_status else "-"
+        after = self.current_status.value if self.current_status else "-"
+        return f"{before}->{after}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"check_id": self.check_id, "change": self.kind, "transition": self.transition}
+        if self.current is not None:
+            data["result"] = self.current.to_dict()
+        if self.previous is not None and self.kind == CHANGE_EVIDENCE:
+            data["previous_evidence"] = self.previous.evidence
+        return data
+
+
+@dataclass
+class ReportDiff:
+    """Изменения отчёта current относительно previous.
+
+    unchanged — число проверок без изменений статуса и evidence; changes
+    упорядочены как результаты current, удалённые проверки идут в конце.
+    """
+
+    host: Dict[str, Any]
+    previous_finished_at: Optional[str]
+    finished_at: str
+    changes: List[ResultChange] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def new_failures(self) -> List[AuditResult]:
+        """FAIL-результаты, которых не было в прошлом отчёте в статусе FAIL."""
+        return [
+            change.current
+            for change in self.changes
+            if change.current is not None
+            and change.current.status == Status.FAIL
+            and change.previous_status != Status.FAIL
+        ]
+
+    def resolved(self) -> List[AuditResult]:
+        """Прошлые FAIL-результаты проверок, перешедших в OK (по ним создавалась задача)."""
+        return [
+            change.previous
+            for change in self.changes
+            if change.previous is not None
+            and change.previous.status == Status.FAIL
+            and change.current_status == Status.OK
+        ]
+
+    def summary(self) -> Dict[str, int]:
+        counts = {CHANGE_NEW: 0, CHANGE_REMOVED: 0, CHANGE_STATUS: 0, CHANGE_EVIDENCE: 0}
+        for change in self.changes:
+            counts[change.kind] += 1
+        counts["unchanged"] = self.unchanged
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "previous_finished_at": self.previous_finished_at,
+            "finished_at": self.finished_at,
+            "summary": self.summary(),
+            "changes": [change.to_dict() for change in self.changes],
+        }
+
+    def iter_jsonl(self) -> Iterator[str]:
+        # Одна строка на изменение; хост и время дублируются, чтобы строки читались независимо.
+        hostname = self.host.get("hostname")
+        for change in self.changes:
+            record = {"hostname": hostname, "finished_at": self.finished_at, **change.to_dict()}
+            yield json.dumps(record, ensure_ascii=False)
+
+
+def _isoformat(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def diff_reports(previous: Optional[AuditReport], current: AuditReport) -> ReportDiff:
+    """Сравнивает отчёты по check_id; без previous все результаты считаются новыми."""
+    diff = ReportDiff(
+        host=current.host,
+        previous_finished_at=_isoformat(previous.finished_at) if previous is not None else None,
+        finished_at=_isoformat(current.finished_at),
+    )
+    before = {result.check_id: result for result in previous.results} if previous is not None else {}
+    seen = set()
+    for result in current.results:
+        seen.add(result.check_id)
+        old = before.get(result.check_id)
+        if old is None:
+            diff.changes.append(ResultChange(result.check_id, CHANGE_NEW, None, result))
+        elif old.status != result.status:
+            diff.changes.append(ResultChange(result.check_id, CHANGE_STATUS, old, result))
+        elif old.evidence != result.evidence:
+            diff.changes.append(ResultChange(result.check_id, CHANGE_EVIDENCE, old, result))
+        else:
+            diff.unchanged += 1
+    for check_id, old in before.items():
+        if check_id not in seen:
+            diff.changes.append(ResultChange(check_id, CHANGE_REMOVED, old, None))
+    return diff
@@ -0,0 +1,265 @@
+# Выполнение выбранных проверок в отдельных процессах с ограничениями ресурсов.
+from __future__ import annotations
+
+import logging
+import os
+import resource
+import signal
+import threading
+from dataclasses import dataclass, replace
+from multiprocessing.connection import Connection, Pipe, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from securitm_audit_agent.core.base import BaseCheck
+from securitm_audit_agent.core.report import AuditResult
+
+DEFAULT_ISOLATION_WORKERS = 2
+DEFAULT_MAX_CHECKS_PER_WORKER = 20
+# Запас к жёсткому лимиту CPU: после мягкого лимита проверка получает SIGXCPU, после жёсткого — SIGKILL.
+CPU_GRACE_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class CpuLimitExceeded(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class IsolationPolicy:
+    """Какие проверки выносить в пул процессов и с какими лимитами.
+
+    Проверка изолируется, если у неё есть хотя бы один тег из tags или она
+    определена в модуле из plugins. memory_mb — RLIMIT_AS процесса-исполнителя,
+    cpu_seconds — процессорное время на одну проверку. После
+    max_checks_per_worker проверок процесс заменяется новым.
+    """
+
+    tags: Tuple[str, ...] = ()
+    plugins: Tuple[str, ...] = ()
+    workers: int = DEFAULT_ISOLATION_WORKERS
+    max_checks_per_worker: int = DEFAULT_MAX_CHECKS_PER_WORKER
+    memory_mb: Optional[int] = None
+    cpu_seconds: Optional[int] = None
+
+    def selects(self, check: BaseCheck) -> bool:
+        if set(check.meta.tags) & set(self.tags):
+            return True
+        module = type(check).__module__
+        return any(module == plugin or module.startswith(plugin + ".") for plugin in self.plugins)
+
+
+def _on_cpu_limit(signum: int, frame: Any) -> None:
+    raise CpuLimitExceeded("CPU time limit exceeded")
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _apply_limits(policy: IsolationPolicy) -> None:
+    if policy.memory_mb:
+        limit = policy.memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if policy.cpu_seconds:
+        # RLIMIT_CPU считается на весь процесс, поэтому жёсткий лимит — на все проверки до замены процесса.
+        hard = policy.cpu_seconds * max(policy.max_checks_per_worker, 1) + CPU_GRACE_SECONDS
+        _soft, current_hard = resource.getrlimit(resource.RLIMIT_CPU)
+        if current_hard != resource.RLIM_INFINITY:
+            hard = min(hard, current_hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+
+def _arm_cpu_limit(seconds: int) -> None:
+    # Мягкий лимит сдвигается перед каждой проверкой: бюджет считается от уже потраченного времени.
+    _soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(_cpu_used()) + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_loop(
+    conn: Connection,
+    execute: Callable[[str], AuditResult],
+    policy: IsolationPolicy,
+    throttled: Callable[[], float],
+) -> None:
+    _apply_limits(policy)
+    while True:
+        try:
+            check_id = conn.recv()
+        except EOFError:
+            return
+        if check_id is None:
+            return
+        if policy.cpu_seconds:
+            _arm_cpu_limit(policy.cpu_seconds)
+        # Дросселирование в дочернем процессе не видно счётчику родителя: время ожидания идёт вместе с результатом.
+        before = throttled()
+        result = execute(check_id)
+        conn.send((result, throttled() - before))
+
+
+class _Worker:
+    # Процесс-исполнитель: fork наследует реестр, контекст и параметры, по каналу передаётся только check_id.
+    def __init__(
+        self,
+        execute: Callable[[str], AuditResult],
+        policy: IsolationPolicy,
+        throttled: Callable[[], float],
+    ) -> None:
+        parent_conn, child_conn = Pipe()
+        pid = os.fork()
+        if pid == 0:
+            parent_conn.close()
+            code = 0
+            try:
+                _worker_loop(child_conn, execute, policy, throttled)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        child_conn.close()
+        self.pid = pid
+        self.conn = parent_conn
+        self.current: Optional[str] = None
+        self.pending: List[str] = []
+        self.done = 0
+
+    def submit(self, batch: List[str]) -> None:
+        self.pending = list(batch)
+        self.advance()
+
+    def advance(self) -> None:
+        self.current = self.pending.pop(0)
+        self.conn.send(self.current)
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.wait()
+
+    def kill(self) -> None:
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.wait()
+
+    def wait(self) -> str:
+        self.conn.close()
+        _pid, status = os.waitpid(self.pid, 0)
+        if os.WIFSIGNALED(status):
+            return f"killed by {signal.Signals(os.WTERMSIG(status)).name}"
+        return f"exited with code {os.WEXITSTATUS(status)}"
+
+
+class IsolatedCheckPool:
+    """Пул заранее запущенных процессов для проверок с лимитами ресурсов.
+
+    execute выполняется в дочернем процессе и должен сам превращать исключения
+    проверки в AuditResult; on_failure строит результат для проверки, процесс
+    которой завершился аварийно (например, по SIGKILL после жёсткого лимита CPU).
+    throttled — счётчик времени дросселирования; сумма по проверкам процессов
+    копится в throttled_seconds. Процессы создаются fork, поэтому фоновые
+    потоки (сбор фактов о хосте) вызывающий должен завершить до run.
+
+    Проверки с одинаковым ключом group выполняются подряд в одном процессе:
+    общие кеши (обход ФС) заполняются в нём один раз. Процесс не заменяется
+    посреди группы; после его падения остаток группы уходит в новый процесс.
+    """
+
+    def __init__(
+        self,
+        policy: IsolationPolicy,
+        execute: Callable[[str], AuditResult],
+        on_failure: Callable[[str, str], AuditResult],
+        throttled: Callable[[], float] = lambda: 0.0,
+    ) -> None:
+        self.policy = policy
+        self.throttled_seconds = 0.0
+        self._execute = execute
+        self._on_failure = on_failure
+        self._throttled = throttled
+
+    def run(
+        self,
+        check_ids: Sequence[str],
+        group: Callable[[str], Optional[Hashable]] = lambda check_id: None,
+    ) -> Dict[str, AuditResult]:
+        if threading.active_count() > 1:
+            # Дочерний процесс наследует блокировки, захваченные другими потоками, но не сами потоки.
+            logger.warning("Forking isolated workers with %d live threads", threading.active_count() - 1)
+        queue = _batches(check_ids, group)
+        # Группа выполняется в одном процессе целиком: жёсткий лимит CPU рассчитывается и на неё.
+        longest = max((len(batch) for batch in queue), default=1)
+        worker_policy = replace(self.policy, max_checks_per_worker=max(self.policy.max_checks_per_worker, longest))
+        results: Dict[str, AuditResult] = {}
+        busy: Dict[Any, _Worker] = {}
+        idle: List[_Worker] = []
+        try:
+            for _ in range(min(max(self.policy.workers, 1), len(queue))):
+                worker = _Worker(self._execute, worker_policy, self._throttled)
+                worker.submit(queue.pop())
+                busy[worker.conn] = worker
+            while busy:
+                for conn in wait(list(busy)):
+                    worker = busy.pop(conn)
+                    reusable = self._collect(worker, results)
+                    if worker.pending:
+                        if reusable is not None:
+                            reusable.advance()
+                            busy[reusable.conn] = reusable
+                            continue
+                        queue.append(worker.pending)
+                    if not queue:
+                        if reusable is not None:
+                            idle.append(reusable)
+                        continue
+                    worker = reusable or _Worker(self._execute, worker_policy, self._throttled)
+                    worker.submit(queue.pop())
+                    busy[worker.conn] = worker
+        finally:
+            for worker in idle:
+                worker.stop()
+            # Сюда попадаем с занятыми процессами только при прерывании прогона.
+            for worker in busy.values():
+                worker.kill()
+        return results
+
+    def _collect(self, worker: _Worker, results: Dict[str, AuditResult]) -> Optional[_Worker]:
+        # Забирает результат проверки; возвращает процесс, если его можно использовать дальше.
+        check_id = worker.current or ""
+        try:
+            results[check_id], throttled = worker.conn.recv()
+        except (EOFError, OSError):
+            results[check_id] = self._on_failure(check_id, f"Isolated worker {worker.wait()}")
+            return None
+        self.throttled_seconds += throttled
+        worker.done += 1
+        if worker.done >= self.policy.max_checks_per_worker and not worker.pending:
+            worker.stop()
+            return None
+        return worker
+
+
+def _batches(check_ids: Sequence[str], group: Callable[[str], Optional[Hashable]]) -> List[List[str]]:
+    # Очередь пакетов в обратном порядке (берётся pop с конца); пакет группы стоит на месте её первой проверки.
+    batches: List[List[str]] = []
+    grouped: Dict[Hashable, List[str]] = {}
+    for check_id in check_ids:
+        key = group(check_id)
+        if key is None:
+            batches.append([check_id])
+        elif key in grouped:
+            grouped[key].append(check_id)
+        else:
+            grouped[key] = [check_id]
+            batches.append(grouped[key])
+    batches.reverse()
+    return batches
@@ -16,10 +16,12 @@ class AuditResult:
     evidence: Optional[str]
     severity: str
     remediation: str
+    # Время выполнения проверки; None у результатов, которые не выполнялись (не зарегистрирована и т.п.).
+    duration_seconds: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
         # Готовим результат к сериализации в JSON.
-        return {
+        data: Dict[str, Any] = {
             "check_id": self.check_id,
             "status": self.status.value,
             "message": self.message,
@@ -27,6 +29,22 @@ class AuditResult:
             "severity": self.severity,
             "remediation": self.remediation,
         }
+        if self.duration_seconds is not None:
+            data["duration_seconds"] = self.duration_seconds
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditResult":
+        # Обратное преобразование для отчётов, полученных по сети или из файла.
+        return cls(
+            check_id=str(data["check_id"]),
+            status=Status(data["status"]),
+            message=str(data.get("message") or ""),
+            evidence=data.get("evidence"),
+            severity=str(data.get("severity") or ""),
+            remediation=str(data.get("remediation") or ""),
+            duration_seconds=data.get("duration_seconds"),
+        )
 
 
 @dataclass
@@ -36,6 +54,8 @@ class AuditReport:
     finished_at: datetime
     agent_version: str
     results: List[AuditResult]
+    # Сколько секунд аудит ждал ограничителя нагрузки (audit.governor).
+    throttled_seconds: float = 0.0
 
     @property
     def duration_seconds(self) -> float:
@@ -49,6 +69,18 @@ class AuditReport:
             "started_at": self.started_at.astimezone(timezone.utc).isoformat(),
             "finished_at": self.finished_at.astimezone(timezone.utc).isoformat(),
             "duration_seconds": self.duration_seconds,
+            "throttled_seconds": round(self.throttled_seconds, 3),
             "agent_version": self.agent_version,
             "results": [result.to_dict() for result in self.results],
         }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditReport":
+        return cls(
+            host=dict(data.get("host") or {}),
+            started_at=datetime.fromisoformat(data["started_at"]),
+            finished_at=datetime.fromisoformat(data["finished_at"]),
+            agent_version=str(data.get("agent_version") or ""),
+            results=[AuditResult.from_dict(item) for item in data.get("results") or []],
+            throttled_seconds=float(data.get("throttled_seconds") or 0.0),
+        )
@@ -1,18 +1,79 @@
 # Исполнитель проверок и агрегатор отчета.
 from __future__ import annotations
 
+import asyncio
+import itertools
+import time
 from datetime import datetime, timezone
-from typing import Iterable, List, Mapping, Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
-from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.base import BaseCheck, Status
+from securitm_audit_agent.core.isolation import IsolatedCheckPool, IsolationPolicy
 from securitm_audit_agent.core.report import AuditReport, AuditResult
 from securitm_audit_agent.core.registry import CheckRegistry
-from securitm_audit_agent.platform.protocols import AuditContextProtocol
+from securitm_audit_agent.platform.protocols import AsyncAuditContextProtocol, AuditContextProtocol
+
+DEFAULT_ASYNC_CONCURRENCY = 32
+
+_RUN_IDS = itertools.count(1)
+
+
+def _unregistered_result(check_id: str) -> AuditResult:
+    # Неизвестная проверка — фиксируем как ERROR, но продолжаем выполнение.
+    return AuditResult(
+        check_id=check_id,
+        status=Status.ERROR,
+        message="Check not registered",
+        evidence=None,
+        severity="high",
+        remediation="Register the check or remove it from config",
+    )
+
+
+def _failure_result(check: BaseCheck, message: str) -> AuditResult:
+    return AuditResult(
+        check_id=check.meta.check_id,
+        status=Status.ERROR,
+        message=message,
+        evidence=None,
+        severity=check.meta.severity,
+        remediation=check.meta.remediation,
+    )
+
+
+def _error_result(check: BaseCheck, exc: Exception) -> AuditResult:
+    # MemoryError под RLIMIT_AS приходит без текста — тогда в сообщении имя исключения.
+    return _failure_result(check, f"Unhandled error: {str(exc) or type(exc).__name__}")
+
+
+def _throttled_seconds(ctx: object) -> float:
+    governor = getattr(ctx, "governor", None)
+    return governor.throttled_seconds if governor is not None else 0.0
+
+
+def _start_run(ctx: AuditContextProtocol) -> None:
+    # Новый номер прогона сбрасывает кеши проверок (снимок ядра, общий обход ФС) прошлых прогонов на том же контексте.
+    ctx.run_id = next(_RUN_IDS)
+
+
+def _timed(result: AuditResult, started: float) -> AuditResult:
+    result.duration_seconds = round(time.perf_counter() - started, 6)
+    return result
+
+
+def _execute(check: BaseCheck, ctx: AuditContextProtocol, check_params: Mapping[str, object]) -> AuditResult:
+    started = time.perf_counter()
+    try:
+        return _timed(check.check(ctx, check_params), started)
+    except Exception as exc:
+        # Это boundary уровня runner: ошибка отдельной проверки не должна валить весь аудит.
+        return _timed(_error_result(check, exc), started)
 
 
 class AuditRunner:
-    def __init__(self, registry: CheckRegistry) -> None:
+    def __init__(self, registry: CheckRegistry, isolation: Optional[IsolationPolicy] = None) -> None:
         self._registry = registry
+        self._isolation = isolation
 
     def run(
         self,
@@ -21,41 +82,23 @@ class AuditRunner:
         params: Mapping[str, Mapping[str, object]],
     ) -> AuditReport:
         started_at = datetime.now(timezone.utc)
+        _start_run(ctx)
+        throttled_before = _throttled_seconds(ctx)
         results: List[AuditResult] = []
 
         check_ids = list(enabled_ids) if enabled_ids else list(self._registry.ids())
+        isolated, isolated_throttled = self._run_isolated(ctx, check_ids, params)
 
         for check_id in check_ids:
+            if check_id in isolated:
+                results.append(isolated[check_id])
+                continue
             try:
                 check = self._registry.get(check_id)
             except KeyError:
-                # Неизвестная проверка — фиксируем как ERROR, но продолжаем выполнение.
-                results.append(
-                    AuditResult(
-                        check_id=check_id,
-                        status=Status.ERROR,
-                        message="Check not registered",
-                        evidence=None,
-                        severity="high",
-                        remediation="Register the check or remove it from config",
-                    )
-                )
+                results.append(_unregistered_result(check_id))
                 continue
-
-            check_params = params.get(check_id, {})
-            try:
-                result = check.check(ctx, check_params)
-            except Exception as exc:
-                # Это boundary уровня runner: ошибка отдельной проверки не должна валить весь аудит.
-                result = AuditResult(
-                    check_id=check.meta.check_id,
-                    status=Status.ERROR,
-                    message=f"Unhandled error: {exc}",
-                    evidence=None,
-                    severity=check.meta.severity,
-                    remediation=check.meta.remediation,
-                )
-            results.append(result)
+            results.append(_execute(check, ctx, params.get(check_id, {})))
 
         finished_at = datetime.now(timezone.utc)
         return AuditReport(
@@ -64,4 +107,99 @@ class AuditRunner:
             finished_at=finished_at,
             agent_version=getattr(ctx, "agent_version", "0.0.0"),
             results=results,
+            throttled_seconds=_throttled_seconds(ctx) - throttled_before + isolated_throttled,
+        )
+
+    def _run_isolated(
+        self,
+        ctx: AuditContextProtocol,
+        check_ids: List[str],
+        params: Mapping[str, Mapping[str, object]],
+    ) -> Tuple[Dict[str, AuditResult], float]:
+        """Проверки, выбранные политикой изоляции, выполняются до остальных в пуле процессов.
+
+        Процессы создаются fork до запуска проверок в основном процессе, поэтому
+        наследуют реестр и контекст как есть; обратно передаются AuditResult и
+        время дросселирования проверки. Возвращает результаты и суммарное время.
+        """
+        if self._isolation is None:
+            return {}, 0.0
+        selected = [
+            check_id
+            for check_id in dict.fromkeys(check_ids)
+            if check_id in self._registry.ids() and self._isolation.selects(self._registry.get(check_id))
+        ]
+        if not selected:
+            return {}, 0.0
+        # fork при живых потоках сбора фактов (и DNS-запроса) может унаследовать захваченную ими
+        # блокировку: факты собираются до запуска процессов.
+        getattr(ctx, "host_facts", None)
+        pool = IsolatedCheckPool(
+            self._isolation,
+            execute=lambda check_id: _execute(self._registry.get(check_id), ctx, params.get(check_id, {})),
+            on_failure=lambda check_id, reason: _failure_result(self._registry.get(check_id), reason),
+            throttled=lambda: _throttled_seconds(ctx),
         )
+        # Проверки с общим обходом ФС идут в один процесс, иначе каждый процесс повторит обход.
+        results = pool.run(selected, group=lambda check_id: self._registry.get(check_id).isolation_group)
+        return results, pool.throttled_seconds
+
+
+class AsyncAuditRunner:
+    """Выполнение проверок на одном цикле событий.
+
+    Проверки запускаются конкурентно (не больше concurrency одновременно),
+    факты о хосте собираются параллельно с ними. Порядок результатов в отчёте
+    совпадает с порядком check_id, как у AuditRunner.
+    """
+
+    def __init__(self, registry: CheckRegistry, concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> None:
+        self._registry = registry
+        self._concurrency = max(concurrency, 1)
+
+    async def run(
+        self,
+        actx: AsyncAuditContextProtocol,
+        enabled_ids: Optional[Iterable[str]],
+        params: Mapping[str, Mapping[str, object]],
+    ) -> AuditReport:
+        started_at = datetime.now(timezone.utc)
+        _start_run(actx.sync)
+        throttled_before = _throttled_seconds(actx.sync)
+        check_ids = list(enabled_ids) if enabled_ids else list(self._registry.ids())
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        facts = asyncio.ensure_future(actx.host_facts())
+        results = await asyncio.gather(
+            *(self._run_check(actx, check_id, params.get(check_id, {}), semaphore) for check_id in check_ids)
+        )
+        host = await facts
+
+        finished_at = datetime.now(timezone.utc)
+        return AuditReport(
+            host=host,
+            started_at=started_at,
+            finished_at=finished_at,
+            agent_version=actx.agent_version,
+            results=list(results),
+            throttled_seconds=_throttled_seconds(actx.sync) - throttled_before,
+        )
+
+    async def _run_check(
+        self,
+        actx: AsyncAuditContextProtocol,
+        check_id: str,
+        check_params: Mapping[str, object],
+        semaphore: asyncio.Semaphore,
+    ) -> AuditResult:
+        try:
+            check = self._registry.get(check_id)
+        except KeyError:
+            return _unregistered_result(check_id)
+        async with semaphore:
+            # Время считается с момента получения слота: ожидание семафора в него не входит.
+            started = time.perf_counter()
+            try:
+                return _timed(await check.acheck(actx, check_params), started)
+            except Exception as exc:
+                return _timed(_error_result(check, exc), started)
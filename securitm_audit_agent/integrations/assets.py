@@ -0,0 +1,118 @@
+# Пакетный импорт активов SecurITM: отправляются только новые активы и активы с изменёнными полями.
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import requests
+
+from securitm_audit_agent.integrations.ledger import write_json_atomic
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+
+DEFAULT_ASSET_CHUNK_SIZE = 200
+ASSET_STATE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class AssetSyncState:
+    """Последние отправленные в SecurITM поля импорта по имени актива (JSON-файл)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fields: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    @staticmethod
+    def key(name: str) -> str:
+        return name.strip().lower()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            # Без состояния активы просто отправятся ещё раз.
+            logger.warning("Asset sync state %s is unreadable, starting empty: %s", self.path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != ASSET_STATE_VERSION:
+            logger.warning("Asset sync state %s has unsupported format, starting empty", self.path)
+            return
+        assets = data.get("assets")
+        if isinstance(assets, dict):
+            self._fields = {key: fields for key, fields in assets.items() if isinstance(fields, dict)}
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._fields.get(self.key(name))
+
+    def update(self, name: str, fields: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._fields[self.key(name)] = dict(fields)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"version": ASSET_STATE_VERSION, "assets": dict(self._fields)}
+        write_json_atomic(self.path, data)
+
+
+class AssetBatchSync:
+    """Импорт активов парка пакетами по chunk_size в одном /api/v1/assets/import.
+
+    Отрендеренные поля импорта сравниваются с состоянием state: отправляются
+    только активы, чьи поля изменились (IP, FQDN и т.п.), плюс имена из force
+    (например, отсутствующие в SecurITM). Без state отправляются только force.
+    Состояние обновляется лишь для пакетов, принятых API, поэтому неудачный
+    пакет уйдёт повторно при следующей синхронизации.
+    """
+
+    def __init__(
+        self,
+        client: SecurITMClient,
+        template: str,
+        state: Optional[AssetSyncState] = None,
+        chunk_size: int = DEFAULT_ASSET_CHUNK_SIZE,
+    ) -> None:
+        self.client = client
+        self.template = template
+        self.state = state
+        self.chunk_size = max(chunk_size, 1)
+
+    def changed(self, assets: Mapping[str, Dict[str, Any]], force: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        forced = {AssetSyncState.key(name) for name in force}
+        pending: Dict[str, Dict[str, Any]] = {}
+        for name, fields in assets.items():
+            if AssetSyncState.key(name) in forced:
+                pending[name] = fields
+            elif self.state is not None and self.state.get(name) != fields:
+                pending[name] = fields
+        return pending
+
+    def sync(self, assets: Mapping[str, Dict[str, Any]], force: Iterable[str] = ()) -> Dict[str, Any]:
+        """Импортирует изменившиеся активы; assets — поля импорта по имени актива."""
+        pending = list(self.changed(assets, force).items())
+        summary: Dict[str, Any] = {"assets": len(assets), "changed": len(pending), "imported": 0, "chunks": 0}
+        errors: List[str] = []
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start : start + self.chunk_size]
+            try:
+                self.client.import_assets(self.template, [fields for _name, fields in chunk])
+            except (requests.RequestException, RuntimeError, ValueError) as exc:
+                logger.error("Asset import of %d asset(s) failed: %s", len(chunk), exc)
+                errors.append(str(exc))
+                continue
+            summary["chunks"] += 1
+            summary["imported"] += len(chunk)
+            if self.state is not None:
+                for name, fields in chunk:
+                    self.state.update(name, fields)
+        summary["errors"] = errors
+        return summary
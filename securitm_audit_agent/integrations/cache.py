@@ -0,0 +1,138 @@
+# Кеш GET-ответов SecurITM на время прогона: объединение одинаковых запросов и ревалидация по ETag.
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+# Ключ записи: URL и отсортированные параметры запроса.
+CacheKey = Tuple[str, Tuple[Tuple[str, Hashable], ...]]
+
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Предел числа записей: перебор всех страниц задач большого тенанта не должен оседать в памяти целиком.
+DEFAULT_CACHE_MAX_ENTRIES = 256
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> CacheKey:
+    return url, tuple(sorted((params or {}).items()))
+
+
+@dataclass
+class CacheEntry:
+    # value — разобранный JSON или тело ответа в байтах; вызывающий код не должен его менять.
+    value: Any
+    etag: Optional[str]
+    stored_at: float
+    stale: bool = False
+
+
+class ResponseCache:
+    """Кеш ответов на время прогона с объединением одинаковых запросов «в полёте».
+
+    Пока запрос по ключу выполняется, остальные потоки с тем же ключом ждут
+    его результата вместо своего запроса. Запись живёт до invalidate (после
+    POST, меняющих данные) или до истечения ttl; устаревшая запись с ETag
+    ревалидируется через If-None-Match, и ответ 304 возвращает её без
+    повторной передачи тела. Сверх max_entries вытесняются давно не
+    использованные записи. stats: hits, coalesced, revalidated, misses,
+    uncacheable, invalidations, evictions.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max(max_entries, 1)
+        self.stats: Counter = Counter()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._generation = 0
+
+    def _fresh(self, entry: CacheEntry) -> bool:
+        if entry.stale:
+            return False
+        return self.ttl is None or self._clock() - entry.stored_at < self.ttl
+
+    def get_or_fetch(
+        self,
+        key: CacheKey,
+        fetch: Callable[[Optional[CacheEntry]], Optional[CacheEntry]],
+    ) -> Tuple[Optional[CacheEntry], str]:
+        """Запись по ключу и откуда она взята: hit, coalesced, revalidated или miss.
+
+        fetch(stale) выполняет запрос; stale — устаревшая запись с ETag для
+        If-None-Match. fetch возвращает новую запись, ту же stale при 304 или
+        None, если ответ не кешируется (тогда и ждавшие потоки получают None
+        и выполняют запрос сами).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry):
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry, "hit"
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+            generation = self._generation
+        if not leader:
+            return future.result(), "coalesced"
+
+        stale = entry if entry is not None and entry.etag else None
+        try:
+            result = fetch(stale)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if result is None:
+                self._entries.pop(key, None)
+                self.stats["uncacheable"] += 1
+                source = "miss"
+            else:
+                source = "revalidated" if result is stale else "miss"
+                self.stats["revalidated" if result is stale else "misses"] += 1
+                # Ответ, полученный параллельно с POST, мог устареть — при следующем чтении ревалидируем.
+                result.stale = generation != self._generation
+                result.stored_at = self._clock()
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        future.set_result(result)
+        return result, source
+
+    def invalidate(self, url_prefix: str = "") -> None:
+        # Записи не удаляются, а помечаются устаревшими: их ETag ещё пригодится для If-None-Match.
+        with self._lock:
+            for (url, _params), entry in self._entries.items():
+                if url.startswith(url_prefix):
+                    entry.stale = True
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def hit_ratio(self) -> float:
+        return hit_ratio(self.stats)
+
+
+def hit_ratio(stats: Mapping[str, int]) -> float:
+    # Попадание — ответ без передачи тела: из кеша, от параллельного запроса или 304.
+    served = stats.get("hits", 0) + stats.get("coalesced", 0) + stats.get("revalidated", 0)
+    total = served + stats.get("misses", 0) + stats.get("uncacheable", 0)
+    return served / total if total else 0.0
@@ -0,0 +1,417 @@
+# Шлюз синхронизации с SecurITM для парка агентов и клиент агента к нему.
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import ssl
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import requests
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.payloads import (
+    build_asset_fields,
+    build_task_payload,
+    extract_host_from_desc,
+    extract_task_object,
+    normalize_task_name,
+    task_matches,
+)
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+
+REPORTS_PATH = "/api/v1/reports"
+HEALTH_PATH = "/healthz"
+DEFAULT_GATEWAY_PORT = 8780
+MAX_REPORT_BYTES = 32 * 1024 * 1024
+TASK_PAGE_SIZE = 100
+TASK_PAGE_PREFETCH = 2
+
+# Ключ открытой задачи: нормализованное имя и хост из строки "Host:" описания.
+TaskKey = Tuple[str, Optional[str]]
+
+logger = logging.getLogger(__name__)
+
+
+class SyncGateway:
+    """Синхронизация отчётов многих агентов с SecurITM через один тёплый индекс.
+
+    Индекс активов и открытых задач загружается один раз и обновляется не чаще
+    refresh_seconds, поэтому отчёт агента не порождает поиск актива и задач в
+    SecurITM. Импорты новых активов копятся batch_window секунд (или до
+    batch_size) и уходят одним запросом import. Создание задач выполняется
+    пулом из concurrency потоков; одинаковые задачи от параллельных отчётов
+    создаются один раз.
+    """
+
+    def __init__(
+        self,
+        client: SecurITMClient,
+        securitm_cfg: Mapping[str, Any],
+        concurrency: int = 4,
+        batch_window: float = 0.5,
+        batch_size: int = 50,
+        refresh_seconds: float = 300.0,
+        wait_timeout: float = 120.0,
+    ) -> None:
+        self.client = client
+        self.assets_cfg: Mapping[str, Any] = securitm_cfg.get("assets", {})
+        self.tasks_cfg: Mapping[str, Any] = securitm_cfg.get("tasks", {})
+        self.batch_window = batch_window
+        self.batch_size = max(batch_size, 1)
+        self.refresh_seconds = refresh_seconds
+        self.wait_timeout = wait_timeout
+        self.stats: Dict[str, int] = {
+            "reports": 0,
+            "index_loads": 0,
+            "asset_imports": 0,
+            "assets_imported": 0,
+            "tasks_created": 0,
+            "tasks_existing": 0,
+            "tasks_closed": 0,
+        }
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._assets: Dict[str, Dict[str, Any]] = {}
+        # Открытые задачи по нормализованному имени; совпадение по хосту проверяет task_matches.
+        self._open_tasks: Dict[str, List[Dict[str, Any]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._pending_assets: Dict[str, Tuple[Dict[str, Any], Future]] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        self._creating: Dict[TaskKey, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="securitm-push")
+
+    # --- индекс ---
+
+    def _task_key(self, name: Any, desc: Any) -> TaskKey:
+        return (
+            normalize_task_name(str(name or "")),
+            extract_host_from_desc(desc),
+        )
+
+    def _fetch_assets(self, keys: Optional[Set[str]] = None) -> Dict[str, Dict[str, Any]]:
+        # keys — только эти имена: выгрузка читается, пока все они не найдены.
+        name_field = self.assets_cfg.get("name_field", "name")
+        fields = list(dict.fromkeys(["uuid", "name", name_field]))
+        assets: Dict[str, Dict[str, Any]] = {}
+        # Полная выгрузка индекса кешируется: после invalidate_cache неизменившиеся активы придут как 304.
+        listing = self.client.iter_assets(self.assets_cfg["asset_type_slug"], fields=fields, cache=keys is None)
+        for asset in listing:
+            name = asset.get(name_field) or asset.get("name")
+            if not isinstance(name, str) or not name.strip():
+                continue
+            key = name.strip().lower()
+            if keys is None:
+                assets[key] = asset
+            elif key in keys:
+                assets[key] = asset
+                if len(assets) == len(keys):
+                    break
+        return assets
+
+    def _fetch_open_tasks(self) -> Dict[str, List[Dict[str, Any]]]:
+        filters = {"fields": [{"is_done": 0, "op": "eq"}]}
+        tasks: Dict[str, List[Dict[str, Any]]] = {}
+        for task in self.client.iter_tasks(filters=filters, per_page=TASK_PAGE_SIZE, prefetch=TASK_PAGE_PREFETCH):
+            if task.get("is_done") in (0, False, None):
+                tasks.setdefault(self._task_key(task.get("name"), None)[0], []).append(task)
+        return tasks
+
+    def refresh_index(self, force: bool = False) -> None:
+        # Параллельные отчёты ждут одну загрузку индекса, а не запускают свои.
+        with self._index_lock:
+            loaded_at = self._loaded_at
+            if not force and loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+                return
+            # Кеш клиента держит прошлую выгрузку; после сброса неизменившиеся ответы придут как 304.
+            self.client.invalidate_cache()
+            assets = self._fetch_assets()
+            tasks = self._fetch_open_tasks() if self.tasks_cfg.get("enabled", True) else {}
+            with self._lock:
+                self._assets = assets
+                self._open_tasks = tasks
+                self._loaded_at = time.monotonic()
+                self.stats["index_loads"] += 1
+
+    # --- активы ---
+
+    def ensure_asset(self, fields: Dict[str, Any], name: str) -> Dict[str, Any]:
+        key = name.strip().lower()
+        flush_now = False
+        with self._lock:
+            asset = self._assets.get(key)
+            if asset is not None:
+                return asset
+            pending = self._pending_assets.get(key)
+            if pending is None:
+                future: Future = Future()
+                self._pending_assets[key] = (fields, future)
+                if len(self._pending_assets) >= self.batch_size:
+                    flush_now = True
+                elif self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.batch_window, self._flush_assets)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+            else:
+                future = pending[1]
+        if flush_now:
+            self._flush_assets()
+        # До Python 3.11 concurrent.futures.TimeoutError не совпадает со встроенным TimeoutError.
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            raise RuntimeError(f"Asset import did not finish in {self.wait_timeout}s") from None
+
+    def _flush_assets(self) -> None:
+        with self._lock:
+            batch = self._pending_assets
+            self._pending_assets = {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if not batch:
+            return
+        imported: Dict[str, Dict[str, Any]] = {}
+        error: Optional[BaseException] = None
+        try:
+            self.client.import_assets(self.assets_cfg["import_template"], [fields for fields, _future in batch.values()])
+            # API импорта не возвращает uuid: из выгрузки берутся только импортированные имена, индекс дополняется.
+            imported = self._fetch_assets(set(batch))
+            with self._lock:
+                self._assets.update(imported)
+                self.stats["asset_imports"] += 1
+                self.stats["assets_imported"] += len(batch)
+        except (requests.RequestException, RuntimeError, ValueError) as exc:
+            error = exc
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            # Непойманное исключение в потоке Timer иначе оставило бы отчёты ждать до wait_timeout.
+            for key, (_fields, future) in batch.items():
+                asset = imported.get(key)
+                if asset is not None:
+                    future.set_result(asset)
+                else:
+                    future.set_exception(error or RuntimeError("Asset import did not return a visible asset"))
+
+    # --- задачи ---
+
+    def _sync_task(self, payload: Dict[str, Any]) -> Tuple[str, Union[Dict[str, Any], Future]]:
+        key = self._task_key(payload.get("name"), payload.get("desc"))
+        name = str(payload.get("name") or "").strip()
+        with self._lock:
+            for task in self._open_tasks.get(key[0], []):
+                if task_matches(task, name, key[1]):
+                    return "existing", task
+            future = self._creating.get(key)
+            if future is not None:
+                # Та же задача уже создаётся по параллельному отчёту этого хоста.
+                return "existing", future
+            future = self._pool.submit(self._create_task, key, payload)
+            self._creating[key] = future
+            return "created", future
+
+    def _create_task(self, key: TaskKey, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            created = self.client.create_task(payload)
+            task = extract_task_object(created) or {"name": payload.get("name"), "desc": payload.get("desc")}
+            with self._lock:
+                self._open_tasks.setdefault(key[0], []).append(task)
+                self.stats["tasks_created"] += 1
+            return task
+        finally:
+            with self._lock:
+                self._creating.pop(key, None)
+
+    def _close_task(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Открытая задача из индекса закрывается и убирается из него; None, если такой задачи нет.
+        key = self._task_key(payload.get("name"), payload.get("desc"))
+        name = str(payload.get("name") or "").strip()
+        with self._lock:
+            tasks = self._open_tasks.get(key[0], [])
+            task = next((task for task in tasks if task.get("uuid") and task_matches(task, name, key[1])), None)
+            if task is None:
+                return None
+            tasks.remove(task)
+        try:
+            self.client.close_task(task["uuid"])
+        except BaseException:
+            with self._lock:
+                self._open_tasks.setdefault(key[0], []).append(task)
+            raise
+        with self._lock:
+            self.stats["tasks_closed"] += 1
+        return task
+
+    def submit(self, report: AuditReport, resolved: Sequence[AuditResult] = ()) -> Dict[str, Any]:
+        """Синхронизирует отчёт агента: актив хоста и задачи по FAIL-результатам.
+
+        resolved — прошлые FAIL-результаты проверок, перешедших в OK (режим
+        --delta-sync агента): их открытые задачи закрываются. Возвращает сводку
+        с check_id созданных, уже открытых и закрытых задач и списком
+        несинхронизированных задач в формате fallback-файла агента.
+        """
+        self.refresh_index()
+        fields, asset_name = build_asset_fields(self.assets_cfg, report.host)
+        if not asset_name:
+            raise ValueError("Asset name is missing; set securitm.assets.import_name_field")
+        asset = self.ensure_asset(fields, asset_name)
+        asset_uuid = asset.get("uuid")
+        with self._lock:
+            self.stats["reports"] += 1
+
+        summary: Dict[str, Any] = {"asset_uuid": asset_uuid, "created": [], "existing": [], "closed": [], "unsynced": []}
+        if not self.tasks_cfg.get("enabled", True):
+            return summary
+
+        waiting: List[Tuple[str, Dict[str, Any], str, Union[Dict[str, Any], Future]]] = []
+        for result in report.results:
+            if result.status != Status.FAIL:
+                continue
+            payload = build_task_payload(result, self.tasks_cfg, report.host, asset_uuid)
+            kind, value = self._sync_task(payload)
+            waiting.append((result.check_id, payload, kind, value))
+
+        for check_id, payload, kind, value in waiting:
+            if isinstance(value, Future):
+                try:
+                    value.result(timeout=self.wait_timeout)
+                except Exception as exc:
+                    logger.error("Failed to sync task for %s: %s", check_id, exc)
+                    summary["unsynced"].append(
+                        {"check_id": check_id, "host": dict(report.host), "payload": payload, "error": str(exc)}
+                    )
+                    continue
+            if kind == "existing":
+                with self._lock:
+                    self.stats["tasks_existing"] += 1
+            summary[kind].append(check_id)
+
+        for result in resolved:
+            payload = build_task_payload(result, self.tasks_cfg, report.host, asset_uuid)
+            try:
+                task = self._close_task(payload)
+            except (requests.RequestException, RuntimeError, ValueError) as exc:
+                logger.error("Failed to close task for %s: %s", result.check_id, exc)
+                summary["unsynced"].append(
+                    {
+                        "check_id": result.check_id,
+                        "host": dict(report.host),
+                        "payload": payload,
+                        "action": "close",
+                        "error": str(exc),
+                    }
+                )
+                continue
+            if task is not None:
+                summary["closed"].append(result.check_id)
+        return summary
+
+    def close(self) -> None:
+        self._flush_assets()
+        self._pool.shutdown(wait=True)
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    server: "GatewayServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path != HEALTH_PATH:
+            self._send(404, {"error": "Not found"})
+            return
+        gateway = self.server.gateway
+        self._send(200, {"status": "ok", "stats": dict(gateway.stats), "cache": gateway.client.cache_metrics()})
+
+    def do_POST(self) -> None:
+        if self.path != REPORTS_PATH:
+            self._send(404, {"error": "Not found"})
+            return
+        if not self._authorized():
+            self._send(401, {"error": "Unauthorized"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_REPORT_BYTES:
+            self._send(413 if length > 0 else 400, {"error": "Invalid report size"})
+            return
+        try:
+            data = json.loads(self.rfile.read(length))
+            report = AuditReport.from_dict(data)
+            resolved = [AuditResult.from_dict(item) for item in data.get("resolved") or []]
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            self._send(400, {"error": f"Invalid report: {exc}"})
+            return
+        try:
+            summary = self.server.gateway.submit(report, resolved)
+        except (requests.RequestException, RuntimeError, ValueError, TimeoutError, FutureTimeoutError) as exc:
+            # Ошибка SecurITM: агент сохранит задачи в fallback-файл и повторит позже.
+            logger.error("Gateway sync failed for %s: %s", report.host.get("hostname"), exc)
+            self._send(502, {"error": str(exc)})
+            return
+        self._send(200, summary)
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        header = self.headers.get("Authorization") or ""
+        return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+    def _send(self, status: int, payload: Mapping[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+class GatewayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        gateway: SyncGateway,
+        token: Optional[str] = None,
+        tls_cert: Optional[str] = None,
+        tls_key: Optional[str] = None,
+    ) -> None:
+        super().__init__(address, _GatewayHandler)
+        self.gateway = gateway
+        self.token = token
+        if tls_cert:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(tls_cert, tls_key)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+
+
+class GatewayClient:
+    """Отправка отчёта агента в шлюз вместо прямых вызовов SecurITM."""
+
+    def __init__(self, url: str, token: Optional[str] = None, verify_ssl: bool = True, timeout: int = 120) -> None:
+        self.url = url.rstrip("/") + REPORTS_PATH
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def submit_report(self, report: AuditReport, resolved: Sequence[AuditResult] = ()) -> Dict[str, Any]:
+        # resolved — прошлые FAIL исправленных проверок: шлюз закроет их задачи.
+        body = report.to_dict()
+        if resolved:
+            body["resolved"] = [result.to_dict() for result in resolved]
+        response = self.session.post(self.url, json=body, verify=self.verify_ssl, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,117 @@
+# Потоковый разбор JSON-ответов SecurITM: элементы списка без загрузки всего тела.
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+# Ключи, под которыми API отдаёт список объектов: {"data": [...]}, {"data": {"objects": [...]}}, {"items": [...]}.
+ITEM_KEYS = ("data", "objects", "items")
+_WHITESPACE = " \t\r\n"
+_COMPACT_AT = 1 << 16
+
+
+class _Reader:
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                # Разобранное начало буфера отбрасываем: в памяти остаётся текущий элемент и хвост чанка.
+                if self._pos >= _COMPACT_AT:
+                    self._buffer = self._buffer[self._pos :]
+                    self._pos = 0
+                self._buffer += chunk
+                return True
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> None:
+        if self.peek() != expected:
+            raise ValueError(f"Expected {expected!r} at offset {self._pos} of JSON stream")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Число в конце буфера может продолжиться в следующем чанке.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _array_items(reader: _Reader) -> Iterator[Dict[str, Any]]:
+    reader.take("[")
+    while True:
+        char = reader.peek()
+        if char == "]":
+            reader.take("]")
+            return
+        if char == ",":
+            reader.take(",")
+            continue
+        item = reader.value()
+        if isinstance(item, dict):
+            yield item
+
+
+def _object_items(reader: _Reader) -> Iterator[Dict[str, Any]]:
+    reader.take("{")
+    found = False
+    while True:
+        char = reader.peek()
+        if char == "}":
+            reader.take("}")
+            return
+        if char == ",":
+            reader.take(",")
+            continue
+        key = reader.value()
+        reader.take(":")
+        char = reader.peek()
+        if not found and key in ITEM_KEYS and char == "[":
+            found = True
+            yield from _array_items(reader)
+        elif not found and key == "data" and char == "{":
+            for item in _object_items(reader):
+                found = True
+                yield item
+        else:
+            reader.value()
+
+
+def iter_json_items(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Объекты первого списка ответа API по мере поступления текста.
+
+    Поддерживает те же формы ответа, что и SecurITMClient._extract_items:
+    список верхнего уровня, data, data.objects, items и objects. В памяти
+    держится только текущий элемент; остальные поля ответа пропускаются.
+    """
+    reader = _Reader(chunks)
+    char = reader.peek()
+    if char == "[":
+        yield from _array_items(reader)
+    elif char == "{":
+        yield from _object_items(reader)
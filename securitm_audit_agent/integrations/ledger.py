@@ -0,0 +1,172 @@
+# Локальный журнал задач SecurITM: повторный FAIL находит задачу без запроса к API.
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from securitm_audit_agent.integrations.payloads import task_matches
+
+DEFAULT_RECONCILE_SECONDS = 7 * 24 * 3600
+# Срок доверия записи должен быть больше интервала запусков агента, иначе ежедневный
+# запуск всегда промахивается мимо журнала; закрытые задачи всё равно убирает reconcile.
+DEFAULT_LEDGER_TTL_SECONDS = DEFAULT_RECONCILE_SECONDS
+LEDGER_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    # Запись через временный файл и os.replace: прерванная запись не портит прежнее содержимое.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(data, stream, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@dataclass
+class LedgerEntry:
+    asset: str
+    name: str
+    host: str
+    task_uuid: Optional[str]
+    is_done: bool
+    checked_at: float
+
+
+class TaskLedger:
+    """Соответствие (актив, нормализованное имя задачи, хост) → задача в SecurITM.
+
+    Запись подтверждается сервером при создании или найденной открытой
+    задаче и хранится, только если сервер вернул uuid задачи. Пока запись
+    открыта и моложе ttl_seconds, клиент не ищет задачу в API; ttl_seconds
+    должен быть больше интервала запусков агента. Старые записи
+    перепроверяются поиском по одной, а reconcile раз в reconcile_seconds
+    сверяет весь журнал с открытыми задачами и удаляет записи закрытых задач.
+    Журнал хранится в JSON-файле и пишется атомарно.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = DEFAULT_LEDGER_TTL_SECONDS,
+        reconcile_seconds: float = DEFAULT_RECONCILE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self.reconciled_at = 0.0
+        self.hits = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, LedgerEntry] = {}
+        self._load()
+
+    @staticmethod
+    def key(asset: Optional[str], name: str, host: Optional[str]) -> str:
+        return "\x1f".join((asset or "", name, host or ""))
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            # Испорченный журнал не должен ломать синхронизацию: задачи найдутся запросами к API.
+            logger.warning("Task ledger %s is unreadable, starting empty: %s", self.path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != LEDGER_VERSION:
+            logger.warning("Task ledger %s has unsupported format, starting empty", self.path)
+            return
+        self.reconciled_at = float(data.get("reconciled_at") or 0.0)
+        for item in data.get("entries") or []:
+            try:
+                entry = LedgerEntry(**item)
+            except TypeError:
+                continue
+            self._entries[self.key(entry.asset, entry.name, entry.host)] = entry
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": LEDGER_VERSION,
+                "reconciled_at": self.reconciled_at,
+                "entries": [asdict(entry) for entry in self._entries.values()],
+            }
+        write_json_atomic(self.path, data)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, asset: Optional[str], name: str, host: Optional[str]) -> Optional[LedgerEntry]:
+        """Открытая запись, которой можно верить без запроса к API, иначе None."""
+        with self._lock:
+            entry = self._entries.get(self.key(asset, name, host))
+            if entry is None or entry.is_done or self._clock() - entry.checked_at >= self.ttl_seconds:
+                return None
+            self.hits += 1
+            return entry
+
+    def record(self, asset: Optional[str], name: str, host: Optional[str], task: Dict[str, Any]) -> None:
+        task_uuid = task.get("uuid") or task.get("id")
+        if not task_uuid:
+            # Без uuid запись не подтверждена сервером: следующий запуск найдёт задачу поиском.
+            return
+        with self._lock:
+            self._entries[self.key(asset, name, host)] = LedgerEntry(
+                asset=asset or "",
+                name=name,
+                host=host or "",
+                task_uuid=task_uuid,
+                is_done=task.get("is_done") not in (0, False, None),
+                checked_at=self._clock(),
+            )
+
+    def reconcile_due(self) -> bool:
+        return bool(self._entries) and self._clock() - self.reconciled_at >= self.reconcile_seconds
+
+    def reconcile(self, client: Any) -> int:
+        """Сверяет журнал с открытыми задачами сервера; возвращает число удалённых записей.
+
+        Открытые задачи запрашиваются один раз на каждое имя из журнала.
+        """
+        with self._lock:
+            by_name: Dict[str, Dict[str, LedgerEntry]] = {}
+            for key, entry in self._entries.items():
+                by_name.setdefault(entry.name, {})[key] = entry
+        removed = 0
+        for name, entries in by_name.items():
+            open_tasks = list(client.iter_open_tasks(name))
+            now = self._clock()
+            for key, entry in entries.items():
+                match = None
+                for task in open_tasks:
+                    if entry.task_uuid:
+                        if task.get("uuid") == entry.task_uuid:
+                            match = task
+                            break
+                    elif task_matches(task, name, entry.host or None):
+                        match = task
+                        break
+                with self._lock:
+                    if match is None:
+                        self._entries.pop(key, None)
+                        removed += 1
+                    else:
+                        entry.task_uuid = match.get("uuid") or entry.task_uuid
+                        entry.is_done = False
+                        entry.checked_at = now
+        self.reconciled_at = self._clock()
+        return removed
@@ -0,0 +1,148 @@
+# Подготовка данных для SecurITM: поля импорта актива и задачи по результатам FAIL.
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from securitm_audit_agent.core.report import AuditResult
+
+_STATUS_PREFIX_RE = re.compile(r"^\[(?P<status>[A-Z]+)\]\s+(?P<rest>.+)$")
+_HOST_LINE_RE = re.compile(r"^Host:\s*(?P<host>.+)$", re.MULTILINE)
+
+
+def render_fields(fields: Mapping[str, Any], values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Рендерит поля для импорт-шаблона SecurITM.
+
+    Если значение поля — строка, применяем format_map(values),
+    чтобы поддерживать шаблоны вида "{hostname}" / "{fqdn}" / "{ip}".
+    Остальные типы (числа/булевы/вложенные структуры) оставляем как есть.
+    """
+    rendered: Dict[str, Any] = {}
+    for key, value in fields.items():
+        if isinstance(value, str):
+            rendered[key] = value.format_map(values)
+        else:
+            rendered[key] = value
+    return rendered
+
+
+def build_asset_fields(assets_cfg: Mapping[str, Any], host: Mapping[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Поля импорта актива хоста и имя, по которому актив ищется в SecurITM."""
+    values = {
+        "hostname": host.get("hostname"),
+        "fqdn": host.get("fqdn"),
+        "ip": host.get("ip") or "",
+    }
+    rendered_fields = render_fields(assets_cfg.get("import_fields", {}), values)
+    import_name_field = assets_cfg.get("import_name_field")
+    if import_name_field:
+        asset_name = str(rendered_fields.get(import_name_field, ""))
+    else:
+        asset_name = str(rendered_fields.get("name") or rendered_fields.get("Название") or "")
+    return rendered_fields, asset_name
+
+
+def build_task_payload(
+    result: AuditResult,
+    tasks_cfg: Mapping[str, Any],
+    host: Mapping[str, Any],
+    asset_uuid: Optional[str],
+) -> Dict[str, Any]:
+    author_name = tasks_cfg.get("author_name", "audit_agent")
+    desc_template = tasks_cfg.get(
+        "desc_template",
+        "Author: {author}\\nHost: {hostname}\\nCheck: {check_id}\\nStatus: {status}",
+    )
+    name_template = tasks_cfg.get("name_template", "[{status}] {check_id}")
+    desc_max_length = int(tasks_cfg.get("desc_max_length", 5000))
+
+    values = {
+        "author": author_name,
+        "hostname": host.get("hostname") or "",
+        "fqdn": host.get("fqdn") or "",
+        "ip": host.get("ip") or "",
+        "check_id": result.check_id,
+        "status": result.status.value,
+        "message": result.message,
+        "evidence": result.evidence or "",
+        "remediation": result.remediation,
+        "severity": result.severity,
+    }
+
+    name = name_template.format_map(values)
+    desc = desc_template.format_map(values)
+    if len(desc) > desc_max_length:
+        desc = desc[:desc_max_length]
+
+    payload: Dict[str, Any] = {
+        "name": name,
+        "desc": desc,
+        "is_done": 0,
+    }
+
+    author_uuid = tasks_cfg.get("author_uuid") or None
+    responsible_uuid = tasks_cfg.get("responsible_uuid") or None
+    priority = tasks_cfg.get("priority")
+    deadline_days = tasks_cfg.get("deadline_days")
+
+    if author_uuid:
+        payload["author_uuid"] = author_uuid
+    if responsible_uuid:
+        payload["responsible_uuid"] = responsible_uuid
+    if priority is not None:
+        payload["priority"] = int(priority)
+    if deadline_days:
+        deadline = date.today() + timedelta(days=int(deadline_days))
+        payload["deadline_at"] = deadline.strftime("%d.%m.%Y")
+    if asset_uuid:
+        payload["assets"] = [asset_uuid]
+
+    return payload
+
+
+def normalize_task_name(name: str) -> str:
+    """Имя задачи без скобок статуса: "[FAIL] check" -> "FAIL check"."""
+    normalized = name.strip()
+    match = _STATUS_PREFIX_RE.match(normalized)
+    if not match:
+        return normalized
+    return f"{match.group('status')} {match.group('rest').strip()}"
+
+
+def extract_host_from_desc(desc: Any) -> Optional[str]:
+    """Хост из строки "Host: ..." описания задачи, в нижнем регистре."""
+    if not isinstance(desc, str):
+        return None
+    match = _HOST_LINE_RE.search(desc)
+    if not match:
+        return None
+    host = match.group("host").strip().lower()
+    return host or None
+
+
+def task_matches(task: Mapping[str, Any], name: str, host_name: Optional[str] = None) -> bool:
+    """Открытая задача с тем же нормализованным именем и (если задан) тем же хостом."""
+    task_name = str(task.get("name") or "").strip()
+    if normalize_task_name(task_name) != normalize_task_name(name):
+        return False
+    is_done = task.get("is_done")
+    if is_done not in (0, False, None):
+        return False
+    if host_name:
+        task_host = extract_host_from_desc(task.get("desc"))
+        if task_host != host_name:
+            return False
+    return True
+
+
+def extract_task_object(payload: Any) -> Optional[Dict[str, Any]]:
+    """Объект задачи из ответа API: сам ответ или его data, если это не список."""
+    if isinstance(payload, dict):
+        if any(key in payload for key in ("uuid", "id", "name")):
+            return payload
+        data = payload.get("data")
+        if isinstance(data, dict) and not isinstance(data.get("objects"), list):
+            if any(key in data for key in ("uuid", "id", "name")):
+                return data
+    return None
@@ -0,0 +1,206 @@
+# Сверка задач SecurITM по отчётам всего парка: создать, закрыть или оставить.
+from __future__ import annotations
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import requests
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport
+from securitm_audit_agent.integrations.assets import AssetBatchSync
+from securitm_audit_agent.integrations.payloads import (
+    build_asset_fields,
+    build_task_payload,
+    extract_host_from_desc,
+    normalize_task_name,
+)
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+
+TASK_PAGE_SIZE = 100
+TASK_PAGE_PREFETCH = 2
+
+# Ключ задачи в индексе: нормализованное имя и хост из строки "Host:" описания.
+TaskKey = Tuple[str, str]
+
+logger = logging.getLogger(__name__)
+
+
+def load_reports(directory: str) -> List[AuditReport]:
+    """JSON-отчёты хостов из каталога; для каждого хоста берётся самый свежий отчёт."""
+    latest: Dict[str, AuditReport] = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            report = AuditReport.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Skipping report %s: %s", path, exc)
+            continue
+        hostname = str(report.host.get("hostname") or "").strip().lower()
+        if not hostname:
+            logger.warning("Skipping report %s: host.hostname is missing", path)
+            continue
+        current = latest.get(hostname)
+        if current is None or report.finished_at > current.finished_at:
+            latest[hostname] = report
+    return list(latest.values())
+
+
+@dataclass
+class ReconcilePlan:
+    create: List[Dict[str, Any]] = field(default_factory=list)
+    close: List[Dict[str, Any]] = field(default_factory=list)
+    duplicates: List[Dict[str, Any]] = field(default_factory=list)
+    keep: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "create": len(self.create),
+            "close": len(self.close),
+            "duplicates": len(self.duplicates),
+            "keep": self.keep,
+        }
+
+
+class FleetReconciler:
+    """Сверка открытых задач тенанта с последними отчётами всех хостов.
+
+    Открытые задачи загружаются одним перебором страниц и индексируются по
+    (имени, хосту) — так же, как их ищет агент. Для каждого результата
+    отчёта строится ожидаемая задача FAIL: у FAIL без открытой задачи она
+    создаётся, у OK с открытой задачей — закрывается; лишние открытые задачи
+    с тем же ключом закрываются как дубли. ERROR и SKIP задачи не меняют,
+    задачи хостов без отчёта не трогаются.
+    """
+
+    def __init__(
+        self,
+        client: SecurITMClient,
+        securitm_cfg: Mapping[str, Any],
+        concurrency: int = 8,
+        asset_sync: Optional[AssetBatchSync] = None,
+    ) -> None:
+        self.client = client
+        self.assets_cfg: Mapping[str, Any] = securitm_cfg.get("assets", {})
+        self.tasks_cfg: Mapping[str, Any] = securitm_cfg.get("tasks", {})
+        self.concurrency = max(concurrency, 1)
+        self.asset_sync = asset_sync or AssetBatchSync(client, self.assets_cfg["import_template"])
+        self.asset_stats: Dict[str, Any] = {}
+
+    def _task_key(self, name: Any, desc: Any) -> Optional[TaskKey]:
+        host = extract_host_from_desc(desc)
+        if not host:
+            return None
+        return normalize_task_name(str(name or "")), host
+
+    def open_task_index(self) -> Dict[TaskKey, List[Dict[str, Any]]]:
+        filters = {"fields": [{"is_done": 0, "op": "eq"}]}
+        index: Dict[TaskKey, List[Dict[str, Any]]] = {}
+        tasks = self.client.iter_tasks(filters=filters, per_page=TASK_PAGE_SIZE, prefetch=TASK_PAGE_PREFETCH)
+        for task in tasks:
+            if task.get("is_done") not in (0, False, None):
+                continue
+            key = self._task_key(task.get("name"), task.get("desc"))
+            if key is not None:
+                index.setdefault(key, []).append(task)
+        return index
+
+    def asset_uuids(self, reports: List[AuditReport]) -> Dict[str, Optional[str]]:
+        """UUID актива каждого хоста; отсутствующие и изменившиеся активы импортируются пакетами."""
+        name_field = self.assets_cfg.get("name_field", "name")
+        fields_by_host: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for report in reports:
+            hostname = str(report.host.get("hostname"))
+            fields_by_host[hostname] = build_asset_fields(self.assets_cfg, report.host)
+
+        def load() -> Dict[str, str]:
+            known: Dict[str, str] = {}
+            assets = self.client.iter_assets(self.assets_cfg["asset_type_slug"], ["uuid", "name", name_field])
+            for asset in assets:
+                name = asset.get(name_field) or asset.get("name")
+                if isinstance(name, str) and asset.get("uuid"):
+                    known[name.strip().lower()] = asset["uuid"]
+            return known
+
+        known = load()
+        assets = {name: fields for fields, name in fields_by_host.values() if name}
+        missing = [name for name in assets if name.strip().lower() not in known]
+        self.asset_stats = self.asset_sync.sync(assets, force=missing)
+        if missing and self.asset_stats["imported"]:
+            known = load()
+        return {
+            hostname: known.get(name.strip().lower()) if name else None
+            for hostname, (_fields, name) in fields_by_host.items()
+        }
+
+    def plan(
+        self,
+        reports: List[AuditReport],
+        index: Dict[TaskKey, List[Dict[str, Any]]],
+        asset_uuids: Mapping[str, Optional[str]],
+    ) -> ReconcilePlan:
+        plan = ReconcilePlan()
+        seen: Dict[TaskKey, bool] = {}
+        for report in reports:
+            hostname = str(report.host.get("hostname"))
+            for result in report.results:
+                if result.status not in (Status.FAIL, Status.OK):
+                    continue
+                # Для OK строим ту же задачу, что была бы создана по FAIL, чтобы найти её в индексе.
+                failed = replace(result, status=Status.FAIL)
+                payload = build_task_payload(failed, self.tasks_cfg, report.host, asset_uuids.get(hostname))
+                key = self._task_key(payload["name"], payload["desc"])
+                if key is None or key in seen:
+                    continue
+                seen[key] = True
+                tasks = index.get(key, [])
+                plan.duplicates.extend(tasks[1:])
+                if result.status == Status.FAIL:
+                    if tasks:
+                        plan.keep += 1
+                    else:
+                        plan.create.append(payload)
+                elif tasks:
+                    plan.close.append(tasks[0])
+        return plan
+
+    def apply(self, plan: ReconcilePlan) -> Dict[str, Any]:
+        """Выполняет план пулом из concurrency потоков; возвращает число выполненных и ошибки."""
+        actions: List[Tuple[str, Callable[[], Any]]] = []
+        for payload in plan.create:
+            actions.append(("created", lambda payload=payload: self.client.create_task(payload)))
+        for task in plan.close + plan.duplicates:
+            if task.get("uuid"):
+                actions.append(("closed", lambda task=task: self.client.close_task(task["uuid"])))
+        done: Dict[str, Any] = {"created": 0, "closed": 0, "errors": []}
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="securitm-reconcile")
+        with pool:
+            futures = {pool.submit(action): kind for kind, action in actions}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except (requests.RequestException, RuntimeError, ValueError) as exc:
+                    logger.error("Reconcile action failed: %s", exc)
+                    done["errors"].append(str(exc))
+                else:
+                    done[futures[future]] += 1
+        return done
+
+    def run(self, reports: List[AuditReport], dry_run: bool = False) -> Dict[str, Any]:
+        index = self.open_task_index()
+        asset_uuids = self.asset_uuids(reports) if not dry_run else {}
+        plan = self.plan(reports, index, asset_uuids)
+        summary: Dict[str, Any] = {
+            "hosts": len(reports),
+            "open_tasks": sum(len(tasks) for tasks in index.values()),
+        }
+        if self.asset_stats:
+            summary["assets"] = self.asset_stats
+        summary.update(plan.summary())
+        if dry_run:
+            return summary
+        summary.update(self.apply(plan))
+        return summary
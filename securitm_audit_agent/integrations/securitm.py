@@ -1,24 +1,52 @@
 # Клиент для API SecurITM (активы и задачи).
 from __future__ import annotations
 
+import codecs
+import itertools
 import json
 import logging
-import re
-from typing import Any, Dict, Iterable, List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
 
+from securitm_audit_agent.integrations.cache import DEFAULT_CACHE_MAX_BYTES, CacheEntry, ResponseCache, cache_key
+from securitm_audit_agent.integrations.jsonstream import iter_json_items
+from securitm_audit_agent.integrations.ledger import TaskLedger
+from securitm_audit_agent.integrations.payloads import (
+    extract_host_from_desc,
+    extract_task_object,
+    normalize_task_name,
+    task_matches,
+)
+
+STREAM_CHUNK_SIZE = 1 << 16
+
 
 class SecurITMClient:
-    _STATUS_PREFIX_RE = re.compile(r"^\[(?P<status>[A-Z]+)\]\s+(?P<rest>.+)$")
-    _HOST_LINE_RE = re.compile(r"^Host:\s*(?P<host>.+)$", re.MULTILINE)
 
-    def __init__(self, base_url: str, token: str, verify_ssl: bool = True, timeout: int = 30) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        verify_ssl: bool = True,
+        timeout: int = 30,
+        cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        ledger: Optional[TaskLedger] = None,
+    ) -> None:
         self.logger = logging.getLogger(__name__)
         self.base_url = base_url.rstrip("/")
         self.verify_ssl = verify_ssl
         self.timeout = timeout
+        # GET-ответы кешируются на время жизни клиента (один прогон) и сбрасываются после POST.
+        self.cache: Optional[ResponseCache] = ResponseCache(cache_ttl) if cache else None
+        self.cache_max_bytes = cache_max_bytes
+        # Журнал задач: повторный FAIL с известной открытой задачей не ищется в API.
+        self.ledger = ledger
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -27,16 +55,102 @@ class SecurITMClient:
             }
         )
 
-    def get_assets(self, asset_type_slug: str, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
-        # API выгрузки активов по типу (slug).
+    def get_assets(
+        self,
+        asset_type_slug: str,
+        fields: Optional[Iterable[str]] = None,
+        cache: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_assets(asset_type_slug, fields, cache=cache))
+
+    def iter_assets(
+        self,
+        asset_type_slug: str,
+        fields: Optional[Iterable[str]] = None,
+        cache: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Активы типа по мере чтения ответа.
+
+        API выгрузки активов отдаёт все активы одним ответом без страниц, поэтому
+        тело читается потоком и разбирается по элементам: память не зависит от
+        числа активов, а прерванный перебор закрывает соединение. С cache=True
+        (и включённым кешем клиента) выгрузка не больше cache_max_bytes
+        буферизуется целиком и кешируется: это нужно только тем, кто читает
+        выгрузку повторно и выигрывает от ответа 304.
+        """
         url = f"{self.base_url}/api/v1/assets/get/{asset_type_slug}"
         if fields:
             url = f"{url}?{'&'.join(fields)}"
         self.logger.debug("SecurITM GET assets url=%s", url)
-        response = self.session.get(url, verify=self.verify_ssl, timeout=self.timeout)
-        self._raise_for_status(response)
-        payload = response.json()
-        return self._extract_items(payload)
+        chunks, encoding, response = self._asset_body(url, cache)
+        try:
+            yield from iter_json_items(self._iter_text(chunks, encoding))
+        finally:
+            if response is not None:
+                response.close()
+
+    def _asset_body(self, url: str, cache: bool) -> Tuple[Iterable[bytes], str, Optional[requests.Response]]:
+        # Тело выгрузки: из кеша (без открытого ответа) или потоком из живого ответа.
+        if cache and self.cache is not None:
+            live: List[Tuple[Iterable[bytes], str, requests.Response]] = []
+            entry, source = self.cache.get_or_fetch(
+                cache_key(url),
+                lambda stale: self._fetch_asset_body(url, stale, live),
+            )
+            if live:
+                return live[0]
+            if entry is not None:
+                self._log_cache(source, url)
+                body, encoding = entry.value
+                view = memoryview(body)
+                slices = (view[offset : offset + STREAM_CHUNK_SIZE] for offset in range(0, len(body), STREAM_CHUNK_SIZE))
+                return slices, encoding, None
+        response = self.session.get(url, verify=self.verify_ssl, timeout=self.timeout, stream=True)
+        try:
+            self._raise_for_status(response)
+        except requests.HTTPError:
+            response.close()
+            raise
+        return response.iter_content(chunk_size=STREAM_CHUNK_SIZE), response.encoding or "utf-8", response
+
+    def _fetch_asset_body(
+        self,
+        url: str,
+        stale: Optional[CacheEntry],
+        live: List[Tuple[Iterable[bytes], str, requests.Response]],
+    ) -> Optional[CacheEntry]:
+        response = self.session.get(
+            url,
+            headers=self._revalidation_headers(stale),
+            verify=self.verify_ssl,
+            timeout=self.timeout,
+            stream=True,
+        )
+        if stale is not None and response.status_code == 304:
+            response.close()
+            return stale
+        try:
+            self._raise_for_status(response)
+        except requests.HTTPError:
+            response.close()
+            raise
+        encoding = response.encoding or "utf-8"
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        body = bytearray()
+        for chunk in chunks:
+            body += chunk
+            if len(body) > self.cache_max_bytes:
+                # Выгрузка больше лимита кеша: остаток читается потоком, тело целиком в памяти не держим.
+                live.append((itertools.chain([bytes(body)], chunks), encoding, response))
+                return None
+        response.close()
+        return CacheEntry((bytes(body), encoding), response.headers.get("ETag"), 0.0)
+
+    def _iter_text(self, chunks: Iterable[bytes], encoding: str) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for chunk in chunks:
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
 
     def find_asset_by_name(
         self,
@@ -48,8 +162,7 @@ class SecurITMClient:
         if name_field not in requested_fields:
             requested_fields.append(name_field)
 
-        assets = self.get_assets(asset_type_slug, fields=requested_fields)
-        for asset in assets:
+        for asset in self.iter_assets(asset_type_slug, fields=requested_fields):
             candidate = asset.get(name_field) or asset.get("name")
             if not isinstance(candidate, str):
                 continue
@@ -65,7 +178,11 @@ class SecurITMClient:
             "assets": assets,
         }
         self.logger.debug("SecurITM POST assets/import payload=%s", self._short_json(payload))
-        response = self.session.post(url, json=payload, verify=self.verify_ssl, timeout=self.timeout)
+        try:
+            response = self.session.post(url, json=payload, verify=self.verify_ssl, timeout=self.timeout)
+        finally:
+            # Импорт мог примениться даже при ошибке ответа — кеш выгрузок активов больше не верен.
+            self.invalidate_cache(f"{self.base_url}/api/v1/assets/get/")
         self._raise_for_status(response)
         return response.json() if response.content else {}
 
@@ -93,6 +210,24 @@ class SecurITMClient:
         raise RuntimeError("Asset import did not return a visible asset")
 
     def create_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._post_task(payload)
+        finally:
+            self.invalidate_cache(f"{self.base_url}/api/v2/tasks")
+
+    def close_task(self, task_uuid: str) -> Dict[str, Any]:
+        # Закрытие задачи — обновление is_done через endpoint /update, парный /create.
+        url = f"{self.base_url}/api/v2/tasks/update"
+        payload = {"uuid": task_uuid, "is_done": 1}
+        self.logger.debug("SecurITM POST tasks/update payload=%s", self._short_json(payload))
+        try:
+            response = self.session.post(url, json=payload, verify=self.verify_ssl, timeout=self.timeout)
+        finally:
+            self.invalidate_cache(f"{self.base_url}/api/v2/tasks")
+        self._raise_for_status(response)
+        return response.json() if response.content else {}
+
+    def _post_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         # В облаке создание задач идёт через отдельный endpoint /create.
         url = f"{self.base_url}/api/v2/tasks/create"
         self.logger.debug("SecurITM POST tasks payload=%s", self._short_json(payload))
@@ -132,6 +267,15 @@ class SecurITMClient:
         page: int = 1,
         per_page: int = 100,
     ) -> List[Dict[str, Any]]:
+        return self.get_task_page(filters, page, per_page)[0]
+
+    def get_task_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        page: int = 1,
+        per_page: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[int]]:
+        """Страница задач: объекты, общее число задач и номер последней страницы (если сервер их сообщает)."""
         url = f"{self.base_url}/api/v2/tasks"
         params: Dict[str, Any] = {
             "page": page,
@@ -140,35 +284,165 @@ class SecurITMClient:
         if filters:
             params["filters"] = json.dumps(filters, ensure_ascii=False)
         self.logger.debug("SecurITM GET tasks params=%s", self._short_json(params))
-        response = self.session.get(url, params=params, verify=self.verify_ssl, timeout=self.timeout)
+        if self.cache is None:
+            payload = self._fetch_json(url, params, None).value
+        else:
+            entry, source = self.cache.get_or_fetch(
+                cache_key(url, params),
+                lambda stale: self._fetch_json(url, params, stale),
+            )
+            self._log_cache(source, url)
+            payload = entry.value if entry is not None else None
+        return (self._extract_items(payload), *self._extract_page_markers(payload))
+
+    def _fetch_json(self, url: str, params: Dict[str, Any], stale: Optional[CacheEntry]) -> CacheEntry:
+        response = self.session.get(
+            url,
+            params=params,
+            headers=self._revalidation_headers(stale),
+            verify=self.verify_ssl,
+            timeout=self.timeout,
+        )
+        if stale is not None and getattr(response, "status_code", None) == 304:
+            return stale
         self._raise_for_status(response)
-        payload = response.json()
-        return self._extract_items(payload)
+        headers = getattr(response, "headers", None) or {}
+        return CacheEntry(response.json(), headers.get("ETag"), 0.0)
 
-    def find_open_task(self, name: str, host_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    def _revalidation_headers(self, stale: Optional[CacheEntry]) -> Optional[Dict[str, str]]:
+        if stale is None or not stale.etag:
+            return None
+        return {"If-None-Match": stale.etag}
+
+    def invalidate_cache(self, url_prefix: str = "") -> None:
+        # Пустой префикс помечает устаревшими все записи: следующие GET ревалидируются по ETag.
+        if self.cache is not None:
+            self.cache.invalidate(url_prefix)
+
+    def _log_cache(self, source: str, url: str) -> None:
+        if source != "miss":
+            self.logger.debug("SecurITM cache %s url=%s", source, url)
+
+    def cache_metrics(self) -> Dict[str, Any]:
+        """Счётчики кеша ответов и доля запросов, обслуженных без передачи тела."""
+        if self.cache is None:
+            return {}
+        metrics: Dict[str, Any] = dict(self.cache.stats)
+        metrics["hit_ratio"] = round(self.cache.hit_ratio(), 3)
+        return metrics
+
+    def log_cache_stats(self) -> None:
+        if self.cache is not None:
+            self.logger.debug("SecurITM cache stats: %s", self._short_json(self.cache_metrics()))
+
+    def iter_tasks(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        prefetch: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """Задачи со всех страниц, страница запрашивается по мере перебора.
+
+        prefetch > 0 загружает столько следующих страниц параллельно, пока
+        обрабатывается текущая; после последней страницы до prefetch запросов
+        оказываются лишними. В памяти не больше prefetch + 1 страниц.
+
+        Перебор заканчивается на пустой странице или по total/last_page из
+        ответа. Короткая страница концом не считается: сервер может ограничить
+        perPage меньшим значением, чем запрошено.
+        """
+        if prefetch <= 0:
+            page = 1
+            seen = 0
+            previous: Optional[List[Dict[str, Any]]] = None
+            while True:
+                items, total, last_page = self.get_task_page(filters, page, per_page)
+                if not items or self._repeated_page(items, previous):
+                    return
+                yield from items
+                seen += len(items)
+                if self._last_page(page, seen, total, last_page):
+                    return
+                previous = items
+                page += 1
+
+        pool = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="securitm-pages")
+        pending: Deque[Future] = deque()
+        next_page = 1
+        try:
+            for _ in range(prefetch + 1):
+                pending.append(pool.submit(self.get_task_page, filters, next_page, per_page))
+                next_page += 1
+            previous = None
+            page = seen = 0
+            while pending:
+                items, total, last_page = pending.popleft().result()
+                page += 1
+                if not items or self._repeated_page(items, previous):
+                    return
+                yield from items
+                seen += len(items)
+                if self._last_page(page, seen, total, last_page):
+                    return
+                previous = items
+                pending.append(pool.submit(self.get_task_page, filters, next_page, per_page))
+                next_page += 1
+        finally:
+            # Досрочная остановка перебора отменяет ещё не начатые запросы страниц.
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    @staticmethod
+    def _last_page(page: int, seen: int, total: Optional[int], last_page: Optional[int]) -> bool:
+        return (total is not None and seen >= total) or (last_page is not None and page >= last_page)
+
+    def _repeated_page(self, items: List[Dict[str, Any]], previous: Optional[List[Dict[str, Any]]]) -> bool:
+        # Сервер без поддержки page отдаёт одну и ту же страницу — иначе перебор не закончится.
+        if items and items == previous:
+            self.logger.warning("SecurITM tasks pagination returned a repeated page; stopping")
+            return True
+        return False
+
+    def iter_open_tasks(self, name: str) -> Iterator[Dict[str, Any]]:
         filters: Dict[str, Any] = {
             "fields": [
-                {"name": self._normalize_task_name(name), "op": "eq"},
+                {"name": normalize_task_name(name), "op": "eq"},
                 {"is_done": 0, "op": "eq"},
             ]
         }
-        tasks = self.get_tasks(filters=filters, per_page=100)
-        for task in tasks:
-            if self._task_matches(task, name, host_name):
+        # Перебор всех страниц: совпадение по хосту может быть дальше первой сотни задач.
+        return self.iter_tasks(filters=filters, per_page=100)
+
+    def find_open_task(self, name: str, host_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        for task in self.iter_open_tasks(name):
+            if task_matches(task, name, host_name):
                 return task
         return None
 
     def create_task_if_missing(self, payload: Dict[str, Any]) -> tuple[Dict[str, Any], bool]:
         name = str(payload.get("name") or "").strip()
-        host_name = self._extract_host_from_desc(payload.get("desc"))
+        host_name = extract_host_from_desc(payload.get("desc"))
+        assets = payload.get("assets") or [None]
+        asset = assets[0]
+        ledger_name = normalize_task_name(name)
+
+        if name and self.ledger is not None:
+            entry = self.ledger.lookup(asset, ledger_name, host_name)
+            if entry is not None:
+                # Задача подтверждена сервером недавно и не закрыта — повторный FAIL без запросов к API.
+                return {"uuid": entry.task_uuid, "name": name}, False
 
         if name:
             existing = self.find_open_task(name, host_name=host_name)
             if existing:
+                self._record_task(asset, ledger_name, host_name, existing)
                 return existing, False
 
         created = self.create_task(payload)
-        created_task = self._extract_task_object(created)
+        created_task = extract_task_object(created)
+        if name and created_task:
+            self._record_task(asset, ledger_name, host_name, created_task)
         if created_task:
             return created_task, True
         if created:
@@ -177,10 +451,28 @@ class SecurITMClient:
                 f"{self.base_url}/api/v2/tasks/create",
                 self._short_json(created),
             )
-        # Дедупликация выполняется только одним предварительным GET по имени.
-        # После POST дополнительных GET не делаем.
+        # Дедупликация идёт до POST: журнал задач (без запросов), затем поиск открытой задачи
+        # по имени — из кеша ответов, а при промахе GET по страницам. После POST дополнительных GET не делаем.
         return {"name": name} if name else {}, True
 
+    def close_open_task(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Закрывает открытую задачу с именем и хостом из payload; None, если такой задачи нет."""
+        name = str(payload.get("name") or "").strip()
+        if not name:
+            return None
+        host_name = extract_host_from_desc(payload.get("desc"))
+        assets = payload.get("assets") or [None]
+        task = self.find_open_task(name, host_name=host_name)
+        if task is None or not task.get("uuid"):
+            return None
+        self.close_task(task["uuid"])
+        self._record_task(assets[0], normalize_task_name(name), host_name, {**task, "is_done": 1})
+        return task
+
+    def _record_task(self, asset: Optional[str], name: str, host_name: Optional[str], task: Dict[str, Any]) -> None:
+        if self.ledger is not None:
+            self.ledger.record(asset, name, host_name, task)
+
     def _extract_items(self, payload: Any) -> List[Dict[str, Any]]:
         if isinstance(payload, list):
             return [item for item in payload if isinstance(item, dict)]
@@ -205,44 +497,36 @@ class SecurITMClient:
 
         return []
 
+    def _extract_page_markers(self, payload: Any) -> Tuple[Optional[int], Optional[int]]:
+        # total и last_page ищутся в data, meta и на верхнем уровне ответа.
+        if not isinstance(payload, dict):
+            return None, None
+        sources = [payload.get("data"), payload.get("meta"), payload]
+        markers: List[Optional[int]] = []
+        for key in ("total", "last_page"):
+            value = next(
+                (
+                    source[key]
+                    for source in sources
+                    if isinstance(source, dict) and isinstance(source.get(key), int) and not isinstance(source[key], bool)
+                ),
+                None,
+            )
+            markers.append(value)
+        return markers[0], markers[1]
+
+    # Разбор задач вынесен в payloads; методы оставлены для совместимости.
     def _extract_task_object(self, payload: Any) -> Optional[Dict[str, Any]]:
-        if isinstance(payload, dict):
-            if any(key in payload for key in ("uuid", "id", "name")):
-                return payload
-            data = payload.get("data")
-            if isinstance(data, dict) and not isinstance(data.get("objects"), list):
-                if any(key in data for key in ("uuid", "id", "name")):
-                    return data
-        return None
+        return extract_task_object(payload)
 
     def _task_matches(self, task: Dict[str, Any], name: str, host_name: Optional[str] = None) -> bool:
-        task_name = str(task.get("name") or "").strip()
-        if self._normalize_task_name(task_name) != self._normalize_task_name(name):
-            return False
-        is_done = task.get("is_done")
-        if is_done not in (0, False, None):
-            return False
-        if host_name:
-            task_host = self._extract_host_from_desc(task.get("desc"))
-            if task_host != host_name:
-                return False
-        return True
+        return task_matches(task, name, host_name)
 
     def _normalize_task_name(self, name: str) -> str:
-        normalized = name.strip()
-        match = self._STATUS_PREFIX_RE.match(normalized)
-        if not match:
-            return normalized
-        return f"{match.group('status')} {match.group('rest').strip()}"
+        return normalize_task_name(name)
 
     def _extract_host_from_desc(self, desc: Any) -> Optional[str]:
-        if not isinstance(desc, str):
-            return None
-        match = self._HOST_LINE_RE.search(desc)
-        if not match:
-            return None
-        host = match.group("host").strip().lower()
-        return host or None
+        return extract_host_from_desc(desc)
 
     def _raise_for_status(self, response: requests.Response) -> None:
         try:
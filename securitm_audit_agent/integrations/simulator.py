@@ -0,0 +1,280 @@
+# Локальный симулятор API SecurITM (активы и задачи) для нагрузочных и сквозных тестов.
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ASSETS_GET_PREFIX = "/api/v1/assets/get/"
+ASSETS_IMPORT_PATH = "/api/v1/assets/import"
+TASKS_PATH = "/api/v2/tasks"
+TASKS_CREATE_PATH = "/api/v2/tasks/create"
+TASKS_UPDATE_PATH = "/api/v2/tasks/update"
+# Куда симулятор перенаправляет создание задачи при redirect_task_create (как облако со слешем в конце).
+TASKS_CREATE_REDIRECT = TASKS_CREATE_PATH + "/"
+SIMULATED_CHECKS = 50
+
+_STATUS_PREFIX_RE = re.compile(r"^\[(?P<status>[A-Z]+)\]\s+(?P<rest>.+)$")
+
+
+def _normalize_name(name: str) -> str:
+    # Фильтр по имени принимает и "[FAIL] x", и "FAIL x" — так клиент ищет открытые задачи.
+    normalized = name.strip()
+    match = _STATUS_PREFIX_RE.match(normalized)
+    if not match:
+        return normalized
+    return f"{match.group('status')} {match.group('rest').strip()}"
+
+
+def simulated_host(index: int) -> str:
+    return f"host-{index:05d}"
+
+
+@dataclass(frozen=True)
+class SimulatorProfile:
+    """Поведение симулятора: задержки, доля ошибок и объём данных.
+
+    latency_ms ± jitter_ms — задержка перед каждым ответом; error_rate и
+    throttle_rate — доли ответов 500 и 429 (с Retry-After); при
+    redirect_task_create создание задачи сначала отвечает 307; при etags
+    выгрузки отдают ETag и отвечают 304 на совпавший If-None-Match;
+    max_per_page ограничивает perPage выгрузки задач, как это делают серверы с
+    лимитом на размер страницы. assets и
+    tasks — размер начального набора: активы simulated_host(i), задачи по
+    SIMULATED_CHECKS проверкам на хост, из них открыта каждая третья.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    redirect_task_create: bool = False
+    etags: bool = True
+    max_per_page: Optional[int] = None
+    assets: int = 0
+    tasks: int = 0
+    seed: Optional[int] = None
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    server: "SecurITMSimulator"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        parts = urlsplit(self.path)
+        if parts.path.startswith(ASSETS_GET_PREFIX):
+            self._handle("assets.get", lambda: (200, self.server.assets_body()), etag="assets")
+        elif parts.path == TASKS_PATH:
+            query = parse_qs(parts.query)
+            self._handle("tasks.get", lambda: (200, self.server.tasks_body(query)), etag="tasks")
+        else:
+            self._send(404, b'{"message": "Not found"}')
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        path = urlsplit(self.path).path
+        if path == ASSETS_IMPORT_PATH:
+            self._handle("assets.import", lambda: (200, self.server.import_assets(json.loads(raw or b"{}"))))
+        elif path == TASKS_CREATE_PATH and self.server.profile.redirect_task_create:
+            self._handle("tasks.create.redirect", lambda: (307, b""), {"Location": TASKS_CREATE_REDIRECT})
+        elif path in (TASKS_CREATE_PATH, TASKS_CREATE_REDIRECT):
+            self._handle("tasks.create", lambda: (200, self.server.create_task(json.loads(raw or b"{}"))))
+        elif path == TASKS_UPDATE_PATH:
+            self._handle("tasks.update", lambda: self.server.update_task(json.loads(raw or b"{}")))
+        else:
+            self._send(404, b'{"message": "Not found"}')
+
+    def _handle(
+        self,
+        endpoint: str,
+        respond: Any,
+        headers: Optional[Dict[str, str]] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        server = self.server
+        server.count(endpoint)
+        delay, fault = server.draw()
+        if delay:
+            time.sleep(delay)
+        # Сбой выбирается до обработки: ответ 429/500 не меняет данные симулятора.
+        if fault == 429:
+            server.count("throttled")
+            self._send(429, b'{"message": "Too Many Requests"}', {"Retry-After": str(server.profile.retry_after)})
+            return
+        if fault == 500:
+            server.count("errors")
+            self._send(500, b'{"message": "Simulated server error"}')
+            return
+        if etag and server.profile.etags:
+            tag = server.etag(etag)
+            if self.headers.get("If-None-Match") == tag:
+                server.count("not_modified")
+                self._send(304, b"", {"ETag": tag})
+                return
+            headers = {**(headers or {}), "ETag": tag}
+        status, body = respond()
+        self._send(status, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class SecurITMSimulator(ThreadingHTTPServer):
+    """HTTP-симулятор эндпоинтов /api/v1/assets/* и /api/v2/tasks* в памяти.
+
+    calls считает обращения по эндпоинтам (assets.get, assets.import,
+    tasks.get, tasks.create, tasks.create.redirect, tasks.update) и число ответов
+    throttled/errors/not_modified. Запускается в фоновом потоке через with или start().
+    """
+
+    daemon_threads = True
+
+    def __init__(self, profile: SimulatorProfile = SimulatorProfile(), host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), _SimulatorHandler)
+        self.profile = profile
+        self.calls: Counter = Counter()
+        self.assets: List[Dict[str, Any]] = []
+        self.tasks: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._random = random.Random(profile.seed)
+        self._tasks_by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self._assets_body: Optional[bytes] = None
+        # Версии наборов данных для ETag: меняются при каждом импорте актива и создании задачи.
+        self._versions: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._generate()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _generate(self) -> None:
+        hosts = max(self.profile.assets, 1)
+        for index in range(self.profile.assets):
+            self.assets.append({"uuid": f"asset-{index + 1}", "name": simulated_host(index)})
+        for index in range(self.profile.tasks):
+            host = simulated_host(index % hosts)
+            check_id = f"check_{(index // hosts) % SIMULATED_CHECKS}"
+            self.add_task(
+                {
+                    "name": f"[FAIL] {check_id}",
+                    "desc": f"Author: audit_agent\nHost: {host}\nCheck: {check_id}\nStatus: FAIL",
+                    "is_done": 0 if index % 3 == 0 else 1,
+                }
+            )
+
+    def count(self, endpoint: str) -> None:
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        profile = self.profile
+        with self._lock:
+            delay = profile.latency_ms
+            if profile.jitter_ms:
+                delay += self._random.uniform(-profile.jitter_ms, profile.jitter_ms)
+            roll = self._random.random()
+        fault = None
+        if roll < profile.throttle_rate:
+            fault = 429
+        elif roll < profile.throttle_rate + profile.error_rate:
+            fault = 500
+        return max(delay, 0.0) / 1000.0, fault
+
+    def add_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            stored = {"uuid": f"task-{len(self.tasks) + 1}", "is_done": 0, **task}
+            self.tasks.append(stored)
+            self._tasks_by_name.setdefault(_normalize_name(str(stored.get("name") or "")), []).append(stored)
+            self._versions["tasks"] += 1
+        return stored
+
+    def etag(self, dataset: str) -> str:
+        with self._lock:
+            return f'"{dataset}-{self._versions[dataset]}"'
+
+    def assets_body(self) -> bytes:
+        # Выгрузка всех активов сериализуется один раз до следующего импорта.
+        with self._lock:
+            if self._assets_body is None:
+                self._assets_body = json.dumps({"data": self.assets}, ensure_ascii=False).encode("utf-8")
+            return self._assets_body
+
+    def import_assets(self, payload: Dict[str, Any]) -> bytes:
+        with self._lock:
+            by_name = {str(asset.get("name")).lower(): asset for asset in self.assets}
+            for fields in payload.get("assets") or []:
+                name = fields.get("name") or fields.get("Название")
+                # Импорт по шаблону обновляет актив с тем же именем, а не создаёт второй.
+                existing = by_name.get(str(name).lower())
+                if existing is not None:
+                    existing.update(fields)
+                    continue
+                asset = {**fields, "uuid": f"asset-{len(self.assets) + 1}", "name": name}
+                self.assets.append(asset)
+                by_name[str(name).lower()] = asset
+            self._assets_body = None
+            self._versions["assets"] += 1
+        return b"{}"
+
+    def create_task(self, payload: Dict[str, Any]) -> bytes:
+        return json.dumps(self.add_task(payload), ensure_ascii=False).encode("utf-8")
+
+    def update_task(self, payload: Dict[str, Any]) -> Tuple[int, bytes]:
+        with self._lock:
+            for task in self.tasks:
+                if task.get("uuid") == payload.get("uuid"):
+                    task.update({key: value for key, value in payload.items() if key != "uuid"})
+                    self._versions["tasks"] += 1
+                    return 200, json.dumps(task, ensure_ascii=False).encode("utf-8")
+        return 404, b'{"message": "Task not found"}'
+
+    def tasks_body(self, query: Dict[str, List[str]]) -> bytes:
+        page = max(int(query.get("page", ["1"])[0]), 1)
+        per_page = max(int(query.get("perPage", ["100"])[0]), 1)
+        if self.profile.max_per_page:
+            per_page = min(per_page, self.profile.max_per_page)
+        filters = json.loads(query.get("filters", ["{}"])[0])
+        conditions: Dict[str, Any] = {}
+        for condition in filters.get("fields", []):
+            conditions.update({key: value for key, value in condition.items() if key != "op"})
+        name = conditions.pop("name", None)
+        with self._lock:
+            candidates = self._tasks_by_name.get(_normalize_name(str(name)), []) if name is not None else self.tasks
+            matched = [task for task in candidates if all(task.get(key) == value for key, value in conditions.items())]
+        objects = matched[(page - 1) * per_page : page * per_page]
+        return json.dumps({"data": {"total": len(matched), "objects": objects}}, ensure_ascii=False).encode("utf-8")
+
+    def start(self) -> "SecurITMSimulator":
+        self._thread = threading.Thread(target=self.serve_forever, name="securitm-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "SecurITMSimulator":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
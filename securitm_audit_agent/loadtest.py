@@ -0,0 +1,211 @@
+# Нагрузочный прогон синхронизации хостов с SecurITM (клиент + _sync_fail_tasks) на симуляторе API.
+"""
+Драйвер нагрузки для интеграции с SecurITM.
+
+Каждый «хост» выполняет ту же синхронизацию, что и агент: ensure_asset
+через SecurITMClient и _sync_fail_tasks по FAIL-результатам отчёта. Хосты
+синхронизируются параллельно (concurrency), у каждого свой клиент, поэтому
+обращения к API считаются на одну синхронизацию. По умолчанию поднимается
+встроенный симулятор с заданным профилем; --url направляет нагрузку на
+уже запущенный симулятор или стенд.
+
+Результат — JSON со сводкой: запросы в секунду, p50/p99 задержки, число
+вызовов API на синхронизацию хоста, разбивка по эндпоинтам и кодам ответа
+и счётчики кеша ответов клиента.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+
+from securitm_audit_agent.cli import _sync_fail_tasks
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.cache import hit_ratio
+from securitm_audit_agent.integrations.payloads import build_asset_fields
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator, SimulatorProfile, simulated_host
+
+LOADTEST_ASSETS_CFG: Dict[str, Any] = {
+    "asset_type_slug": "computer",
+    "import_template": "Audit Agent Computers",
+    "name_field": "name",
+    "import_name_field": "name",
+    "import_fields": {"name": "{hostname}", "IP": "{ip}"},
+}
+LOADTEST_TASKS_CFG: Dict[str, Any] = {
+    "author_name": "audit_agent",
+    "desc_template": "Author: {author}\nHost: {hostname}\nCheck: {check_id}\nStatus: {status}",
+}
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    # Ближайший ранг: p99 из 100 значений — 99-е по возрастанию.
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(-(-pct * len(ordered) // 100)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _endpoint(method: str, url: str) -> str:
+    path = urlsplit(url).path.rstrip("/")
+    if path.startswith("/api/v1/assets/get"):
+        path = "/api/v1/assets/get"
+    return f"{method} {path}"
+
+
+@dataclass
+class LoadTestResult:
+    hosts: int
+    duration_seconds: float
+    latencies: List[float] = field(default_factory=list)
+    calls_per_sync: List[int] = field(default_factory=list)
+    endpoints: Counter = field(default_factory=Counter)
+    status_codes: Counter = field(default_factory=Counter)
+    cache: Counter = field(default_factory=Counter)
+    failed_syncs: int = 0
+    unsynced_tasks: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        requests_total = len(self.latencies)
+        calls = self.calls_per_sync or [0]
+        return {
+            "hosts": self.hosts,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "requests": requests_total,
+            "requests_per_second": round(requests_total / self.duration_seconds, 1) if self.duration_seconds else 0.0,
+            "latency_p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "latency_p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "calls_per_sync_mean": round(sum(calls) / len(calls), 2),
+            "calls_per_sync_max": max(calls),
+            "failed_syncs": self.failed_syncs,
+            "unsynced_tasks": self.unsynced_tasks,
+            "endpoints": dict(sorted(self.endpoints.items())),
+            "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+            "cache": {**dict(sorted(self.cache.items())), "hit_ratio": round(hit_ratio(self.cache), 3)},
+        }
+
+
+def _host_report(index: int, fails: int) -> AuditReport:
+    now = datetime.now(timezone.utc)
+    hostname = simulated_host(index)
+    host = {"hostname": hostname, "fqdn": f"{hostname}.local", "ip": f"10.0.{index // 256 % 256}.{index % 256}"}
+    results = [
+        AuditResult(f"check_{number}", Status.FAIL, "Simulated failure", None, "medium", "")
+        for number in range(fails)
+    ]
+    return AuditReport(host=host, started_at=now, finished_at=now, agent_version="loadtest", results=results)
+
+
+def run_load_test(
+    base_url: str,
+    hosts: int,
+    concurrency: int = 8,
+    fails_per_host: int = 5,
+    assets_cfg: Mapping[str, Any] = LOADTEST_ASSETS_CFG,
+    tasks_cfg: Mapping[str, Any] = LOADTEST_TASKS_CFG,
+    timeout: int = 30,
+) -> LoadTestResult:
+    """Синхронизирует hosts хостов параллельно и собирает статистику запросов."""
+    lock = threading.Lock()
+    result = LoadTestResult(hosts=hosts, duration_seconds=0.0)
+
+    def sync_host(index: int) -> None:
+        client = SecurITMClient(base_url, token="loadtest", timeout=timeout)
+        calls = 0
+
+        def record(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+            nonlocal calls
+            calls += 1
+            with lock:
+                result.latencies.append(response.elapsed.total_seconds())
+                result.endpoints[_endpoint(response.request.method or "", response.url)] += 1
+                result.status_codes[response.status_code] += 1
+
+        client.session.hooks["response"].append(record)
+        report = _host_report(index, fails_per_host)
+        fields, asset_name = build_asset_fields(assets_cfg, report.host)
+        unsynced: List[Dict[str, Any]] = []
+        failed = False
+        try:
+            asset = client.ensure_asset(
+                asset_type_slug=assets_cfg["asset_type_slug"],
+                name_field=assets_cfg.get("name_field", "name"),
+                template=assets_cfg["import_template"],
+                import_fields=fields,
+                asset_name=asset_name,
+            )
+        except (requests.RequestException, RuntimeError, ValueError):
+            failed = True
+        else:
+            unsynced = _sync_fail_tasks(client, report, tasks_cfg, report.host, asset.get("uuid"))
+        with lock:
+            result.calls_per_sync.append(calls)
+            result.failed_syncs += int(failed)
+            result.unsynced_tasks += len(unsynced)
+            if client.cache is not None:
+                result.cache.update(client.cache.stats)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        list(pool.map(sync_host, range(hosts)))
+    result.duration_seconds = time.monotonic() - started
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test of SecurITM host sync against the API simulator")
+    parser.add_argument("--url", default=None, help="Target an already running simulator or test stand")
+    parser.add_argument("--hosts", type=int, default=100, help="Host syncs to run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fails-per-host", type=int, default=5)
+    parser.add_argument("--assets", type=int, default=50_000, help="Simulator: preloaded assets")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Simulator: preloaded tasks")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of HTTP 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of HTTP 429 responses")
+    parser.add_argument("--redirects", action="store_true", help="Answer task creation with 307 first")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log sync errors of every host")
+    args = parser.parse_args(argv)
+    # Ошибки синхронизации уже учтены в сводке; построчный лог при сотнях хостов только мешает.
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, format="%(levelname)s %(message)s")
+
+    simulator: Optional[SecurITMSimulator] = None
+    base_url = args.url
+    if not base_url:
+        profile = SimulatorProfile(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            redirect_task_create=args.redirects,
+            assets=args.assets,
+            tasks=args.tasks,
+            seed=args.seed,
+        )
+        simulator = SecurITMSimulator(profile).start()
+        base_url = simulator.url
+    try:
+        result = run_load_test(base_url, args.hosts, args.concurrency, args.fails_per_host)
+    finally:
+        if simulator is not None:
+            simulator.stop()
+    print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,18 @@
 # Экспорт платформенного контекста.
+from securitm_audit_agent.platform.async_context import AsyncAuditContext
 from securitm_audit_agent.platform.context import AuditContext
-from securitm_audit_agent.platform.protocols import AuditContextProtocol, CommandResultProtocol
+from securitm_audit_agent.platform.protocols import (
+    AsyncAuditContextProtocol,
+    AuditContextProtocol,
+    CommandResultProtocol,
+    ScanEntryProtocol,
+)
 
-__all__ = ["AuditContext", "AuditContextProtocol", "CommandResultProtocol"]
+__all__ = [
+    "AsyncAuditContext",
+    "AsyncAuditContextProtocol",
+    "AuditContext",
+    "AuditContextProtocol",
+    "CommandResultProtocol",
+    "ScanEntryProtocol",
+]
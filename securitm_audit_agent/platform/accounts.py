@@ -0,0 +1,83 @@
+# Потоковый разбор /etc/passwd, /etc/shadow и /etc/group.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from securitm_audit_agent.platform.protocols import AuditContextProtocol
+
+PASSWD_PATH = "/etc/passwd"
+SHADOW_PATH = "/etc/shadow"
+GROUP_PATH = "/etc/group"
+
+
+@dataclass(frozen=True, slots=True)
+class PasswdEntry:
+    name: str
+    uid: str
+    gid: str
+    home: str
+    shell: str
+
+
+@dataclass(frozen=True, slots=True)
+class ShadowEntry:
+    name: str
+    password: str
+
+
+@dataclass(frozen=True, slots=True)
+class GroupEntry:
+    name: str
+    gid: str
+    members: Tuple[str, ...]
+
+
+def _records(lines: Iterable[str], min_fields: int) -> Iterator[List[str]]:
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        parts = line.split(":")
+        if len(parts) >= min_fields:
+            yield parts
+
+
+def _field(parts: List[str], index: int) -> str:
+    return parts[index] if index < len(parts) else ""
+
+
+def _passwd(lines: Iterable[str]) -> Iterator[PasswdEntry]:
+    # Строки без home/shell не отбрасываем: для проверки UID 0 достаточно первых трёх полей.
+    for parts in _records(lines, 3):
+        yield PasswdEntry(parts[0], parts[2], _field(parts, 3), _field(parts, 5), _field(parts, 6))
+
+
+def _shadow(lines: Iterable[str]) -> Iterator[ShadowEntry]:
+    for parts in _records(lines, 2):
+        yield ShadowEntry(parts[0], parts[1])
+
+
+def _group(lines: Iterable[str]) -> Iterator[GroupEntry]:
+    for parts in _records(lines, 1):
+        members = tuple(item for item in _field(parts, 3).strip().split(",") if item)
+        yield GroupEntry(parts[0], _field(parts, 2), members)
+
+
+def iter_passwd(ctx: AuditContextProtocol, path: str = PASSWD_PATH) -> Optional[Iterator[PasswdEntry]]:
+    """Записи passwd по одной, без загрузки файла целиком; None, если файл не читается.
+
+    На хостах с перечислением sssd/LDAP в passwd бывают сотни тысяч строк,
+    поэтому записи не собираются в список.
+    """
+    lines = ctx.iter_lines(path)
+    return _passwd(lines) if lines is not None else None
+
+
+def iter_shadow(ctx: AuditContextProtocol, path: str = SHADOW_PATH) -> Optional[Iterator[ShadowEntry]]:
+    lines = ctx.iter_lines(path)
+    return _shadow(lines) if lines is not None else None
+
+
+def iter_group(ctx: AuditContextProtocol, path: str = GROUP_PATH) -> Optional[Iterator[GroupEntry]]:
+    lines = ctx.iter_lines(path)
+    return _group(lines) if lines is not None else None
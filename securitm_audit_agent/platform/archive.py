@@ -0,0 +1,536 @@
+# Аудит образов контейнеров напрямую из tar/OCI-архивов без распаковки.
+from __future__ import annotations
+
+import codecs
+import io
+import json
+import os
+import stat as stat_module
+import tarfile
+import threading
+import zlib
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from securitm_audit_agent.platform.context import CommandResult, ScanEntry
+from securitm_audit_agent.platform.governor import ResourceGovernor
+from securitm_audit_agent.platform.mounts import MountTable
+from securitm_audit_agent.platform.rootfs import RootfsHostFacts, is_host_only, resolve_in_root
+
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_XATTR_PREFIX = "SCHILY.xattr."
+_LINE_CHUNK = 1 << 16
+_TYPE_BITS = {
+    tarfile.REGTYPE: stat_module.S_IFREG,
+    tarfile.AREGTYPE: stat_module.S_IFREG,
+    tarfile.CONTTYPE: stat_module.S_IFREG,
+    tarfile.DIRTYPE: stat_module.S_IFDIR,
+    tarfile.SYMTYPE: stat_module.S_IFLNK,
+    tarfile.CHRTYPE: stat_module.S_IFCHR,
+    tarfile.BLKTYPE: stat_module.S_IFBLK,
+    tarfile.FIFOTYPE: stat_module.S_IFIFO,
+}
+
+
+class _Section(io.RawIOBase):
+    """Окно [start, start + size) в открытом файле: вложенный tar читается без копирования."""
+
+    def __init__(self, fd: int, start: int, size: int) -> None:
+        self._fd = fd
+        self._start = start
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        count = min(len(buffer), self._size - self._pos)
+        if count <= 0:
+            return 0
+        data = os.pread(self._fd, count, self._start + self._pos)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class _PlainLayer:
+    # Несжатый слой: данные файла читаются одним pread по смещению из индекса.
+    def __init__(self, fd: int, start: int) -> None:
+        self._fd = fd
+        self._start = start
+
+    def read(self, offset: int, size: int) -> bytes:
+        chunks: List[bytes] = []
+        while size > 0:
+            chunk = os.pread(self._fd, size, self._start + offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+class _CompressedLayer:
+    # Сжатый gzip-слой: seek по распакованному потоку, назад — с перераспаковкой с начала.
+    def __init__(self, archive: tarfile.TarFile) -> None:
+        self._archive = archive
+        self._lock = threading.Lock()
+
+    def read(self, offset: int, size: int) -> bytes:
+        fileobj = self._archive.fileobj
+        with self._lock:
+            fileobj.seek(offset)  # type: ignore[union-attr]
+            return fileobj.read(size)  # type: ignore[union-attr]
+
+
+def _iter_layer_lines(layer: Any, offset: int, size: int) -> Iterator[str]:
+    # Файл из слоя читается блоками: в памяти одновременно не больше блока и одной строки.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    tail = ""
+    end = offset + size
+    while offset < end:
+        chunk = layer.read(offset, min(_LINE_CHUNK, end - offset))
+        if not chunk:
+            break
+        offset += len(chunk)
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+@dataclass(slots=True)
+class _Member:
+    kind: str
+    mode: int
+    uid: int
+    gid: int
+    size: int
+    mtime: int
+    ino: int
+    layer: int = -1
+    offset: int = 0
+    linkname: Optional[str] = None
+    xattrs: Optional[Dict[str, bytes]] = None
+
+
+def _normalize(name: str) -> str:
+    parts = [part for part in name.split("/") if part and part != "."]
+    return "/" + "/".join(parts)
+
+
+def _split(path: str) -> Tuple[str, str]:
+    parent, _, name = path.rpartition("/")
+    return parent or "/", name
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent.rstrip('/')}/{name}"
+
+
+def _xattrs(info: tarfile.TarInfo) -> Optional[Dict[str, bytes]]:
+    values = {
+        key[len(_XATTR_PREFIX):]: value.encode("utf-8", "surrogateescape")
+        for key, value in info.pax_headers.items()
+        if key.startswith(_XATTR_PREFIX)
+    }
+    return values or None
+
+
+class ArchiveAuditContext:
+    """Контекст аудита поверх образа контейнера без распаковки на диск.
+
+    Поддерживаются: tar-слой (в том числе .tar.gz), tar от docker save
+    (manifest.json), OCI image layout в tar или каталоге (index.json). Один
+    проход по заголовкам tar строит индекс путь → (слой, смещение, размер)
+    с применением whiteout-файлов слоёв (.wh.<имя> и .wh..wh..opq). Чтение
+    файла — pread по смещению во внутреннем слое несжатого архива.
+
+    /proc и /sys, как и в RootfsAuditContext, берутся из host_values.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        agent_version: str,
+        host_values: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self.path = path
+        self.agent_version = agent_version
+        self.host_values = {str(key): str(value) for key, value in (host_values or {}).items()}
+        self._fds: List[int] = []
+        # Метаданные уже в индексе, ограничитель считает только чтения содержимого из архива.
+        self.governor: Optional[ResourceGovernor] = None
+        self.run_id = 0
+        self._layers: List[Any] = []
+        self._next_ino = 1
+        self._members: Dict[str, _Member] = {"/": self._dir_member()}
+        self._children: Dict[str, Set[str]] = {"/": set()}
+
+        file_stat = os.stat(path)
+        # Отдельный st_dev на архив: кеши по (dev, ino, mtime) не путают одинаковые пути разных образов.
+        self._dev = zlib.crc32(f"{os.path.realpath(path)}:{file_stat.st_size}:{file_stat.st_mtime_ns}".encode())
+        try:
+            self._load(path)
+        except Exception:
+            self.close()
+            raise
+        self._host_facts = RootfsHostFacts(self.read_file, path)
+        self._host_facts.start()
+
+    # --- построение индекса ---
+
+    def _load(self, path: str) -> None:
+        if os.path.isdir(path):
+            for blob in self._oci_layers(lambda name: self._read_dir_blob(path, name)):
+                blob_path = os.path.join(path, blob)
+                fd = self._open(blob_path)
+                self._add_layer(fd, 0, os.fstat(fd).st_size)
+            return
+
+        fd = self._open(path)
+        size = os.fstat(fd).st_size
+        if os.pread(fd, 2, 0) == _GZIP_MAGIC:
+            # Сжатый архив целиком — это один слой (blob из registry).
+            self._add_layer(fd, 0, size)
+            return
+
+        outer = tarfile.open(fileobj=io.BufferedReader(_Section(fd, 0, size), 1 << 16), mode="r:")
+        infos = list(outer)
+        by_name = {_normalize(info.name): info for info in infos}
+
+        def read_member(name: str) -> Optional[bytes]:
+            info = by_name.get(_normalize(name))
+            if info is None or not info.isfile():
+                return None
+            return os.pread(fd, info.size, info.offset_data)
+
+        if "/manifest.json" in by_name or ("/index.json" in by_name and "/oci-layout" in by_name):
+            for layer_name in self._image_layers(read_member):
+                info = by_name.get(_normalize(layer_name))
+                if info is None:
+                    raise ValueError(f"Layer {layer_name} not found in {path}")
+                self._add_layer(fd, info.offset_data, info.size)
+            return
+
+        # Обычный tar — единственный слой, индекс уже прочитан этим же проходом.
+        self._layers.append(_PlainLayer(fd, 0))
+        self._apply_layer(infos, len(self._layers) - 1)
+
+    def _open(self, path: str) -> int:
+        fd = os.open(path, os.O_RDONLY)
+        self._fds.append(fd)
+        return fd
+
+    def _read_dir_blob(self, root: str, name: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(root, name), "rb") as handle:
+                return handle.read()
+        except OSError:
+            return None
+
+    def _image_layers(self, read_member) -> List[str]:
+        manifest_raw = read_member("manifest.json")
+        if manifest_raw is not None:
+            # docker save: [{"Config": ..., "Layers": ["<id>/layer.tar", ...]}]
+            manifest = json.loads(manifest_raw)
+            if not manifest:
+                raise ValueError("Empty manifest.json")
+            return list(manifest[0].get("Layers") or [])
+        return self._oci_layers(read_member)
+
+    def _oci_layers(self, read_member) -> List[str]:
+        index_raw = read_member("index.json")
+        if index_raw is None:
+            raise ValueError("OCI layout without index.json")
+        document = json.loads(index_raw)
+        # Вложенные индексы (multi-arch) разворачиваем до первого манифеста образа.
+        for _depth in range(8):
+            manifests = document.get("manifests")
+            if not manifests:
+                break
+            digest = manifests[0]["digest"]
+            blob = read_member(_blob_path(digest))
+            if blob is None:
+                raise ValueError(f"Blob {digest} not found")
+            document = json.loads(blob)
+        return [_blob_path(layer["digest"]) for layer in document.get("layers") or []]
+
+    def _add_layer(self, fd: int, start: int, size: int) -> None:
+        magic = os.pread(fd, 4, start)
+        if magic.startswith(_ZSTD_MAGIC):
+            raise ValueError("zstd-compressed layers are not supported")
+        buffered = io.BufferedReader(_Section(fd, start, size), 1 << 16)
+        if magic.startswith(_GZIP_MAGIC):
+            archive = tarfile.open(fileobj=buffered, mode="r:gz")
+            self._layers.append(_CompressedLayer(archive))
+        else:
+            archive = tarfile.open(fileobj=buffered, mode="r:")
+            self._layers.append(_PlainLayer(fd, start))
+        self._apply_layer(archive, len(self._layers) - 1)
+
+    def _apply_layer(self, infos: Iterable[tarfile.TarInfo], layer: int) -> None:
+        # Whiteout-файлы слоя скрывают пути нижних слоёв, поэтому применяются до добавления.
+        opaque: List[str] = []
+        whiteouts: List[str] = []
+        added: List[Tuple[str, tarfile.TarInfo]] = []
+        for info in infos:
+            path = _normalize(info.name)
+            if path == "/":
+                continue
+            parent, name = _split(path)
+            if name == OPAQUE_WHITEOUT:
+                opaque.append(parent)
+            elif name.startswith(WHITEOUT_PREFIX):
+                whiteouts.append(_join(parent, name[len(WHITEOUT_PREFIX):]))
+            else:
+                added.append((path, info))
+
+        for directory in opaque:
+            for name in list(self._children.get(directory, ())):
+                self._remove(_join(directory, name))
+        for path in whiteouts:
+            self._remove(path)
+        for path, info in added:
+            self._add(path, info, layer)
+
+    def _dir_member(self) -> _Member:
+        member = _Member(kind="dir", mode=stat_module.S_IFDIR | 0o755, uid=0, gid=0, size=0, mtime=0, ino=self._next_ino)
+        self._next_ino += 1
+        return member
+
+    def _add(self, path: str, info: tarfile.TarInfo, layer: int) -> None:
+        if info.islnk():
+            target = self._members.get(_normalize(info.linkname))
+            if target is None:
+                return
+            # Жёсткая ссылка: те же данные и тот же inode.
+            member = replace(target)
+        else:
+            kind = "dir" if info.isdir() else "symlink" if info.issym() else "file" if info.isfile() else "other"
+            member = _Member(
+                kind=kind,
+                mode=_TYPE_BITS.get(info.type, stat_module.S_IFREG) | (info.mode & 0o7777),
+                uid=info.uid,
+                gid=info.gid,
+                size=info.size if kind == "file" else 0,
+                mtime=int(info.mtime),
+                ino=self._next_ino,
+                layer=layer if kind == "file" else -1,
+                offset=info.offset_data,
+                linkname=info.linkname if kind == "symlink" else None,
+                xattrs=_xattrs(info),
+            )
+            self._next_ino += 1
+
+        existing = self._members.get(path)
+        if existing is not None and existing.kind == "dir" and member.kind != "dir":
+            self._remove(path)
+        parent, name = _split(path)
+        self._ensure_dir(parent)
+        self._members[path] = member
+        self._children[parent].add(name)
+        if member.kind == "dir":
+            self._children.setdefault(path, set())
+
+    def _ensure_dir(self, path: str) -> None:
+        missing: List[str] = []
+        while path not in self._children:
+            missing.append(path)
+            path = _split(path)[0]
+        for directory in reversed(missing):
+            if directory in self._members:
+                # На месте каталога в нижнем слое был файл: новый слой его заменяет.
+                self._remove(directory)
+            parent, name = _split(directory)
+            self._members[directory] = self._dir_member()
+            self._children[directory] = set()
+            self._children[parent].add(name)
+
+    def _remove(self, path: str) -> None:
+        stack = [path]
+        parent, name = _split(path)
+        self._children.get(parent, set()).discard(name)
+        while stack:
+            current = stack.pop()
+            self._members.pop(current, None)
+            for child in self._children.pop(current, ()):
+                stack.append(_join(current, child))
+
+    # --- AuditContextProtocol ---
+
+    def _readlink(self, path: str) -> Optional[str]:
+        member = self._members.get(path)
+        return member.linkname if member is not None and member.kind == "symlink" else None
+
+    def _lookup(self, path: str, follow_symlinks: bool = True) -> Tuple[Optional[str], Optional[_Member]]:
+        if is_host_only(path):
+            return None, None
+        resolved = resolve_in_root(path, self._readlink, follow_symlinks)
+        if resolved is None or is_host_only(resolved):
+            return None, None
+        return resolved, self._members.get(resolved)
+
+    def _stat(self, member: _Member) -> os.stat_result:
+        mtime_ns = member.mtime * 1_000_000_000
+        return os.stat_result(
+            (
+                member.mode,
+                member.ino,
+                self._dev,
+                1,
+                member.uid,
+                member.gid,
+                member.size,
+                member.mtime,
+                member.mtime,
+                member.mtime,
+                float(member.mtime),
+                float(member.mtime),
+                float(member.mtime),
+                mtime_ns,
+                mtime_ns,
+                mtime_ns,
+            )
+        )
+
+    @property
+    def host_facts(self) -> Dict[str, Any]:
+        return self._host_facts.get()
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        if is_host_only(path):
+            value = self.host_values.get(path)
+            return value.encode("utf-8") if value is not None else None
+        _resolved, member = self._lookup(path)
+        if member is None or member.kind != "file":
+            return None
+        if self.governor is not None:
+            self.governor.acquire()
+        return self._layers[member.layer].read(member.offset, member.size)
+
+    def iter_lines(self, path: str) -> Optional[Iterator[str]]:
+        if is_host_only(path):
+            value = self.host_values.get(path)
+            return iter(value.splitlines()) if value is not None else None
+        _resolved, member = self._lookup(path)
+        if member is None or member.kind != "file":
+            return None
+        if self.governor is not None:
+            self.governor.acquire()
+        return _iter_layer_lines(self._layers[member.layer], member.offset, member.size)
+
+    def read_file(self, path: str) -> Optional[str]:
+        if is_host_only(path):
+            return self.host_values.get(path)
+        data = self.read_bytes(path)
+        return data.decode("utf-8", errors="ignore") if data is not None else None
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        _resolved, member = self._lookup(path)
+        return self._stat(member) if member is not None else None
+
+    def list_dir(self, path: str) -> Optional[list[str]]:
+        resolved, member = self._lookup(path)
+        if resolved is None or member is None or member.kind != "dir":
+            return None
+        return sorted(self._children.get(resolved, ()))
+
+    def scan_dir(
+        self,
+        path: str,
+        max_depth: Optional[int] = 0,
+        follow_symlinks: bool = True,
+    ) -> Optional[list[ScanEntry]]:
+        resolved, member = self._lookup(path)
+        if resolved is None or member is None or member.kind != "dir":
+            return None
+        entries: list[ScanEntry] = []
+        self._scan_into(resolved, path.rstrip("/"), 0, max_depth, follow_symlinks, entries)
+        return entries
+
+    def _scan_into(
+        self,
+        resolved: str,
+        path: str,
+        depth: int,
+        max_depth: Optional[int],
+        follow_symlinks: bool,
+        entries: list[ScanEntry],
+    ) -> None:
+        for name in sorted(self._children.get(resolved, ())):
+            member = self._members[_join(resolved, name)]
+            child = f"{path}/{name}"
+            is_symlink = member.kind == "symlink"
+            entry_stat = self.stat(child) if is_symlink and follow_symlinks else self._stat(member)
+            entries.append(
+                ScanEntry(
+                    path=child,
+                    name=name,
+                    depth=depth,
+                    is_dir=member.kind == "dir",
+                    is_symlink=is_symlink,
+                    stat=entry_stat,
+                )
+            )
+            if member.kind == "dir" and (max_depth is None or depth < max_depth):
+                self._scan_into(_join(resolved, name), child, depth + 1, max_depth, follow_symlinks, entries)
+
+    def read_link(self, path: str) -> Optional[str]:
+        _resolved, member = self._lookup(path, follow_symlinks=False)
+        return member.linkname if member is not None else None
+
+    def read_xattr(self, path: str, name: str) -> Optional[bytes]:
+        _resolved, member = self._lookup(path, follow_symlinks=False)
+        if member is None or not member.xattrs:
+            return None
+        return member.xattrs.get(name)
+
+    def mount_table(self) -> MountTable:
+        return MountTable([])
+
+    def run_cmd(self, args: list[str]) -> CommandResult:
+        return CommandResult(args=args, returncode=127, stdout="", stderr="Commands are not available in offline mode")
+
+    def close(self) -> None:
+        facts = getattr(self, "_host_facts", None)
+        if facts is not None:
+            # Фоновый сбор фактов читает архив: дожидаемся его до закрытия файлов.
+            facts.get()
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def __enter__(self) -> "ArchiveAuditContext":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _blob_path(digest: str) -> str:
+    algorithm, _, value = digest.partition(":")
+    return f"blobs/{algorithm}/{value}"
@@ -0,0 +1,82 @@
+# Асинхронная обёртка над контекстом аудита для работы на одном цикле событий.
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from securitm_audit_agent.platform.context import AuditContext, ByteView, CommandResult, ScanEntry
+from securitm_audit_agent.platform.mounts import MountTable
+from securitm_audit_agent.platform.protocols import AuditContextProtocol, CommandResultProtocol
+
+T = TypeVar("T")
+
+
+class AsyncAuditContext:
+    """Асинхронный доступ к данным хоста поверх любого синхронного контекста.
+
+    Блокирующий файловый ввод-вывод выполняется в пуле потоков цикла событий
+    (executor=None — пул по умолчанию), команды живого хоста запускаются через
+    asyncio.create_subprocess_exec и не занимают поток на время выполнения.
+    Офлайн-контексты со своим run_cmd вызываются как есть.
+    """
+
+    def __init__(self, ctx: AuditContextProtocol, executor: Optional[Executor] = None) -> None:
+        self.sync = ctx
+        self.agent_version = ctx.agent_version
+        self._executor = executor
+
+    async def run_sync(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def host_facts(self) -> Dict[str, Any]:
+        # Первое обращение ждёт фонового сбора фактов, поэтому тоже уходит в пул.
+        return await self.run_sync(lambda: self.sync.host_facts)
+
+    async def read_file(self, path: str) -> Optional[str]:
+        return await self.run_sync(self.sync.read_file, path)
+
+    async def read_bytes(self, path: str) -> Optional[ByteView]:
+        return await self.run_sync(self.sync.read_bytes, path)
+
+    async def stat(self, path: str) -> Optional[os.stat_result]:
+        return await self.run_sync(self.sync.stat, path)
+
+    async def list_dir(self, path: str) -> Optional[list[str]]:
+        return await self.run_sync(self.sync.list_dir, path)
+
+    async def scan_dir(
+        self,
+        path: str,
+        max_depth: Optional[int] = 0,
+        follow_symlinks: bool = True,
+    ) -> Optional[list[ScanEntry]]:
+        return await self.run_sync(self.sync.scan_dir, path, max_depth, follow_symlinks)
+
+    async def read_link(self, path: str) -> Optional[str]:
+        return await self.run_sync(self.sync.read_link, path)
+
+    async def read_xattr(self, path: str, name: str) -> Optional[bytes]:
+        return await self.run_sync(self.sync.read_xattr, path, name)
+
+    async def mount_table(self) -> MountTable:
+        return await self.run_sync(self.sync.mount_table)
+
+    async def run_cmd(self, args: list[str]) -> CommandResultProtocol:
+        if getattr(type(self.sync), "run_cmd", None) is not AuditContext.run_cmd:
+            return await self.run_sync(self.sync.run_cmd, args)
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        return CommandResult(
+            args=args,
+            returncode=process.returncode if process.returncode is not None else -1,
+            stdout=stdout.decode("utf-8", errors="ignore"),
+            stderr=stderr.decode("utf-8", errors="ignore"),
+        )
@@ -1,17 +1,26 @@
 # Контекст доступа к данным хоста для проверок.
 from __future__ import annotations
 
+import mmap
 import os
 import subprocess
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import IO, Any, Dict, Iterator, Optional, Union
 
-from securitm_audit_agent.platform.facts import (
-    get_fqdn,
-    get_hostname,
-    get_os_release,
-    get_primary_ip,
-)
+from securitm_audit_agent.platform.facts import DEFAULT_DNS_TIMEOUT, HostFacts
+from securitm_audit_agent.platform.governor import ResourceGovernor
+from securitm_audit_agent.platform.mounts import MountTable, read_mount_table
+
+
+# Содержимое файла как буфер байтов: mmap для обычных файлов, bytes для procfs и пустых.
+ByteView = Union[bytes, mmap.mmap]
+
+
+def _iter_handle_lines(handle: IO[str]) -> Iterator[str]:
+    # Файл закрывается, когда итерация завершена или итератор удалён.
+    with handle:
+        for line in handle:
+            yield line.rstrip("\r\n")
 
 
 @dataclass
@@ -22,35 +31,203 @@ class CommandResult:
     stderr: str
 
 
+@dataclass
+class ScanEntry:
+    path: str
+    name: str
+    depth: int
+    is_dir: bool
+    is_symlink: bool
+    stat: Optional[os.stat_result]
+
+
 class AuditContext:
-    def __init__(self, agent_version: str) -> None:
+    def __init__(self, agent_version: str, dns_timeout: float = DEFAULT_DNS_TIMEOUT) -> None:
         self.agent_version = agent_version
-        self._host_facts = self._collect_host_facts()
+        self._mount_table: Optional[MountTable] = None
+        # Ограничитель файловых операций; задаётся снаружи, например из audit.governor.
+        self.governor: Optional[ResourceGovernor] = None
+        # Номер прогона задаёт runner: кеши проверок привязаны к прогону, а не к контексту.
+        self.run_id = 0
+        # Факты собираются в фоне параллельно с проверками, старт аудита не ждёт DNS.
+        self._host_facts = self._make_host_facts(dns_timeout)
+        self._host_facts.start()
 
     @property
     def host_facts(self) -> Dict[str, Any]:
         # Возвращаем копию, чтобы факты нельзя было случайно изменить снаружи.
-        return dict(self._host_facts)
+        return self._host_facts.get()
+
+    def _host_path(self, path: str, follow_symlinks: bool = True) -> Optional[str]:
+        # Точка расширения для офлайн-контекстов: перевод пути аудита в путь на хосте.
+        return path
+
+    def _make_host_facts(self, dns_timeout: float) -> HostFacts:
+        return HostFacts(self.read_file, dns_timeout)
+
+    def _throttle(self, count: int = 1) -> None:
+        if self.governor is not None:
+            self.governor.acquire(count)
 
     def read_file(self, path: str) -> Optional[str]:
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        self._throttle()
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            with open(host_path, "r", encoding="utf-8", errors="ignore") as handle:
                 return handle.read()
         except (FileNotFoundError, PermissionError):
             return None
 
+    def iter_lines(self, path: str) -> Optional[Iterator[str]]:
+        """Построчное чтение без загрузки файла целиком; None, если файл не открыть.
+
+        Строки отдаются без перевода строки, как у str.splitlines().
+        """
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        self._throttle()
+        try:
+            handle = open(host_path, "r", encoding="utf-8", errors="ignore")
+        except (FileNotFoundError, PermissionError, IsADirectoryError):
+            return None
+        return _iter_handle_lines(handle)
+
+    def read_bytes(self, path: str) -> Optional[ByteView]:
+        """Содержимое файла через mmap: страницы подгружаются по мере обращения.
+
+        procfs/sysfs сообщают нулевой размер и не отображаются в память,
+        такие файлы читаются целиком.
+        """
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        self._throttle()
+        try:
+            with open(host_path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return handle.read()
+                try:
+                    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    return handle.read()
+        except (FileNotFoundError, PermissionError, IsADirectoryError):
+            return None
+
     def stat(self, path: str) -> Optional[os.stat_result]:
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        self._throttle()
         try:
-            return os.stat(path)
+            return os.stat(host_path)
         except (FileNotFoundError, PermissionError):
             return None
 
     def list_dir(self, path: str) -> Optional[list[str]]:
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        self._throttle()
         try:
-            return sorted(os.listdir(path))
+            return sorted(os.listdir(host_path))
         except (FileNotFoundError, NotADirectoryError, PermissionError):
             return None
 
+    def scan_dir(
+        self,
+        path: str,
+        max_depth: Optional[int] = 0,
+        follow_symlinks: bool = True,
+    ) -> Optional[list[ScanEntry]]:
+        """Листинг каталога вместе со stat за один проход os.scandir.
+
+        max_depth=0 — только непосредственные элементы, None — без ограничения глубины.
+        В подкаталоги-симлинки не спускаемся. Элементы внутри каталога отсортированы
+        по имени, как в list_dir.
+        """
+        host_path = self._host_path(path)
+        if host_path is None:
+            return None
+        entries: list[ScanEntry] = []
+        try:
+            self._scan_into(host_path, path.rstrip("/"), 0, max_depth, follow_symlinks, entries)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return None
+        return entries
+
+    def _scan_into(
+        self,
+        host_path: str,
+        path: str,
+        depth: int,
+        max_depth: Optional[int],
+        follow_symlinks: bool,
+        entries: list[ScanEntry],
+    ) -> None:
+        with os.scandir(host_path) as iterator:
+            items = sorted(iterator, key=lambda item: item.name)
+        # Листинг каталога и stat каждого элемента — отдельные операции для ограничителя.
+        self._throttle(1 + len(items))
+        for item in items:
+            try:
+                is_symlink = item.is_symlink()
+                is_dir = item.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            child = f"{path}/{item.name}"
+            entries.append(
+                ScanEntry(
+                    path=child,
+                    name=item.name,
+                    depth=depth,
+                    is_dir=is_dir,
+                    is_symlink=is_symlink,
+                    stat=self._entry_stat(item, child, is_symlink and follow_symlinks),
+                )
+            )
+            if is_dir and (max_depth is None or depth < max_depth):
+                try:
+                    self._scan_into(item.path, child, depth + 1, max_depth, follow_symlinks, entries)
+                except OSError:
+                    # Недоступный подкаталог не должен обрывать весь листинг.
+                    continue
+
+    def _entry_stat(self, item: os.DirEntry, path: str, follow: bool) -> Optional[os.stat_result]:
+        try:
+            return item.stat(follow_symlinks=follow)
+        except OSError:
+            return None
+
+    def read_link(self, path: str) -> Optional[str]:
+        host_path = self._host_path(path, follow_symlinks=False)
+        if host_path is None:
+            return None
+        self._throttle()
+        try:
+            return os.readlink(host_path)
+        except OSError:
+            return None
+
+    def read_xattr(self, path: str, name: str) -> Optional[bytes]:
+        # Расширенные атрибуты (например, security.capability) без перехода по симлинкам.
+        host_path = self._host_path(path, follow_symlinks=False)
+        if host_path is None:
+            return None
+        self._throttle()
+        try:
+            return os.getxattr(host_path, name, follow_symlinks=False)
+        except (OSError, AttributeError):
+            return None
+
+    def mount_table(self) -> MountTable:
+        # mountinfo разбираем один раз на контекст, то есть на один прогон аудита.
+        if self._mount_table is None:
+            self._mount_table = read_mount_table(self.read_file)
+        return self._mount_table
+
     def run_cmd(self, args: list[str]) -> CommandResult:
         # Унифицированный запуск команд с захватом stdout/stderr.
         completed = subprocess.run(
@@ -66,16 +243,3 @@ class AuditContext:
             stdout=completed.stdout or "",
             stderr=completed.stderr or "",
         )
-
-    def _collect_host_facts(self) -> Dict[str, Any]:
-        # Сбор базовых сведений о хосте для отчета.
-        hostname = get_hostname()
-        fqdn = get_fqdn()
-        ip_address = get_primary_ip(self.run_cmd)
-        os_release = get_os_release(self.read_file)
-        return {
-            "hostname": hostname,
-            "fqdn": fqdn,
-            "ip": ip_address,
-            "os_release": os_release,
-        }
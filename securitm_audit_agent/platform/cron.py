@@ -0,0 +1,190 @@
+# Разбор crontab и извлечение файлов, которые запускаются из cron.
+from __future__ import annotations
+
+import re
+import shlex
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from securitm_audit_agent.platform.protocols import AuditContextProtocol
+
+DEFAULT_CRON_PATH = "/usr/bin:/bin"
+CRONTAB_CACHE_MAX_ENTRIES = 512
+
+_ENV_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\s*=")
+_ASSIGNMENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+_SEPARATOR_RE = re.compile(r"\|\||&&|[;|&]")
+
+# Обёртки, за которыми идёт настоящая команда.
+_WRAPPERS = {"nice", "ionice", "nohup", "exec", "env", "command", "chronic", "time"}
+_INTERPRETERS = re.compile(r"^(sh|bash|dash|ksh|zsh|python[0-9.]*|perl|ruby|php[0-9.]*)$")
+
+_CacheKey = Tuple[object, ...]
+# Кеш разобранных crontab на время жизни процесса; на диск не сохраняется. Ключ — путь и
+# dev/ino/mtime/size файла: контексты разных корней (rootfs, образы) не подменяют записи друг
+# друга, а сверх CRONTAB_CACHE_MAX_ENTRIES вытесняются давно не использованные.
+_CRONTAB_CACHE: "OrderedDict[Tuple[str, _CacheKey], List[CronJob]]" = OrderedDict()
+_CRONTAB_CACHE_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CronJob:
+    source: str
+    line_no: int
+    user: Optional[str]
+    command: str
+    search_path: str
+
+
+def _strip_percent(command: str) -> str:
+    # Неэкранированный % в cron начинает stdin команды.
+    result = []
+    escaped = False
+    for char in command:
+        if escaped:
+            result.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+            result.append(char)
+        elif char == "%":
+            break
+        else:
+            result.append(char)
+    return "".join(result).strip()
+
+
+def parse_crontab(text: str, source: str, system: bool, user: Optional[str] = None) -> List[CronJob]:
+    """Разбирает crontab в список заданий.
+
+    system=True — формат /etc/crontab и /etc/cron.d с полем пользователя,
+    иначе пользовательский crontab, где пользователь берётся из имени файла.
+    """
+    jobs: List[CronJob] = []
+    search_path = DEFAULT_CRON_PATH
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if _ENV_RE.match(stripped):
+            name, value = stripped.split("=", 1)
+            if name.strip() == "PATH":
+                search_path = value.strip().strip("\"'")
+            continue
+
+        schedule_fields = 1 if stripped.startswith("@") else 5
+        fields = stripped.split(None, schedule_fields + (1 if system else 0))
+        if len(fields) <= schedule_fields + (1 if system else 0):
+            continue
+        job_user = fields[schedule_fields] if system else user
+        command = _strip_percent(fields[-1])
+        if command:
+            jobs.append(CronJob(source, line_no, job_user, command, search_path))
+    return jobs
+
+
+def _cache_key(path_stat: object) -> Optional[_CacheKey]:
+    key = tuple(
+        getattr(path_stat, name, None) for name in ("st_dev", "st_ino", "st_mtime_ns", "st_size")
+    )
+    return None if None in key else key
+
+
+def load_crontab(
+    ctx: AuditContextProtocol,
+    path: str,
+    system: bool,
+    user: Optional[str] = None,
+) -> Optional[List[CronJob]]:
+    """Читает и разбирает crontab с мемоизацией по mtime/size/inode.
+
+    Кеш живёт только в памяти процесса: повторные прогоны в том же процессе не
+    разбирают неизменившиеся файлы заново, между запусками CLI он не сохраняется.
+    Размер кеша ограничен CRONTAB_CACHE_MAX_ENTRIES.
+    """
+    stat_key = _cache_key(ctx.stat(path))
+    key = (path, stat_key) if stat_key is not None else None
+    if key is not None:
+        with _CRONTAB_CACHE_LOCK:
+            cached = _CRONTAB_CACHE.get(key)
+            if cached is not None:
+                _CRONTAB_CACHE.move_to_end(key)
+                return cached
+
+    content = ctx.read_file(path)
+    if content is None:
+        return None
+    jobs = parse_crontab(content, path, system, user)
+    if key is not None:
+        with _CRONTAB_CACHE_LOCK:
+            _CRONTAB_CACHE[key] = jobs
+            while len(_CRONTAB_CACHE) > CRONTAB_CACHE_MAX_ENTRIES:
+                _CRONTAB_CACHE.popitem(last=False)
+    return jobs
+
+
+def _split_tokens(segment: str) -> List[str]:
+    try:
+        return shlex.split(segment)
+    except ValueError:
+        return segment.split()
+
+
+def _resolve(name: str, cwd: Optional[str], search_path: str, exists: Callable[[str], bool]) -> Optional[str]:
+    if name.startswith("/"):
+        return name
+    if "/" in name:
+        if cwd is None:
+            return None
+        return f"{cwd.rstrip('/')}/{name[2:] if name.startswith('./') else name}"
+    for directory in search_path.split(":"):
+        if not directory.startswith("/"):
+            continue
+        candidate = f"{directory.rstrip('/')}/{name}"
+        if exists(candidate):
+            return candidate
+    return None
+
+
+def command_targets(command: str, search_path: str, exists: Callable[[str], bool]) -> List[str]:
+    """Исполняемые файлы и скрипты, которые запускает команда cron.
+
+    Команда режется на части по ;, &&, ||, |. В каждой части пропускаются
+    присваивания переменных и обёртки (nice, nohup, env...). Для интерпретаторов
+    (sh, bash, python...) дополнительно берётся путь к скрипту. cd меняет
+    каталог для последующих относительных путей.
+    """
+    targets: List[str] = []
+    cwd: Optional[str] = None
+    for segment in _SEPARATOR_RE.split(command):
+        tokens = _split_tokens(segment)
+        while tokens and (_ASSIGNMENT_RE.match(tokens[0]) or tokens[0] in _WRAPPERS):
+            tokens.pop(0)
+            # Опции обёрток и их числовые значения (nice -n 10, ionice -c 3).
+            while tokens and (tokens[0].startswith("-") or tokens[0].isdigit()):
+                tokens.pop(0)
+        if not tokens:
+            continue
+        if tokens[0] == "cd":
+            cwd = tokens[1] if len(tokens) > 1 and tokens[1].startswith("/") else None
+            continue
+
+        executable = _resolve(tokens[0], cwd, search_path, exists)
+        if executable is None:
+            continue
+        targets.append(executable)
+
+        if _INTERPRETERS.match(executable.rsplit("/", 1)[-1]):
+            for arg in tokens[1:]:
+                if arg.startswith("-"):
+                    # bash -c '...' выполняет строку, а не файл.
+                    if arg == "-c":
+                        break
+                    continue
+                script = _resolve(arg, cwd, "", exists) if "/" in arg else None
+                if script:
+                    targets.append(script)
+                break
+    return targets
@@ -2,7 +2,13 @@
 from __future__ import annotations
 
 import socket
-from typing import Dict, Optional
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_DNS_TIMEOUT = 2.0
+# Флаг RTF_UP из linux/route.h.
+_RTF_UP = 0x0001
 
 
 def parse_os_release(text: str) -> Dict[str, str]:
@@ -24,26 +30,138 @@ def get_os_release(read_file) -> Dict[str, str]:
     return parse_os_release(content)
 
 
-def get_primary_ip(run_cmd) -> Optional[str]:
-    try:
-        completed = run_cmd(["ip", "-4", "-o", "addr", "show", "scope", "global"])
-    except Exception:
-        return None
+def get_hostname() -> str:
+    return socket.gethostname()
+
+
+def resolve_fqdn(hostname: str, timeout: float = DEFAULT_DNS_TIMEOUT) -> Tuple[str, str]:
+    """FQDN с жёстким таймаутом на DNS.
 
-    for line in completed.stdout.splitlines():
+    socket.getfqdn на хосте со сломанным резолвером висит секундами, а таймаута
+    у него нет. Запрос идёт в daemon-потоке, по таймауту возвращаем hostname.
+    """
+    result: List[str] = []
+    worker = threading.Thread(target=lambda: result.append(socket.getfqdn(hostname)), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if result:
+        return result[0], "dns"
+    return hostname, "hostname (dns timeout)"
+
+
+def _hex_to_ip(value: str) -> str:
+    # В /proc/net/route адреса записаны как hex в порядке байт хоста (little-endian).
+    return socket.inet_ntoa(struct.pack("<L", int(value, 16)))
+
+
+def parse_default_gateway(text: str) -> Optional[Tuple[str, str]]:
+    """Интерфейс и шлюз маршрута по умолчанию с наименьшей метрикой."""
+    best: Optional[Tuple[int, str, str]] = None
+    for line in text.splitlines()[1:]:
         parts = line.split()
-        if len(parts) < 4:
+        if len(parts) < 7 or parts[1] != "00000000":
             continue
-        # В выводе ip(8) адрес находится в четвертой колонке.
-        addr = parts[3].split("/")[0]
-        if addr:
-            return addr
+        try:
+            flags = int(parts[3], 16)
+            metric = int(parts[6])
+            gateway = _hex_to_ip(parts[2])
+        except (ValueError, struct.error):
+            continue
+        if not flags & _RTF_UP:
+            continue
+        if best is None or metric < best[0]:
+            best = (metric, parts[0], gateway)
+    if best is None:
+        return None
+    return best[1], best[2]
+
+
+def parse_fib_trie_local(text: str) -> Optional[str]:
+    """Первый не-loopback адрес с типом host LOCAL из /proc/net/fib_trie."""
+    candidate: Optional[str] = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("|--"):
+            candidate = stripped[3:].strip()
+        elif stripped == "/32 host LOCAL" and candidate and not candidate.startswith("127."):
+            return candidate
     return None
 
 
-def get_hostname() -> str:
-    return socket.gethostname()
+def _source_ip_for(gateway: str) -> Optional[str]:
+    # connect() у UDP-сокета не шлёт пакетов: ядро только выбирает исходный адрес по таблице маршрутов.
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect((gateway if gateway != "0.0.0.0" else "192.0.2.1", 9))
+            address = sock.getsockname()[0]
+    except OSError:
+        return None
+    return address if address and address != "0.0.0.0" else None
+
+
+def get_primary_ip_proc(read_file: Callable[[str], Optional[str]]) -> Tuple[Optional[str], str]:
+    """Основной IPv4 без запуска ip(8): /proc/net/route, затем /proc/net/fib_trie."""
+    route = read_file("/proc/net/route")
+    default = parse_default_gateway(route) if route else None
+    if default is not None:
+        address = _source_ip_for(default[1])
+        if address:
+            return address, f"/proc/net/route ({default[0]})"
+    trie = read_file("/proc/net/fib_trie")
+    address = parse_fib_trie_local(trie) if trie else None
+    if address:
+        return address, "/proc/net/fib_trie"
+    return None, "unavailable"
+
+
+class HostFacts:
+    """Фоновый сбор фактов о хосте.
+
+    Сбор стартует при создании контекста и идёт параллельно с проверками;
+    ожидание происходит только при первом обращении к фактам (обычно при
+    формировании отчёта). Для каждого факта в facts_sources записан источник.
+    """
+
+    def __init__(
+        self,
+        read_file: Callable[[str], Optional[str]],
+        dns_timeout: float = DEFAULT_DNS_TIMEOUT,
+    ) -> None:
+        self._read_file = read_file
+        self._dns_timeout = dns_timeout
+        self._facts: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> threading.Thread:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._collect, name="host-facts", daemon=True)
+                self._thread.start()
+            return self._thread
 
+    def get(self) -> Dict[str, Any]:
+        self.start().join()
+        return dict(self._facts or {})
 
-def get_fqdn() -> str:
-    return socket.getfqdn()
+    def _collect(self) -> None:
+        try:
+            hostname = get_hostname()
+            fqdn, fqdn_source = resolve_fqdn(hostname, self._dns_timeout)
+            ip_address, ip_source = get_primary_ip_proc(self._read_file)
+            os_release = get_os_release(self._read_file)
+            self._facts = {
+                "hostname": hostname,
+                "fqdn": fqdn,
+                "ip": ip_address,
+                "os_release": os_release,
+                "facts_sources": {
+                    "hostname": "gethostname",
+                    "fqdn": fqdn_source,
+                    "ip": ip_source,
+                    "os_release": "/etc/os-release" if os_release else "unavailable",
+                },
+            }
+        except Exception:
+            # Факты — вспомогательные данные отчёта: сбой сбора не должен валить аудит.
+            self._facts = {}
@@ -0,0 +1,271 @@
+# Общий однопроходный обход файловой системы для нескольких предикатов.
+from __future__ import annotations
+
+import stat as stat_module
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from securitm_audit_agent.platform.protocols import AuditContextProtocol, ScanEntryProtocol
+
+DEFAULT_EXCLUDES = ("/proc", "/sys", "/dev", "/run")
+# Глубина от корня обхода, с которой поддеревья раздаются потокам (/usr/lib, /usr/share, ...).
+PARALLEL_SPLIT_DEPTH = 2
+
+
+@dataclass(frozen=True)
+class FsPredicate:
+    """Условие отбора файлов при общем обходе.
+
+    Все заданные условия должны выполняться одновременно. mode_masks — каждая
+    маска должна пересекаться с правами файла (например, (0o6000, 0o022) —
+    SUID/SGID и запись для группы/прочих). limit — размер буфера путей,
+    None — без ограничения (потребитель сам перепроверяет каждый путь).
+    """
+
+    name: str
+    file_types: FrozenSet[str] = frozenset({"file"})
+    mode_masks: Tuple[int, ...] = ()
+    uids: Optional[FrozenSet[int]] = None
+    gids: Optional[FrozenSet[int]] = None
+    prefixes: Tuple[str, ...] = ()
+    xattr: Optional[str] = None
+    test: Optional[Callable[[ScanEntryProtocol], bool]] = None
+    limit: Optional[int] = 100
+
+
+@dataclass
+class FsScanResult:
+    paths: List[str] = field(default_factory=list)
+    total: int = 0
+    complete: bool = True
+
+    def add(self, path: str, limit: Optional[int]) -> None:
+        # Буфер evidence ограничен, но общее число совпадений считается полностью.
+        self.total += 1
+        if limit is None or len(self.paths) < limit:
+            self.paths.append(path)
+
+    def merge(self, other: "FsScanResult", limit: Optional[int]) -> None:
+        self.total += other.total
+        self.complete = self.complete and other.complete
+        room = len(other.paths) if limit is None else max(limit - len(self.paths), 0)
+        self.paths.extend(other.paths[:room])
+
+
+def _under(path: str, prefix: str) -> bool:
+    prefix = prefix.rstrip("/")
+    return not prefix or path == prefix or path.startswith(prefix + "/")
+
+
+def _file_type(entry: ScanEntryProtocol) -> str:
+    if entry.is_symlink:
+        return "symlink"
+    if entry.is_dir:
+        return "dir"
+    if entry.stat is not None and stat_module.S_ISREG(entry.stat.st_mode):
+        return "file"
+    return "other"
+
+
+def iter_tree(
+    ctx: AuditContextProtocol,
+    root: str,
+    same_device: bool = True,
+    excludes: Sequence[str] = (),
+    descend: Optional[Callable[[str], bool]] = None,
+) -> Iterator[ScanEntryProtocol]:
+    """Обход дерева через ctx.scan_dir без перехода по симлинкам на каталоги.
+
+    same_device повторяет поведение find -xdev. descend позволяет отсечь
+    поддеревья, в которых заведомо нет интересующих путей.
+    """
+    root_stat = ctx.stat(root)
+    root_dev = getattr(root_stat, "st_dev", None) if same_device else None
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        entries = ctx.scan_dir(current, max_depth=0, follow_symlinks=False)
+        if not entries:
+            continue
+        subdirs: List[str] = []
+        for entry in entries:
+            if not entry.is_dir or entry.is_symlink:
+                yield entry
+                continue
+            # Исключения проверяем только для каталогов: внутрь исключённых не спускаемся.
+            if excludes and any(_under(entry.path, item) for item in excludes):
+                continue
+            yield entry
+            if root_dev is not None and getattr(entry.stat, "st_dev", root_dev) != root_dev:
+                continue
+            if descend is not None and not descend(entry.path):
+                continue
+            subdirs.append(entry.path)
+        # Обратный порядок сохраняет сортировку по имени при обходе стека.
+        stack.extend(reversed(subdirs))
+
+
+def stat_many(ctx: AuditContextProtocol, paths: Iterable[str]) -> Dict[str, Any]:
+    """Один проход stat по уникальному набору путей.
+
+    Проверки сначала собирают и дедуплицируют пути (процессы, cron, sudo),
+    и только потом обращаются к файловой системе — по одному stat на путь.
+    """
+    return {path: ctx.stat(path) for path in sorted(set(paths))}
+
+
+class FsScanEngine:
+    """Один обход файловой системы, общий для всех зарегистрированных предикатов.
+
+    Проверки регистрируют предикаты при создании, первая запросившая результаты
+    проверка запускает обход, остальные получают свои совпадения из кеша.
+    Кеш привязан к прогону (ctx.run_id): следующий прогон обходит ФС заново,
+    даже если в прошлом часть потребителей не запускалась. При workers > 1
+    поддеревья глубже PARALLEL_SPLIT_DEPTH обходятся параллельно (scandir и
+    lstat отпускают GIL); пути в буферах идут тогда не в порядке обхода в глубину.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str] = ("/",),
+        same_device: bool = True,
+        excludes: Sequence[str] = DEFAULT_EXCLUDES,
+        skip_remote: bool = True,
+        workers: int = 1,
+    ) -> None:
+        self.roots = tuple(roots)
+        self.same_device = same_device
+        self.excludes = tuple(excludes)
+        self.skip_remote = skip_remote
+        self.workers = max(workers, 1)
+        self._predicates: Dict[str, FsPredicate] = {}
+        self._lock = threading.Lock()
+        self._run: Optional[Tuple[int, int]] = None
+        self._pending: Dict[str, FsScanResult] = {}
+
+    def register(self, predicate: FsPredicate) -> None:
+        if predicate.name in self._predicates:
+            raise ValueError(f"Duplicate scan predicate: {predicate.name}")
+        self._predicates[predicate.name] = predicate
+
+    def results(self, ctx: AuditContextProtocol, name: str) -> FsScanResult:
+        with self._lock:
+            # Ключ — номер прогона, а не сам контекст: ссылка на ctx между прогонами не хранится.
+            run = (id(ctx), getattr(ctx, "run_id", 0))
+            if run != self._run or name not in self._pending:
+                self._pending = self.scan(ctx)
+                self._run = run
+            return self._pending.pop(name)
+
+    def scan(self, ctx: AuditContextProtocol) -> Dict[str, FsScanResult]:
+        predicates = list(self._predicates.values())
+        results = {predicate.name: FsScanResult() for predicate in predicates}
+        descend = self._descend_filter(ctx, predicates)
+        for root in self.roots:
+            if ctx.stat(root) is None:
+                for result in results.values():
+                    result.complete = False
+                continue
+            partials = self._scan_root(ctx, root, predicates, descend)
+            for predicate in predicates:
+                results[predicate.name].merge(partials[predicate.name], predicate.limit)
+        return results
+
+    def _scan_root(
+        self,
+        ctx: AuditContextProtocol,
+        root: str,
+        predicates: List[FsPredicate],
+        descend: Optional[Callable[[str], bool]],
+    ) -> Dict[str, FsScanResult]:
+        if self.workers <= 1:
+            return self._collect(ctx, predicates, iter_tree(ctx, root, self.same_device, self.excludes, descend))
+
+        # Верхние уровни обходятся здесь, более глубокие поддеревья откладываются для пула.
+        base = root.rstrip("/").count("/")
+        subtrees: List[str] = []
+
+        def shallow(path: str) -> bool:
+            if descend is not None and not descend(path):
+                return False
+            if path.count("/") - base >= PARALLEL_SPLIT_DEPTH:
+                subtrees.append(path)
+                return False
+            return True
+
+        results = self._collect(ctx, predicates, iter_tree(ctx, root, self.same_device, self.excludes, shallow))
+        limits = {predicate.name: predicate.limit for predicate in predicates}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Поддерево лежит на устройстве корня (iter_tree не откладывает чужие), так что same_device сохраняется.
+            partials = pool.map(
+                lambda path: self._collect(
+                    ctx, predicates, iter_tree(ctx, path, self.same_device, self.excludes, descend)
+                ),
+                subtrees,
+            )
+            for partial in partials:
+                for name, result in partial.items():
+                    results[name].merge(result, limits[name])
+        return results
+
+    def _collect(
+        self,
+        ctx: AuditContextProtocol,
+        predicates: List[FsPredicate],
+        entries: Iterable[ScanEntryProtocol],
+    ) -> Dict[str, FsScanResult]:
+        results = {predicate.name: FsScanResult() for predicate in predicates}
+        for entry in entries:
+            for predicate in predicates:
+                if self._matches(ctx, predicate, entry):
+                    results[predicate.name].add(entry.path, predicate.limit)
+        return results
+
+    def _descend_filter(
+        self,
+        ctx: AuditContextProtocol,
+        predicates: List[FsPredicate],
+    ) -> Optional[Callable[[str], bool]]:
+        # Если у всех предикатов есть префиксы, лишние поддеревья можно не обходить.
+        prefixes: Optional[List[str]] = None
+        if predicates and all(predicate.prefixes for predicate in predicates):
+            prefixes = [prefix for predicate in predicates for prefix in predicate.prefixes]
+        # autofs и сетевые ФС не обходим: это монтирования и сетевые запросы на каждый каталог.
+        table = ctx.mount_table() if self.skip_remote else None
+        if table is not None and not table.has_remote:
+            table = None
+        if prefixes is None and table is None:
+            return None
+
+        def descend(path: str) -> bool:
+            if table is not None and table.is_remote(path):
+                return False
+            if prefixes is not None:
+                return any(_under(path, prefix) or _under(prefix, path) for prefix in prefixes)
+            return True
+
+        return descend
+
+    def _matches(self, ctx: AuditContextProtocol, predicate: FsPredicate, entry: ScanEntryProtocol) -> bool:
+        if _file_type(entry) not in predicate.file_types:
+            return False
+        if predicate.prefixes and not any(_under(entry.path, prefix) for prefix in predicate.prefixes):
+            return False
+        entry_stat = entry.stat
+        if predicate.mode_masks or predicate.uids is not None or predicate.gids is not None:
+            if entry_stat is None:
+                return False
+            if any(not entry_stat.st_mode & mask for mask in predicate.mode_masks):
+                return False
+            if predicate.uids is not None and entry_stat.st_uid not in predicate.uids:
+                return False
+            if predicate.gids is not None and entry_stat.st_gid not in predicate.gids:
+                return False
+        if predicate.test is not None and not predicate.test(entry):
+            return False
+        # xattr проверяем последним: это отдельный системный вызов на файл.
+        if predicate.xattr is not None and ctx.read_xattr(entry.path, predicate.xattr) is None:
+            return False
+        return True
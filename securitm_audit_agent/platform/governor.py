@@ -0,0 +1,182 @@
+# Ограничение нагрузки аудита на хост: приоритеты процесса, лимит операций и пауза при перегрузке.
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+PSI_IO_PATH = "/proc/pressure/io"
+IONICE_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_psi_avg10(text: Optional[str]) -> Optional[float]:
+    # Формат PSI: "some avg10=1.23 avg60=0.50 avg300=0.10 total=12345".
+    if not text:
+        return None
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts or parts[0] != "some":
+            continue
+        for item in parts[1:]:
+            key, _, value = item.partition("=")
+            if key == "avg10":
+                try:
+                    return float(value)
+                except ValueError:
+                    return None
+    return None
+
+
+def _read_host_file(path: str) -> Optional[str]:
+    # Нагрузку меряем на самом хосте: офлайн-контексты подменяют /proc значениями из конфига.
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def apply_process_priority(
+    nice: Optional[int] = None,
+    io_class: Optional[str] = None,
+    io_level: Optional[int] = None,
+) -> List[str]:
+    """Понижает CPU- и IO-приоритет процесса агента, возвращает список предупреждений.
+
+    Вызывается до создания потоков и процессов аудита: в Linux nice и ionice
+    действуют на поток и наследуются созданными после этого потоками.
+    """
+    warnings: List[str] = []
+    if nice:
+        try:
+            os.nice(nice)
+        except OSError as exc:
+            warnings.append(f"nice {nice} failed: {exc}")
+    if io_class:
+        if io_class not in IONICE_CLASSES:
+            return warnings + [f"Unknown ionice class: {io_class}"]
+        args = ["ionice", "-c", str(IONICE_CLASSES[io_class])]
+        if io_level is not None and io_class == "best-effort":
+            args += ["-n", str(io_level)]
+        args += ["-p", str(os.getpid())]
+        try:
+            completed = subprocess.run(args, check=False, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            warnings.append("ionice not found; IO priority unchanged")
+        else:
+            if completed.returncode != 0:
+                warnings.append(f"ionice failed: {completed.stderr.strip()}")
+    return warnings
+
+
+class ResourceGovernor:
+    """Дросселирование файловых операций аудита.
+
+    ops_per_second — token bucket на stat/чтение (burst — размер корзины).
+    Раз в sample_interval секунд проверяется нагрузка хоста: loadavg за минуту
+    на CPU и доля времени ожидания IO из PSI (some avg10, %). Пока нагрузка
+    выше порогов, все операции ждут, шаг ожидания удваивается от
+    backoff_seconds, но одна пауза не длится дольше max_backoff_seconds.
+    throttled_seconds — суммарное время (по часам, без двойного счёта
+    параллельных потоков), которое аудит провёл в ожидании.
+    """
+
+    def __init__(
+        self,
+        ops_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_load_per_cpu: Optional[float] = None,
+        max_io_pressure: Optional[float] = None,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+        sample_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        read_file: Callable[[str], Optional[str]] = _read_host_file,
+        loadavg: Callable[[], Tuple[float, float, float]] = os.getloadavg,
+    ) -> None:
+        self.ops_per_second = ops_per_second
+        self.burst = burst if burst is not None else (ops_per_second or 0.0)
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_io_pressure = max_io_pressure
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.sample_interval = sample_interval
+        self.throttled_seconds = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._read_file = read_file
+        self._loadavg = loadavg
+        self._cpus = os.cpu_count() or 1
+        self._lock = threading.Lock()
+        # Держится на время паузы по нагрузке: остальные потоки ждут её окончания на входе в acquire.
+        self._pause = threading.Lock()
+        self._tokens = self.burst
+        self._refilled_at = clock()
+        self._next_sample = 0.0
+        self._covered_until = 0.0
+
+    def acquire(self, count: int = 1) -> None:
+        with self._pause:
+            pass
+        delay = 0.0
+        sample = False
+        with self._lock:
+            now = self._clock()
+            if self.ops_per_second:
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.ops_per_second)
+                self._refilled_at = now
+                self._tokens -= count
+                if self._tokens < 0:
+                    delay = -self._tokens / self.ops_per_second
+                    self._account(now, now + delay)
+            if now >= self._next_sample and (self.max_load_per_cpu or self.max_io_pressure):
+                self._next_sample = now + self.sample_interval
+                sample = True
+        if delay:
+            self._sleep(delay)
+        if sample:
+            with self._pause:
+                self._backoff()
+
+    def overload_reason(self) -> Optional[str]:
+        if self.max_load_per_cpu:
+            try:
+                load = self._loadavg()[0] / self._cpus
+            except OSError:
+                load = 0.0
+            if load > self.max_load_per_cpu:
+                return f"load average {load:.2f} per CPU"
+        if self.max_io_pressure:
+            pressure = parse_psi_avg10(self._read_file(PSI_IO_PATH))
+            if pressure is not None and pressure > self.max_io_pressure:
+                return f"IO pressure {pressure:.1f}%"
+        return None
+
+    def _backoff(self) -> None:
+        waited = 0.0
+        step = self.backoff_seconds
+        while waited < self.max_backoff_seconds:
+            reason = self.overload_reason()
+            if reason is None:
+                return
+            step = min(step, self.max_backoff_seconds - waited)
+            logger.debug("Audit throttled for %.1fs: %s", step, reason)
+            now = self._clock()
+            with self._lock:
+                self._account(now, now + step)
+            self._sleep(step)
+            waited += step
+            step *= 2
+
+    def _account(self, start: float, end: float) -> None:
+        # Ожидания разных потоков пересекаются по времени — считаем объединение интервалов.
+        begin = max(start, self._covered_until)
+        if end > begin:
+            self.throttled_seconds += end - begin
+        self._covered_until = max(self._covered_until, end)
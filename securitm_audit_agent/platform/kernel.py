@@ -0,0 +1,68 @@
+# Снимок параметров ядра: sysctl из /proc/sys и параметры загрузки из /proc/cmdline.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from securitm_audit_agent.platform.protocols import AuditContextProtocol
+
+
+@dataclass
+class CmdlineParams:
+    params: Dict[str, str]
+    flags: List[str]
+
+
+@dataclass
+class KernelSnapshot:
+    sysctl: Dict[str, Optional[str]]
+    cmdline: Optional[CmdlineParams]
+
+
+def sysctl_path(key: str) -> str:
+    # sysctl ключи читаем через /proc/sys с заменой точек на слеши.
+    return "/proc/sys/" + key.replace(".", "/")
+
+
+def parse_cmdline(text: str) -> CmdlineParams:
+    params: Dict[str, str] = {}
+    flags: List[str] = []
+    for token in text.strip().split():
+        if "=" in token:
+            key, value = token.split("=", 1)
+            params[key] = value
+        else:
+            flags.append(token)
+    return CmdlineParams(params=params, flags=flags)
+
+
+def read_sysctl(ctx: AuditContextProtocol, key: str) -> Optional[str]:
+    content = ctx.read_file(sysctl_path(key))
+    if content is None:
+        return None
+    return content.strip()
+
+
+def read_cmdline(ctx: AuditContextProtocol) -> Optional[CmdlineParams]:
+    content = ctx.read_file("/proc/cmdline")
+    if content is None:
+        return None
+    return parse_cmdline(content)
+
+
+def take_kernel_snapshot(
+    ctx: AuditContextProtocol,
+    sysctl_keys: Iterable[str],
+    with_cmdline: bool = True,
+) -> KernelSnapshot:
+    """Один проход по всем нужным ключам ядра.
+
+    Каждый уникальный ключ sysctl читается ровно один раз, /proc/cmdline
+    разбирается один раз, независимо от количества правил, которые на них ссылаются.
+    """
+    sysctl: Dict[str, Optional[str]] = {}
+    for key in sysctl_keys:
+        if key not in sysctl:
+            sysctl[key] = read_sysctl(ctx, key)
+    cmdline = read_cmdline(ctx) if with_cmdline else None
+    return KernelSnapshot(sysctl=sysctl, cmdline=cmdline)
@@ -0,0 +1,128 @@
+# Таблица точек монтирования из /proc/self/mountinfo.
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+# Сетевые и кластерные ФС: stat на них — это сетевой запрос.
+NETWORK_FSTYPES = frozenset(
+    {
+        "nfs",
+        "nfs4",
+        "cifs",
+        "smb3",
+        "smbfs",
+        "ncpfs",
+        "afs",
+        "ceph",
+        "glusterfs",
+        "lustre",
+        "gpfs",
+        "9p",
+        "davfs",
+        "fuse.sshfs",
+        "fuse.glusterfs",
+        "fuse.cephfs",
+        "fuse.s3fs",
+    }
+)
+
+# systemd монтирует autofs на /proc/sys/fs/binfmt_misc почти везде; под /proc и /sys аудит не
+# ходит, поэтому такие autofs не делают таблицу «удалённой».
+PSEUDO_FS_ROOTS = ("/proc", "/sys")
+
+_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
+
+
+@dataclass(frozen=True)
+class MountEntry:
+    mount_point: str
+    fstype: str
+    source: str
+    device: str
+    options: Tuple[str, ...] = ()
+
+    @property
+    def is_autofs(self) -> bool:
+        return self.fstype == "autofs"
+
+    @property
+    def is_network(self) -> bool:
+        return self.fstype in NETWORK_FSTYPES
+
+    @property
+    def is_remote(self) -> bool:
+        # Обращение к путям под autofs может смонтировать ФС, под сетевой ФС — уйти в сеть.
+        return self.is_autofs or self.is_network
+
+    @property
+    def is_pseudo_autofs(self) -> bool:
+        return self.is_autofs and any(
+            self.mount_point == root or self.mount_point.startswith(root + "/") for root in PSEUDO_FS_ROOTS
+        )
+
+
+def _unescape(value: str) -> str:
+    # Пробелы и спецсимволы в путях mountinfo записаны как \040 и т.п.
+    return _ESCAPE_RE.sub(lambda match: chr(int(match.group(1), 8)), value)
+
+
+class MountTable:
+    """Индекс точек монтирования: поиск ФС, на которой лежит путь.
+
+    Поиск идёт подъёмом по родительским каталогам пути со словарём точек
+    монтирования, без обращения к файловой системе.
+    """
+
+    def __init__(self, entries: List[MountEntry]) -> None:
+        self.entries = entries
+        # Более поздняя запись перекрывает более раннюю на той же точке монтирования.
+        self._by_point: Dict[str, MountEntry] = {entry.mount_point: entry for entry in entries}
+        self.has_remote = any(entry.is_remote and not entry.is_pseudo_autofs for entry in entries)
+
+    def find(self, path: str) -> Optional[MountEntry]:
+        current = path.rstrip("/") or "/"
+        while True:
+            entry = self._by_point.get(current)
+            if entry is not None:
+                return entry
+            if current == "/":
+                return None
+            current = current.rsplit("/", 1)[0] or "/"
+
+    def is_remote(self, path: str) -> bool:
+        if not self.has_remote:
+            return False
+        entry = self.find(path)
+        return entry is not None and entry.is_remote
+
+
+def parse_mountinfo(text: str) -> MountTable:
+    entries: List[MountEntry] = []
+    for line in text.splitlines():
+        # id parent major:minor root mount_point options [optional...] - fstype source super_options
+        left, separator, right = line.partition(" - ")
+        if not separator:
+            continue
+        fields = left.split()
+        tail = right.split()
+        if len(fields) < 6 or not tail:
+            continue
+        entries.append(
+            MountEntry(
+                mount_point=_unescape(fields[4]),
+                fstype=tail[0],
+                source=_unescape(tail[1]) if len(tail) > 1 else "",
+                device=fields[2],
+                options=tuple(fields[5].split(",")),
+            )
+        )
+    return MountTable(entries)
+
+
+def read_mount_table(read_file: Callable[[str], Optional[str]]) -> MountTable:
+    # Без mountinfo (нет /proc) считаем, что удалённых ФС нет.
+    return parse_mountinfo(read_file(MOUNTINFO_PATH) or "")
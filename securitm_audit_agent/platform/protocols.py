@@ -2,7 +2,13 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional, Protocol
+import mmap
+from typing import Any, Callable, Dict, Iterator, Optional, Protocol, TypeVar, Union
+
+from securitm_audit_agent.platform.governor import ResourceGovernor
+from securitm_audit_agent.platform.mounts import MountTable
+
+T = TypeVar("T")
 
 
 class CommandResultProtocol(Protocol):
@@ -12,16 +18,76 @@ class CommandResultProtocol(Protocol):
     stderr: str
 
 
+class ScanEntryProtocol(Protocol):
+    path: str
+    name: str
+    depth: int
+    is_dir: bool
+    is_symlink: bool
+    stat: Optional[os.stat_result]
+
+
 class AuditContextProtocol(Protocol):
     agent_version: str
+    governor: Optional[ResourceGovernor]
+    run_id: int
 
     @property
     def host_facts(self) -> Dict[str, Any]: ...
 
     def read_file(self, path: str) -> Optional[str]: ...
 
+    def iter_lines(self, path: str) -> Optional[Iterator[str]]: ...
+
+    def read_bytes(self, path: str) -> Optional[Union[bytes, mmap.mmap]]: ...
+
     def stat(self, path: str) -> Optional[os.stat_result]: ...
 
     def list_dir(self, path: str) -> Optional[list[str]]: ...
 
+    def scan_dir(
+        self,
+        path: str,
+        max_depth: Optional[int] = 0,
+        follow_symlinks: bool = True,
+    ) -> Optional[list[ScanEntryProtocol]]: ...
+
+    def read_link(self, path: str) -> Optional[str]: ...
+
+    def read_xattr(self, path: str, name: str) -> Optional[bytes]: ...
+
+    def mount_table(self) -> MountTable: ...
+
     def run_cmd(self, args: list[str]) -> CommandResultProtocol: ...
+
+
+class AsyncAuditContextProtocol(Protocol):
+    agent_version: str
+    sync: AuditContextProtocol
+
+    async def run_sync(self, func: Callable[..., T], *args: Any) -> T: ...
+
+    async def host_facts(self) -> Dict[str, Any]: ...
+
+    async def read_file(self, path: str) -> Optional[str]: ...
+
+    async def read_bytes(self, path: str) -> Optional[Union[bytes, mmap.mmap]]: ...
+
+    async def stat(self, path: str) -> Optional[os.stat_result]: ...
+
+    async def list_dir(self, path: str) -> Optional[list[str]]: ...
+
+    async def scan_dir(
+        self,
+        path: str,
+        max_depth: Optional[int] = 0,
+        follow_symlinks: bool = True,
+    ) -> Optional[list[ScanEntryProtocol]]: ...
+
+    async def read_link(self, path: str) -> Optional[str]: ...
+
+    async def read_xattr(self, path: str, name: str) -> Optional[bytes]: ...
+
+    async def mount_table(self) -> MountTable: ...
+
+    async def run_cmd(self, args: list[str]) -> CommandResultProtocol: ...
@@ -0,0 +1,149 @@
+# Офлайн-контекст аудита смонтированного дерева ФС (образ ВМ, rootfs контейнера, chroot).
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from securitm_audit_agent.platform.context import AuditContext, ByteView, CommandResult
+from securitm_audit_agent.platform.facts import DEFAULT_DNS_TIMEOUT, HostFacts, get_os_release
+
+# Источники, которые есть только у работающего ядра: внутри образа их нет или они чужие.
+HOST_ONLY_PREFIXES = ("/proc", "/sys")
+MAX_SYMLINK_HOPS = 40
+
+
+def is_host_only(path: str) -> bool:
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in HOST_ONLY_PREFIXES)
+
+
+def resolve_in_root(
+    path: str,
+    readlink: Callable[[str], Optional[str]],
+    follow_symlinks: bool = True,
+) -> Optional[str]:
+    """Пошаговое разрешение симлинков в пути без выхода за корень дерева.
+
+    readlink получает путь внутри дерева и возвращает цель симлинка или None.
+    Абсолютные цели отсчитываются от корня дерева, '..' выше корня остаётся в корне.
+    Возвращает None при зацикливании симлинков.
+    """
+    parts = [part for part in path.split("/") if part and part != "."]
+    current = ""
+    hops = 0
+    index = 0
+    while index < len(parts):
+        part = parts[index]
+        index += 1
+        if part == "..":
+            current = current.rsplit("/", 1)[0]
+            continue
+        candidate = f"{current}/{part}"
+        if index == len(parts) and not follow_symlinks:
+            current = candidate
+            break
+        target = readlink(candidate)
+        if target is None:
+            # Не симлинк или не существует — дальше разберётся сам вызывающий.
+            current = candidate
+            continue
+        hops += 1
+        if hops > MAX_SYMLINK_HOPS:
+            return None
+        parts = [item for item in target.split("/") if item and item != "."] + parts[index:]
+        index = 0
+        if target.startswith("/"):
+            current = ""
+    return current or "/"
+
+
+class RootfsHostFacts(HostFacts):
+    """Факты об образе берутся из его файлов, без DNS и сетевых интерфейсов хоста."""
+
+    def __init__(self, read_file, root: str) -> None:
+        super().__init__(read_file)
+        self._root = root
+
+    def _collect(self) -> None:
+        hostname_file = (self._read_file("/etc/hostname") or "").strip()
+        hostname = hostname_file or os.path.basename(self._root.rstrip("/")) or self._root
+        os_release = get_os_release(self._read_file)
+        self._facts = {
+            "hostname": hostname,
+            "fqdn": hostname,
+            "ip": None,
+            "os_release": os_release,
+            "root": self._root,
+            "facts_sources": {
+                "hostname": "/etc/hostname" if hostname_file else "root directory name",
+                "fqdn": "hostname",
+                "ip": "unavailable (offline)",
+                "os_release": "/etc/os-release" if os_release else "unavailable",
+            },
+        }
+
+
+class RootfsAuditContext(AuditContext):
+    """Контекст, в котором все пути аудита отсчитываются от каталога root.
+
+    Симлинки разрешаются внутри root: абсолютная цель /usr/lib/... указывает
+    на root/usr/lib/..., а не на файл хоста. /proc и /sys считаются источниками
+    работающего хоста: вместо них читаются значения из host_values (путь →
+    содержимое), а при их отсутствии проверки получают None и возвращают SKIP.
+    Команды в офлайн-режиме не запускаются.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        agent_version: str,
+        host_values: Optional[Mapping[str, Any]] = None,
+        dns_timeout: float = DEFAULT_DNS_TIMEOUT,
+    ) -> None:
+        self.root = os.path.abspath(root).rstrip("/") or "/"
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError(f"Root directory not found: {root}")
+        self.host_values = {str(key): str(value) for key, value in (host_values or {}).items()}
+        super().__init__(agent_version, dns_timeout)
+
+    def _make_host_facts(self, dns_timeout: float) -> HostFacts:
+        return RootfsHostFacts(self.read_file, self.root)
+
+    def _read_root_link(self, path: str) -> Optional[str]:
+        try:
+            return os.readlink(self.root + path)
+        except OSError:
+            return None
+
+    def _host_path(self, path: str, follow_symlinks: bool = True) -> Optional[str]:
+        if is_host_only(path):
+            return None
+        resolved = resolve_in_root(path, self._read_root_link, follow_symlinks)
+        if resolved is None or is_host_only(resolved):
+            return None
+        return self.root + resolved if resolved != "/" else self.root
+
+    def _entry_stat(self, item: os.DirEntry, path: str, follow: bool) -> Optional[os.stat_result]:
+        # Цель симлинка разрешаем внутри root, а не по абсолютному пути хоста.
+        if follow:
+            return self.stat(path)
+        return super()._entry_stat(item, path, follow)
+
+    def read_file(self, path: str) -> Optional[str]:
+        if is_host_only(path):
+            return self.host_values.get(path)
+        return super().read_file(path)
+
+    def iter_lines(self, path: str) -> Optional[Iterator[str]]:
+        if is_host_only(path):
+            value = self.host_values.get(path)
+            return iter(value.splitlines()) if value is not None else None
+        return super().iter_lines(path)
+
+    def read_bytes(self, path: str) -> Optional[ByteView]:
+        if is_host_only(path):
+            value = self.host_values.get(path)
+            return value.encode("utf-8") if value is not None else None
+        return super().read_bytes(path)
+
+    def run_cmd(self, args: list[str]) -> CommandResult:
+        return CommandResult(args=args, returncode=127, stdout="", stderr="Commands are not available in offline mode")
@@ -0,0 +1,334 @@
+# Разбор sudoers: include-файлы, продолжения строк, алиасы и индекс правил.
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from securitm_audit_agent.platform.protocols import AuditContextProtocol
+
+SUDOERS_PATH = "/etc/sudoers"
+MAX_INCLUDE_DEPTH = 128
+POLICY_CACHE_MAX_ENTRIES = 64
+
+_ALIAS_KINDS = {
+    "User_Alias": "user",
+    "Runas_Alias": "runas",
+    "Host_Alias": "host",
+    "Cmnd_Alias": "cmnd",
+    "Cmd_Alias": "cmnd",
+}
+_INCLUDE_RE = re.compile(r"^[@#](include|includedir)\s+(?P<path>.+)$")
+_ALIAS_NAME_RE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_TAG_RE = re.compile(r"^(?P<tag>[A-Z_]+):\s*")
+_OPTION_RE = re.compile(r"^(ROLE|TYPE|CWD|CHROOT|TIMEOUT|NOTBEFORE|NOTAFTER)=\S+\s*")
+# Начало следующей группы "Host_List = ..." в одной спецификации пользователя.
+_HOST_GROUP_RE = re.compile(r"\s*:\s*(?=[^,:=()/\s][^:=()/]*=)")
+
+
+@dataclass(frozen=True)
+class SudoRule:
+    source: str
+    line_no: int
+    text: str
+    users: Tuple[str, ...]
+    hosts: Tuple[str, ...]
+    runas: Tuple[str, ...]
+    tags: FrozenSet[str]
+    command: str
+    negated: bool = False
+
+    @property
+    def executable(self) -> Optional[str]:
+        # Путь к исполняемому файлу без аргументов; ALL и sudoedit файлом не являются.
+        if self.command == "ALL" or self.command.startswith("sudoedit"):
+            return None
+        path = self.command.split()[0]
+        return path if path.startswith("/") else None
+
+
+@dataclass
+class SudoersPolicy:
+    files: Tuple[str, ...] = ()
+    rules: List[SudoRule] = field(default_factory=list)
+    by_user: Dict[str, List[SudoRule]] = field(default_factory=dict)
+
+    def index(self) -> None:
+        by_user: Dict[str, List[SudoRule]] = {}
+        for rule in self.rules:
+            for user in rule.users:
+                by_user.setdefault(user, []).append(rule)
+        self.by_user = by_user
+
+    def commands_for(self, user: str) -> List[str]:
+        rules = self.by_user.get(user, []) + self.by_user.get("ALL", [])
+        return [rule.command for rule in rules if not rule.negated]
+
+    def executables(self) -> Dict[str, SudoRule]:
+        # Уникальные исполняемые файлы, которые sudo может запустить, с первым правилом-источником.
+        result: Dict[str, SudoRule] = {}
+        for rule in self.rules:
+            path = rule.executable
+            if path and not rule.negated:
+                result.setdefault(path, rule)
+        return result
+
+
+@dataclass
+class _Line:
+    source: str
+    line_no: int
+    text: str
+
+
+def _strip_comment(line: str) -> str:
+    # '#' начинает комментарий, кроме экранированного и '#<uid>'.
+    for index, char in enumerate(line):
+        if char != "#":
+            continue
+        if index and line[index - 1] == "\\":
+            continue
+        if index + 1 < len(line) and line[index + 1].isdigit():
+            continue
+        return line[:index]
+    return line
+
+
+def _split_list(text: str) -> List[str]:
+    # Разделение по запятым вне скобок и без учёта экранированных \,.
+    items: List[str] = []
+    depth = 0
+    current: List[str] = []
+    previous = ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        if char == "," and depth == 0 and previous != "\\":
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        previous = char
+    items.append("".join(current).strip())
+    return [item for item in items if item]
+
+
+def _resolve_include(path: str, source: str) -> str:
+    path = path.strip().strip('"')
+    if path.startswith("/"):
+        return path
+    base = source.rsplit("/", 1)[0] or "/"
+    return f"{base}/{path}"
+
+
+class _Reader:
+    def __init__(self, ctx: AuditContextProtocol) -> None:
+        self.ctx = ctx
+        self.files: List[str] = []
+        self.dirs: List[str] = []
+        self.lines: List[_Line] = []
+
+    def read(self, path: str, depth: int = 0) -> bool:
+        if depth > MAX_INCLUDE_DEPTH or path in self.files:
+            return False
+        lines = self.ctx.iter_lines(path)
+        if lines is None:
+            return False
+        self.files.append(path)
+
+        pending = ""
+        start_no = 0
+        for line_no, raw in enumerate(lines, start=1):
+            if not pending:
+                start_no = line_no
+            if raw.endswith("\\"):
+                pending += raw[:-1] + " "
+                continue
+            logical = (pending + raw).strip()
+            pending = ""
+            self._handle(path, start_no, logical, depth)
+        if pending:
+            self._handle(path, start_no, pending.strip(), depth)
+        return True
+
+    def _handle(self, path: str, line_no: int, logical: str, depth: int) -> None:
+        include = _INCLUDE_RE.match(logical)
+        if include:
+            target = _resolve_include(include.group("path"), path)
+            if include.group(1) == "include":
+                self.read(target, depth + 1)
+            else:
+                self._read_dir(target, depth + 1)
+            return
+        text = _strip_comment(logical).strip()
+        if text:
+            self.lines.append(_Line(path, line_no, text))
+
+    def _read_dir(self, directory: str, depth: int) -> None:
+        self.dirs.append(directory)
+        # sudo пропускает файлы с точкой в имени и резервные копии с ~.
+        for name in sorted(self.ctx.list_dir(directory) or []):
+            if "." in name or name.endswith("~"):
+                continue
+            self.read(f"{directory}/{name}", depth)
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.aliases: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in set(_ALIAS_KINDS.values())}
+        self.rules: List[SudoRule] = []
+
+    def feed(self, line: _Line) -> None:
+        text = line.text
+        keyword = text.split(None, 1)[0]
+        if keyword.startswith("Defaults"):
+            return
+        if keyword in _ALIAS_KINDS:
+            self._alias(_ALIAS_KINDS[keyword], text[len(keyword):])
+            return
+        self._user_spec(line)
+
+    def _alias(self, kind: str, body: str) -> None:
+        # NAME1 = a, b : NAME2 = c
+        for definition in re.split(r"\s*:\s*(?=[A-Z][A-Z0-9_]*\s*=)", body.strip()):
+            if "=" not in definition:
+                continue
+            name, members = definition.split("=", 1)
+            self.aliases[kind][name.strip()] = _split_list(members)
+
+    def expand(self, kind: str, items: Iterable[str], seen: Optional[Set[str]] = None) -> List[Tuple[str, bool]]:
+        # Возвращает (значение, отрицание) с раскрытием вложенных алиасов.
+        seen = seen or set()
+        result: List[Tuple[str, bool]] = []
+        table = self.aliases[kind]
+        for item in items:
+            negated = item.startswith("!")
+            name = item.lstrip("!").strip()
+            if _ALIAS_NAME_RE.match(name) and name in table and name not in seen:
+                for value, inner_negated in self.expand(kind, table[name], seen | {name}):
+                    result.append((value, negated != inner_negated))
+            else:
+                result.append((name, negated))
+        return result
+
+    def _values(self, kind: str, items: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(value for value, negated in self.expand(kind, items) if not negated)
+
+    def _user_spec(self, line: _Line) -> None:
+        if "=" not in line.text:
+            return
+        left, right = line.text.split("=", 1)
+        left_parts = re.sub(r"\s*,\s*", ",", left.strip()).split()
+        if len(left_parts) != 2:
+            return
+        users = self._values("user", left_parts[0].split(","))
+        hosts = self._values("host", left_parts[1].split(","))
+
+        groups = _HOST_GROUP_RE.split(right.strip())
+        for index, group in enumerate(groups):
+            if index:
+                if "=" not in group:
+                    continue
+                group_hosts, group = group.split("=", 1)
+                hosts = self._values("host", _split_list(group_hosts))
+            self._commands(line, users, hosts, group)
+
+    def _commands(self, line: _Line, users: Tuple[str, ...], hosts: Tuple[str, ...], body: str) -> None:
+        runas: Tuple[str, ...] = ("root",)
+        tags: Set[str] = set()
+        for spec in _split_list(body):
+            if spec.startswith("("):
+                closing = spec.find(")")
+                runas_spec = spec[1:closing] if closing > 0 else spec[1:]
+                user_part = runas_spec.split(":", 1)[0]
+                runas = self._values("runas", _split_list(user_part)) or ("root",)
+                spec = spec[closing + 1:].strip() if closing > 0 else ""
+            while True:
+                option = _OPTION_RE.match(spec)
+                if option:
+                    spec = spec[option.end():]
+                    continue
+                tag = _TAG_RE.match(spec)
+                if tag and tag.group("tag") != "ALL":
+                    tags.add(tag.group("tag"))
+                    spec = spec[tag.end():]
+                    continue
+                break
+            if not spec:
+                continue
+            for command, negated in self.expand("cmnd", [spec]):
+                self.rules.append(
+                    SudoRule(
+                        source=line.source,
+                        line_no=line.line_no,
+                        text=line.text,
+                        users=users,
+                        hosts=hosts,
+                        runas=runas,
+                        tags=frozenset(tags),
+                        command=" ".join(command.split()),
+                        negated=negated,
+                    )
+                )
+
+
+_CacheKey = Tuple[object, ...]
+# Ключ — путь и dev/ino/mtime/size корневого файла: контексты разных корней (rootfs, образы)
+# не подменяют записи друг друга. Запись хранит отпечаток всех файлов и каталогов include;
+# сверх POLICY_CACHE_MAX_ENTRIES вытесняются давно не использованные.
+_POLICY_CACHE: "OrderedDict[_CacheKey, Tuple[_CacheKey, SudoersPolicy]]" = OrderedDict()
+_POLICY_CACHE_LOCK = threading.Lock()
+
+
+def _fingerprint(ctx: AuditContextProtocol, paths: Iterable[str]) -> _CacheKey:
+    parts = []
+    for path in paths:
+        path_stat = ctx.stat(path)
+        parts.append(
+            (path,)
+            + tuple(getattr(path_stat, name, None) for name in ("st_dev", "st_ino", "st_mtime_ns", "st_size"))
+        )
+    return tuple(parts)
+
+
+def _cacheable(key: _CacheKey) -> bool:
+    return all(None not in part[1:] for part in key)
+
+
+def compile_sudoers(ctx: AuditContextProtocol, path: str = SUDOERS_PATH) -> Optional[SudoersPolicy]:
+    """Собирает sudoers и все include-файлы в индексированный набор правил.
+
+    Результат кешируется по mtime/size/inode всех прочитанных файлов и
+    include-каталогов (mtime каталога меняется при добавлении/удалении файлов);
+    в кеше не больше POLICY_CACHE_MAX_ENTRIES политик.
+    """
+    root_key = _fingerprint(ctx, [path])
+    with _POLICY_CACHE_LOCK:
+        cached = _POLICY_CACHE.get(root_key)
+        if cached is not None:
+            _POLICY_CACHE.move_to_end(root_key)
+    if cached is not None:
+        key, policy = cached
+        if _fingerprint(ctx, [part[0] for part in key]) == key:
+            return policy
+
+    reader = _Reader(ctx)
+    if not reader.read(path):
+        return None
+    compiler = _Compiler()
+    for line in reader.lines:
+        compiler.feed(line)
+
+    policy = SudoersPolicy(files=tuple(reader.files), rules=compiler.rules)
+    policy.index()
+    key = _fingerprint(ctx, reader.files + reader.dirs)
+    if _cacheable(key) and _cacheable(root_key):
+        with _POLICY_CACHE_LOCK:
+            _POLICY_CACHE[root_key] = (key, policy)
+            while len(_POLICY_CACHE) > POLICY_CACHE_MAX_ENTRIES:
+                _POLICY_CACHE.popitem(last=False)
+    return policy
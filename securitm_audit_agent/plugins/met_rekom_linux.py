@@ -1,19 +1,28 @@
 # Плагин проверок по рекомендациям ФСТЭК для Linux.
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import stat as stat_module
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from securitm_audit_agent.checks.builtin import SshRootLoginCheck
+from securitm_audit_agent.checks.kernel_rules import build_kernel_checks, load_kernel_rules
 from securitm_audit_agent.core.base import BaseCheck, CheckMeta, Status
 from securitm_audit_agent.core.report import AuditResult
+from securitm_audit_agent.platform.accounts import iter_group, iter_passwd, iter_shadow
+from securitm_audit_agent.platform.cron import CronJob, command_targets, load_crontab
+from securitm_audit_agent.platform.fsscan import (
+    FsPredicate,
+    FsScanEngine,
+    iter_tree,
+    stat_many,
+)
 from securitm_audit_agent.platform.protocols import AuditContextProtocol
+from securitm_audit_agent.platform.sudoers import compile_sudoers
 
-
-@dataclass
-class CmdlineParams:
-    params: Dict[str, str]
-    flags: List[str]
+KERNEL_RULES_PATH = Path(__file__).with_name("met_rekom_linux_kernel.yml")
 
 
 class MetCheck(BaseCheck):
@@ -21,31 +30,6 @@ class MetCheck(BaseCheck):
     pass
 
 
-def _read_sysctl(ctx: AuditContextProtocol, key: str) -> Optional[str]:
-    # sysctl ключи читаем через /proc/sys с заменой точек на слеши.
-    path = "/proc/sys/" + key.replace(".", "/")
-    content = ctx.read_file(path)
-    if content is None:
-        return None
-    return content.strip()
-
-
-def _read_cmdline(ctx: AuditContextProtocol) -> Optional[CmdlineParams]:
-    # Разбор параметров загрузки ядра из /proc/cmdline.
-    content = ctx.read_file("/proc/cmdline")
-    if content is None:
-        return None
-    params: Dict[str, str] = {}
-    flags: List[str] = []
-    for token in content.strip().split():
-        if "=" in token:
-            key, value = token.split("=", 1)
-            params[key] = value
-        else:
-            flags.append(token)
-    return CmdlineParams(params=params, flags=flags)
-
-
 def _mode(ctx: AuditContextProtocol, path: str) -> Optional[int]:
     stat = ctx.stat(path)
     if stat is None:
@@ -53,31 +37,6 @@ def _mode(ctx: AuditContextProtocol, path: str) -> Optional[int]:
     return stat.st_mode & 0o777
 
 
-def _parse_group_members(line: str) -> List[str]:
-    parts = line.strip().split(":")
-    if len(parts) < 4:
-        return []
-    members = parts[3].strip()
-    if not members:
-        return []
-    return [item for item in members.split(",") if item]
-
-
-def _read_passwd(ctx: AuditContextProtocol) -> List[Tuple[str, str, str]]:
-    content = ctx.read_file("/etc/passwd")
-    if content is None:
-        return []
-    users: List[Tuple[str, str, str]] = []
-    for line in content.splitlines():
-        if not line.strip() or line.startswith("#"):
-            continue
-        parts = line.split(":")
-        if len(parts) < 7:
-            continue
-        users.append((parts[0], parts[5], parts[6]))
-    return users
-
-
 def _is_interactive_home_user(home: str, shell: str) -> bool:
     """Ограничиваем проверку реальными пользовательскими home-каталогами.
 
@@ -92,36 +51,46 @@ def _is_interactive_home_user(home: str, shell: str) -> bool:
     return False
 
 
-def _iter_sudoers_lines(ctx: AuditContextProtocol) -> Iterable[Tuple[str, str]]:
-    # Читаем sudoers и include-каталог, если он есть.
-    paths = ["/etc/sudoers"]
-    paths.extend(_glob_paths(ctx, "/etc/sudoers.d"))
+def _select_homes(ctx: AuditContextProtocol, params: Dict[str, object]) -> Tuple[List[Tuple[str, str]], int]:
+    """Интерактивные пользователи и их home-каталоги с учётом autofs/NFS.
 
-    for path in paths:
-        content = ctx.read_file(path)
-        if content is None:
+    Обращение к home на autofs монтирует его, на NFS — уходит в сеть. На хостах
+    с LDAP и automount это тысячи монтирований за один прогон, поэтому такие
+    каталоги проверяются не больше max_remote_homes (по умолчанию 0), остальные
+    пропускаются и учитываются в сообщении.
+    """
+    table = ctx.mount_table()
+    limit = int(params.get("max_remote_homes", 0))  # type: ignore[arg-type]
+    selected: List[Tuple[str, str]] = []
+    remote = 0
+    skipped = 0
+    for entry in iter_passwd(ctx) or ():
+        if not _is_interactive_home_user(entry.home, entry.shell):
             continue
-        for line in content.splitlines():
-            yield path, line
+        if table.is_remote(entry.home):
+            if remote >= limit:
+                skipped += 1
+                continue
+            remote += 1
+        selected.append((entry.name, entry.home))
+    return selected, skipped
 
 
-def _glob_paths(ctx: AuditContextProtocol, base: str) -> List[str]:
-    entries = ctx.list_dir(base)
-    if not entries:
-        return []
-    return [f"{base}/{item}" for item in entries if item]
+def _skipped_note(skipped: int) -> str:
+    return f" ({skipped} remote homes skipped)" if skipped else ""
 
 
-def _collect_paths(ctx: AuditContextProtocol, base_paths: Iterable[str]) -> List[str]:
-    result: List[str] = []
+def _scan_modes(ctx: AuditContextProtocol, base_paths: Iterable[str]) -> List[Tuple[str, Optional[int]]]:
+    # Листинг и права берём из одного scandir на каталог вместо list_dir + stat на файл.
+    result: List[Tuple[str, Optional[int]]] = []
     for base in base_paths:
         # Сканируем только первый уровень, чтобы избежать тяжёлой рекурсии.
-        entries = ctx.list_dir(base)
+        entries = ctx.scan_dir(base)
         if not entries:
             continue
-        for item in entries:
-            if item:
-                result.append(f"{base}/{item}")
+        for entry in entries:
+            mode = entry.stat.st_mode & 0o777 if entry.stat is not None else None
+            result.append((entry.path, mode))
     return result
 
 
@@ -135,19 +104,11 @@ class MetNoEmptyPasswordsCheck(MetCheck):
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        content = ctx.read_file("/etc/shadow")
-        if content is None:
+        entries = iter_shadow(ctx)
+        if entries is None:
             return self._result(Status.SKIP, "/etc/shadow not readable", None)
 
-        bad_users: List[str] = []
-        for line in content.splitlines():
-            if not line.strip() or line.startswith("#"):
-                continue
-            parts = line.split(":")
-            if len(parts) < 2:
-                continue
-            if parts[1] == "":
-                bad_users.append(parts[0])
+        bad_users = [entry.name for entry in entries if entry.password == ""]
 
         if bad_users:
             return self._result(Status.FAIL, "Empty password field", ",".join(bad_users))
@@ -187,14 +148,14 @@ class MetSuWheelCheck(MetCheck):
                 pam_ok = True
                 break
 
-        group_content = ctx.read_file("/etc/group")
-        if group_content is None:
+        groups = iter_group(ctx)
+        if groups is None:
             return self._result(Status.SKIP, "/etc/group not readable", None)
 
         wheel_members: List[str] = []
-        for line in group_content.splitlines():
-            if line.startswith("wheel:"):
-                wheel_members = _parse_group_members(line)
+        for group in groups:
+            if group.name == "wheel":
+                wheel_members = list(group.members)
                 break
 
         if not pam_ok:
@@ -214,15 +175,18 @@ class MetSudoRestrictionsCheck(MetCheck):
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
+        policy = compile_sudoers(ctx)
+        if policy is None:
+            return self._result(Status.SKIP, "/etc/sudoers not readable", None)
+
+        # Правило с командой ALL (после раскрытия Cmnd_Alias) даёт полный root-доступ.
         offenders: List[str] = []
-        for path, line in _iter_sudoers_lines(ctx):
-            stripped = line.split("#", 1)[0].strip()
-            if not stripped or stripped.startswith("Defaults"):
+        for rule in policy.rules:
+            if rule.command != "ALL" or rule.negated:
                 continue
-            if "ALL=(ALL" in stripped and stripped.endswith("ALL"):
-                offenders.append(f"{path}: {stripped}")
-            if "NOPASSWD:ALL" in stripped:
-                offenders.append(f"{path}: {stripped}")
+            offender = f"{rule.source}: {rule.text}"
+            if offender not in offenders:
+                offenders.append(offender)
 
         if offenders:
             evidence = "; ".join(offenders[:5])
@@ -265,43 +229,188 @@ class MetPasswdGroupShadowPermsCheck(MetCheck):
 class MetRunningProcessPermsCheck(MetCheck):
     meta = CheckMeta(
         check_id="met_2_3_2_running_process_file_perms",
-        title="2.3.2 [MANUAL] Права доступа к файлам запущенных процессов",
-        description="Требует ручного аудита прав доступа к исполняемым файлам и каталогам запущенных процессов",
-        severity="info",
-        remediation="Провести ручной аудит прав доступа к исполняемым файлам и директориям",
+        title="2.3.2 Права доступа к файлам запущенных процессов",
+        description="Исполняемые файлы, библиотеки и рабочие каталоги запущенных процессов не должны быть доступны на запись другим",
+        severity="high",
+        remediation="chmod go-w для исполняемых файлов и библиотек процессов, chmod o-w или +t для их рабочих каталогов",
+        tags=("heavy",),
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        # Требуется ручной аудит путей и прав запущенных процессов.
-        return self._result(Status.SKIP, "Manual audit required for running process files", None)
+        include_maps = bool(params.get("include_maps", True))
+        pids = [name for name in ctx.list_dir("/proc") or [] if name.isdigit()]
+        if not pids:
+            return self._result(Status.SKIP, "/proc is not readable", None)
+
+        # Сначала собираем уникальные пути: тысячи процессов обычно делят сотни бинарей.
+        files: Dict[str, str] = {}
+        cwds: Dict[str, str] = {}
+        seen = 0
+        for pid in pids:
+            exe = _proc_link_target(ctx, f"/proc/{pid}/exe")
+            if exe is None:
+                # Потоки ядра и процессы, к которым нет доступа.
+                continue
+            seen += 1
+            files.setdefault(exe, pid)
+            cwd = _proc_link_target(ctx, f"/proc/{pid}/cwd")
+            if cwd is not None:
+                cwds.setdefault(cwd, pid)
+            if include_maps:
+                for path in _parse_maps_paths(ctx.read_file(f"/proc/{pid}/maps")):
+                    files.setdefault(path, pid)
+
+        if not seen:
+            return self._result(Status.SKIP, "No process executables readable", None)
+
+        stats = stat_many(ctx, list(files) + list(cwds))
+        bad: List[str] = []
+        for path, pid in files.items():
+            mode = _stat_mode(stats.get(path))
+            if mode is not None and mode & 0o022:
+                bad.append(f"{path} ({oct(mode)}, pid {pid})")
+        for path, pid in cwds.items():
+            cwd_stat = stats.get(path)
+            mode = _stat_mode(cwd_stat)
+            # Общие каталоги вроде /tmp допустимы, если выставлен sticky bit.
+            if mode is not None and mode & 0o002 and not cwd_stat.st_mode & 0o1000:  # type: ignore[union-attr]
+                bad.append(f"cwd {path} ({oct(mode)}, pid {pid})")
+
+        summary = f"{seen} processes, {len(files)} files, {len(cwds)} working directories"
+        if bad:
+            evidence = "; ".join(sorted(bad)[:5])
+            if len(bad) > 5:
+                evidence += " ..."
+            return self._result(Status.FAIL, f"Writable process files found ({summary})", evidence)
+        return self._result(Status.OK, f"Process file permissions OK ({summary})", None)
+
+
+def _proc_link_target(ctx: AuditContextProtocol, path: str) -> Optional[str]:
+    target = ctx.read_link(path)
+    if not target or not target.startswith("/"):
+        return None
+    # Удалённые после запуска файлы проверить уже нельзя.
+    if target.endswith(" (deleted)"):
+        return None
+    return target
+
+
+def _parse_maps_paths(content: Optional[str]) -> List[str]:
+    # Формат /proc/<pid>/maps: адрес, права, смещение, устройство, inode, путь.
+    if not content:
+        return []
+    paths: Dict[str, None] = {}
+    for line in content.splitlines():
+        parts = line.split(None, 5)
+        if len(parts) < 6 or "x" not in parts[1]:
+            continue
+        path = parts[5].strip()
+        if path.startswith("/") and not path.endswith(" (deleted)"):
+            paths[path] = None
+    return list(paths)
+
+
+def _stat_mode(path_stat: Optional[object]) -> Optional[int]:
+    if path_stat is None:
+        return None
+    return path_stat.st_mode & 0o777  # type: ignore[attr-defined]
 
 
 class MetCronJobsPermsCheck(MetCheck):
     meta = CheckMeta(
         check_id="met_2_3_3_cron_jobs_file_perms",
-        title="2.3.3 [MANUAL] Права доступа к файлам cron пользователей",
-        description="Требует ручного аудита прав доступа к файлам, вызываемым из cron",
-        severity="info",
-        remediation="Провести ручной аудит файлов, выполняемых из cron",
+        title="2.3.3 Права доступа к файлам, запускаемым из cron",
+        description="Исполняемые файлы и скрипты заданий cron не должны быть доступны на запись группе/прочим",
+        severity="high",
+        remediation="chmod go-w для файлов, вызываемых из cron",
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        # Требуется ручной аудит файлов, вызываемых из cron.
-        return self._result(Status.SKIP, "Manual audit required for cron job files", None)
+        jobs: List[CronJob] = []
+        found = False
+        for path, system, user in _iter_crontab_sources(ctx):
+            parsed = load_crontab(ctx, path, system, user)
+            if parsed is None:
+                continue
+            found = True
+            jobs.extend(parsed)
+
+        if not found:
+            return self._result(Status.SKIP, "No crontabs readable", None)
+
+        def exists(path: str) -> bool:
+            return ctx.stat(path) is not None
+
+        # Уникальные цели собираем до stat: одна и та же команда часто встречается во многих заданиях.
+        targets: Dict[str, str] = {}
+        for job in jobs:
+            for target in command_targets(job.command, job.search_path, exists):
+                targets.setdefault(target, f"{job.source}:{job.line_no}")
+
+        stats = stat_many(ctx, targets)
+        bad: List[str] = []
+        for path, origin in targets.items():
+            mode = _stat_mode(stats.get(path))
+            if mode is not None and mode & 0o022:
+                bad.append(f"{path} ({oct(mode)}, {origin})")
+
+        summary = f"{len(jobs)} jobs, {len(targets)} files"
+        if bad:
+            evidence = "; ".join(sorted(bad)[:5])
+            if len(bad) > 5:
+                evidence += " ..."
+            return self._result(Status.FAIL, f"Cron job files are writable by others ({summary})", evidence)
+        return self._result(Status.OK, f"Cron job file permissions OK ({summary})", None)
+
+
+def _iter_crontab_sources(ctx: AuditContextProtocol) -> Iterable[Tuple[str, bool, Optional[str]]]:
+    # (путь, системный формат, пользователь) для всех известных расположений crontab.
+    yield "/etc/crontab", True, None
+    for entry in ctx.scan_dir("/etc/cron.d") or []:
+        if not entry.is_dir and not entry.name.startswith("."):
+            yield entry.path, True, None
+    for base in ("/var/spool/cron", "/var/spool/cron/crontabs"):
+        for entry in ctx.scan_dir(base) or []:
+            if not entry.is_dir and not entry.name.startswith("."):
+                yield entry.path, False, entry.name
 
 
 class MetSudoExecPermsCheck(MetCheck):
     meta = CheckMeta(
         check_id="met_2_3_4_sudo_exec_file_perms",
-        title="2.3.4 [MANUAL] Права доступа к файлам, запускаемым через sudo",
-        description="Требует ручного аудита владельца и прав доступа к sudo-исполняемым файлам",
-        severity="info",
-        remediation="Провести ручной аудит владельца и прав доступа к sudo-исполняемым файлам",
+        title="2.3.4 Права доступа к файлам, запускаемым через sudo",
+        description="Файлы, запускаемые через sudo, должны принадлежать root и не быть доступны на запись группе/прочим",
+        severity="high",
+        remediation="chown root и chmod go-w для файлов, разрешённых в sudoers",
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        # Требуется ручной аудит sudo-исполняемых файлов.
-        return self._result(Status.SKIP, "Manual audit required for sudo-executed files", None)
+        policy = compile_sudoers(ctx)
+        if policy is None:
+            return self._result(Status.SKIP, "/etc/sudoers not readable", None)
+
+        # Уникальные исполняемые файлы из всех правил, один stat на файл.
+        executables = policy.executables()
+        stats = stat_many(ctx, executables)
+        bad: List[str] = []
+        for path, rule in executables.items():
+            path_stat = stats.get(path)
+            if path_stat is None:
+                continue
+            mode = path_stat.st_mode & 0o777
+            origin = f"{rule.source}:{rule.line_no}"
+            if path_stat.st_uid != 0:
+                bad.append(f"{path} (uid {path_stat.st_uid}, {origin})")
+            elif mode & 0o022:
+                bad.append(f"{path} ({oct(mode)}, {origin})")
+
+        summary = f"{len(policy.rules)} rules, {len(executables)} files"
+        if bad:
+            evidence = "; ".join(sorted(bad)[:5])
+            if len(bad) > 5:
+                evidence += " ..."
+            return self._result(Status.FAIL, f"Sudo-executed files have unsafe owner or permissions ({summary})", evidence)
+        return self._result(Status.OK, f"Sudo-executed file permissions OK ({summary})", None)
 
 
 class MetRcServicePermsCheck(MetCheck):
@@ -319,18 +428,14 @@ class MetRcServicePermsCheck(MetCheck):
             base_paths.append(f"/etc/rc{idx}.d")
         service_paths = ["/etc/systemd/system", "/lib/systemd/system", "/usr/lib/systemd/system"]
 
-        files = _collect_paths(ctx, base_paths)
-        for base in service_paths:
-            files.extend(_collect_paths(ctx, [base]))
-
+        files = _scan_modes(ctx, base_paths + service_paths)
         if not files:
             return self._result(Status.SKIP, "No rc.d or .service files found", None)
 
         bad: List[str] = []
-        for path in files:
+        for path, mode in files:
             if not path.endswith(".service") and "/rc" not in path:
                 continue
-            mode = _mode(ctx, path)
             if mode is None:
                 continue
             if mode & 0o002:
@@ -372,12 +477,11 @@ class MetSystemCronPermsCheck(MetCheck):
             found = True
             if mode & 0o033:
                 bad.append(f"{path} ({oct(mode)})")
-            if ctx.stat(path) is not None and not path.endswith("crontab"):
+            if not path.endswith("crontab"):
                 dir_targets.append(path)
 
         # Кроме самих каталогов cron нужно проверять и файлы внутри них.
-        for path in _collect_paths(ctx, dir_targets):
-            mode = _mode(ctx, path)
+        for path, mode in _scan_modes(ctx, dir_targets):
             if mode is None:
                 continue
             found = True
@@ -402,13 +506,12 @@ class MetUserCronPermsCheck(MetCheck):
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
         targets = ["/var/spool/cron", "/var/spool/cron/crontabs"]
-        files = _collect_paths(ctx, targets)
+        files = _scan_modes(ctx, targets)
         if not files:
             return self._result(Status.SKIP, "No user cron files found", None)
 
         bad: List[str] = []
-        for path in files:
-            mode = _mode(ctx, path)
+        for path, mode in files:
             if mode is None:
                 continue
             if mode & 0o022:
@@ -422,15 +525,155 @@ class MetUserCronPermsCheck(MetCheck):
 class MetSystemBinsPermsCheck(MetCheck):
     meta = CheckMeta(
         check_id="met_2_3_8_system_bins_libs_perms",
-        title="2.3.8 [MANUAL] Права доступа к системным бинарям и библиотекам",
-        description="Требует ручного аудита прав доступа к /bin, /usr/bin, /lib и модулям ядра",
-        severity="info",
-        remediation="Провести ручной аудит прав доступа к системным бинарям и библиотекам",
-    )
+        title="2.3.8 Права доступа к системным бинарям и библиотекам",
+        description="Проверка владельца и отсутствия записи для группы/прочих в /bin, /usr/bin, /lib и модулях ядра",
+        severity="high",
+        remediation="chown root и chmod go-w для системных бинарей, библиотек и их каталогов",
+        tags=("heavy",),
+    )
+
+    BIN_ROOTS = ("/bin", "/sbin", "/usr/bin", "/usr/sbin", "/lib/modules")
+    # Области общего обхода; прочие каталоги lib* из _roots обходятся напрямую.
+    SCAN_PREFIXES = (
+        "/bin",
+        "/sbin",
+        "/lib",
+        "/lib32",
+        "/lib64",
+        "/libx32",
+        "/usr/bin",
+        "/usr/sbin",
+        "/usr/lib",
+        "/usr/lib32",
+        "/usr/lib64",
+        "/usr/libx32",
+        "/usr/libexec",
+    )
+
+    def __init__(self, scanner: Optional[FsScanEngine] = None) -> None:
+        # Системные каталоги просматриваются в общем обходе / вместе с другими потребителями FsScanEngine.
+        # Буфер не ограничен: каждый кандидат перепроверяется с allowed_uids из параметров.
+        self._scanner = scanner or FsScanEngine()
+        self.isolation_group = self._scanner
+        self._scanner.register(
+            FsPredicate(
+                name=self.meta.check_id,
+                file_types=frozenset({"file", "dir", "other"}),
+                prefixes=self.SCAN_PREFIXES,
+                test=_system_scan_candidate,
+                limit=None,
+            )
+        )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        # Требуется ручной аудит системных бинарей и библиотек.
-        return self._result(Status.SKIP, "Manual audit required for system binaries", None)
+        allowed_uids = frozenset(int(uid) for uid in params.get("allowed_uids", [0]))  # type: ignore[union-attr]
+        workers = int(params.get("workers", os.cpu_count() or 1))  # type: ignore[arg-type]
+
+        roots = self._roots(ctx)
+        if not roots:
+            return self._result(Status.SKIP, "No system binary directories found", None)
+
+        # Родительские каталоги и сами корни тоже не должны быть доступны на запись.
+        candidates = ["/", "/usr"] + roots
+        direct = list(roots)
+        if 0 in allowed_uids:
+            # Кандидаты общего обхода отобраны для владельца root, поэтому годятся, только если root разрешён.
+            scan = self._scanner.results(ctx, self.meta.check_id)
+            candidates += scan.paths
+            if scan.complete:
+                # Общий обход не выходит за пределы ФС корня и за SCAN_PREFIXES.
+                root_dev = getattr(ctx.stat("/"), "st_dev", None)
+                direct = [
+                    root
+                    for root in roots
+                    if not any(root == prefix or root.startswith(prefix + "/") for prefix in self.SCAN_PREFIXES)
+                    or getattr(ctx.stat(root), "st_dev", root_dev) != root_dev
+                ]
+
+        issues: Dict[str, str] = {}
+        for path in candidates:
+            path_stat = ctx.stat(path)
+            is_dir = path_stat is not None and stat_module.S_ISDIR(path_stat.st_mode)
+            issue = _system_path_issue(path, path_stat, allowed_uids, is_dir=is_dir)
+            if issue:
+                issues[path] = issue
+
+        # Корни вне общего обхода — параллельно (scandir/lstat отпускают GIL на время системного вызова).
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            for partial in pool.map(lambda path: _scan_system_subtree(ctx, path, allowed_uids), direct):
+                issues.update(partial)
+
+        if issues:
+            evidence = "; ".join(sorted(issues.values())[:5])
+            if len(issues) > 5:
+                evidence += f" ... ({len(issues)} total)"
+            return self._result(Status.FAIL, "Insecure system binaries/libraries permissions", evidence)
+        return self._result(Status.OK, "System binaries and libraries permissions OK", None)
+
+    def _roots(self, ctx: AuditContextProtocol) -> List[str]:
+        candidates = list(self.BIN_ROOTS)
+        for base in ("/", "/usr"):
+            for name in ctx.list_dir(base) or []:
+                if name.startswith("lib"):
+                    candidates.append(f"{base.rstrip('/')}/{name}")
+
+        # Каталоги /usr идут первыми, чтобы при merged-usr в evidence попадали реальные пути.
+        ordered = sorted(set(candidates), key=lambda path: (not path.startswith("/usr/"), path))
+        existing = [path for path in ordered if ctx.stat(path) is not None]
+        roots: List[str] = []
+        seen: set = set()
+        for path in existing:
+            # /lib/modules уже покрыт обходом /lib (или /usr/lib при merged-usr).
+            if any(path.startswith(other + "/") for other in existing):
+                continue
+            path_stat = ctx.stat(path)
+            key = (getattr(path_stat, "st_dev", None), getattr(path_stat, "st_ino", None))
+            if None not in key:
+                # При merged-usr /bin и /usr/bin — один и тот же каталог.
+                if key in seen:
+                    continue
+                seen.add(key)
+            roots.append(path)
+        return roots
+
+
+def _system_path_issue(
+    path: str,
+    path_stat: Optional[object],
+    allowed_uids: frozenset,
+    is_dir: bool,
+) -> Optional[str]:
+    if path_stat is None:
+        return None
+    mode = path_stat.st_mode  # type: ignore[attr-defined]
+    uid = getattr(path_stat, "st_uid", 0)
+    if uid not in allowed_uids:
+        return f"{path} (owner uid {uid})"
+    if mode & 0o022:
+        kind = "writable dir" if is_dir else "writable"
+        return f"{path} ({kind} {oct(mode & 0o7777)})"
+    return None
+
+
+def _system_entry_issue(entry, allowed_uids: frozenset) -> Optional[str]:
+    # Права симлинков всегда 0777 и ничего не значат.
+    if entry.is_symlink:
+        return None
+    return _system_path_issue(entry.path, entry.stat, allowed_uids, is_dir=entry.is_dir)
+
+
+def _system_scan_candidate(entry) -> bool:
+    # Отбор в общем обходе: владелец не root или запись для группы/прочих.
+    return _system_entry_issue(entry, frozenset({0})) is not None
+
+
+def _scan_system_subtree(ctx: AuditContextProtocol, root: str, allowed_uids: frozenset) -> Dict[str, str]:
+    issues: Dict[str, str] = {}
+    for entry in iter_tree(ctx, root, same_device=False):
+        issue = _system_entry_issue(entry, allowed_uids)
+        if issue:
+            issues[entry.path] = issue
+    return issues
 
 
 class MetSuidSgidPermsCheck(MetCheck):
@@ -440,18 +683,24 @@ class MetSuidSgidPermsCheck(MetCheck):
         description="Проверка отсутствия записи для группы/прочих на SUID/SGID файлах",
         severity="high",
         remediation="chmod go-w для SUID/SGID файлов",
+        tags=("heavy",),
     )
 
+    def __init__(self, scanner: Optional[FsScanEngine] = None) -> None:
+        # Обход / общий с другими потребителями FsScanEngine, если он передан из register().
+        self._scanner = scanner or FsScanEngine()
+        self.isolation_group = self._scanner
+        self._scanner.register(FsPredicate(name=self.meta.check_id, mode_masks=(0o6000, 0o022)))
+
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        cmd = ["find", "/", "-xdev", "-type", "f", "-perm", "/6000", "-perm", "/0022", "-print"]
-        result = ctx.run_cmd(cmd)
-        if result.returncode not in {0, 1}:
-            return self._result(Status.SKIP, "find failed for SUID/SGID scan", None)
+        scan = self._scanner.results(ctx, self.meta.check_id)
+        if not scan.complete:
+            return self._result(Status.SKIP, "Filesystem scan for SUID/SGID failed", None)
 
-        bad = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        bad = scan.paths
         if bad:
             evidence = "; ".join(bad[:5])
-            if len(bad) > 5:
+            if scan.total > 5:
                 evidence += " ..."
             return self._result(Status.FAIL, "Writable SUID/SGID files found", evidence)
         return self._result(Status.OK, "No writable SUID/SGID files", None)
@@ -466,37 +715,48 @@ class MetHomeFilesPermsCheck(MetCheck):
         remediation="chmod go-rwx для файлов в домашних каталогах",
     )
 
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        targets = [
-            ".bash_history",
-            ".history",
-            ".sh_history",
-            ".bash_profile",
-            ".bashrc",
-            ".profile",
-            ".bash_logout",
-            ".rhosts",
-        ]
+    targets = (
+        ".bash_history",
+        ".history",
+        ".sh_history",
+        ".bash_profile",
+        ".bashrc",
+        ".profile",
+        ".bash_logout",
+        ".rhosts",
+    )
 
-        users = _read_passwd(ctx)
+    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
+        homes, skipped = _select_homes(ctx, params)
         bad: List[str] = []
-        for user, home, _shell in users:
-            if not _is_interactive_home_user(home, _shell):
+        checked = 0
+        for user, home in homes:
+            # Листинг без stat, затем stat только существующих целевых файлов, а не всего каталога.
+            names = ctx.list_dir(home)
+            if names is None:
                 continue
-            for name in targets:
-                path = f"{home}/{name}"
-                mode = _mode(ctx, path)
-                if mode is None:
+            checked += 1
+            present = set(names)
+            for name in self.targets:
+                if name not in present:
                     continue
+                path = os.path.join(home, name)
+                path_stat = ctx.stat(path)
+                if path_stat is None:
+                    continue
+                mode = path_stat.st_mode & 0o777
                 if mode & 0o077:
                     bad.append(f"{user}:{path} ({oct(mode)})")
 
+        note = _skipped_note(skipped)
+        if not checked:
+            return self._result(Status.SKIP, f"No home directories checked{note}", None)
         if bad:
             evidence = "; ".join(bad[:5])
             if len(bad) > 5:
                 evidence += " ..."
-            return self._result(Status.FAIL, "Home files have wide permissions", evidence)
-        return self._result(Status.OK, "Home file permissions OK", None)
+            return self._result(Status.FAIL, f"Home files have wide permissions{note}", evidence)
+        return self._result(Status.OK, f"Home file permissions OK{note}", None)
 
 
 class MetHomeDirsPermsCheck(MetCheck):
@@ -509,159 +769,44 @@ class MetHomeDirsPermsCheck(MetCheck):
     )
 
     def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        users = _read_passwd(ctx)
+        homes, skipped = _select_homes(ctx, params)
+        table = ctx.mount_table()
+        # В /home бывают тысячи каталогов: листинг родителя — только имена, stat — только выбранным home.
+        listings: Dict[str, Optional[set]] = {}
         bad: List[str] = []
-        for user, home, _shell in users:
-            if not _is_interactive_home_user(home, _shell):
+        checked = 0
+        for user, home in homes:
+            parent, _sep, name = home.rpartition("/")
+            parent = parent or "/"
+            if parent not in listings:
+                names = ctx.list_dir(parent)
+                listings[parent] = set(names) if names is not None else None
+            listing = listings[parent]
+            # Отсутствующий локальный home пропускаем без stat; autofs не показывает несмонтированные каталоги.
+            if listing is not None and name not in listing and not table.is_remote(home):
                 continue
-            mode = _mode(ctx, home)
+            mode = _stat_mode(ctx.stat(home))
             if mode is None:
                 continue
+            checked += 1
             if mode & 0o077:
                 bad.append(f"{user}:{home} ({oct(mode)})")
 
+        note = _skipped_note(skipped)
+        if not checked:
+            return self._result(Status.SKIP, f"No home directories checked{note}", None)
         if bad:
             evidence = "; ".join(bad[:5])
             if len(bad) > 5:
                 evidence += " ..."
-            return self._result(Status.FAIL, "Home directories are too permissive", evidence)
-        return self._result(Status.OK, "Home directory permissions OK", None)
-
-
-class MetSysctlCheck(MetCheck):
-    def __init__(self, check_id: str, title: str, description: str, key: str, expected: str) -> None:
-        self.meta = CheckMeta(
-            check_id=check_id,
-            title=title,
-            description=description,
-            severity="medium",
-            remediation=f"Set {key} to {expected}",
-        )
-        self._key = key
-        self._expected = expected
-
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        value = _read_sysctl(ctx, self._key)
-        if value is None:
-            return self._result(Status.SKIP, f"{self._key} not readable", None)
-        if value == self._expected:
-            return self._result(Status.OK, f"{self._key}={value}", value)
-        return self._result(Status.FAIL, f"{self._key}={value}", value)
-
-
-class MetSysctlMinCheck(MetCheck):
-    def __init__(self, check_id: str, title: str, description: str, key: str, min_value: int) -> None:
-        self.meta = CheckMeta(
-            check_id=check_id,
-            title=title,
-            description=description,
-            severity="medium",
-            remediation=f"Set {key} to {min_value} or higher",
-        )
-        self._key = key
-        self._min = min_value
-
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        value = _read_sysctl(ctx, self._key)
-        if value is None:
-            return self._result(Status.SKIP, f"{self._key} not readable", None)
-        try:
-            current = int(value)
-        except ValueError:
-            return self._result(Status.FAIL, f"{self._key} not an integer", value)
-        if current >= self._min:
-            return self._result(Status.OK, f"{self._key}={current}", value)
-        return self._result(Status.FAIL, f"{self._key}={current}", value)
-
-
-class MetCmdlineCheck(MetCheck):
-    def __init__(
-        self,
-        check_id: str,
-        title: str,
-        description: str,
-        key: str,
-        expected: Optional[str] = None,
-    ) -> None:
-        self.meta = CheckMeta(
-            check_id=check_id,
-            title=title,
-            description=description,
-            severity="medium",
-            remediation=f"Set {key}={expected} in kernel cmdline" if expected else f"Set {key} in kernel cmdline",
-        )
-        self._key = key
-        self._expected = expected
-
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        cmdline = _read_cmdline(ctx)
-        if cmdline is None:
-            return self._result(Status.SKIP, "/proc/cmdline not readable", None)
-
-        if self._expected is None:
-            if self._key in cmdline.flags:
-                return self._result(Status.OK, f"{self._key} enabled", None)
-            return self._result(Status.FAIL, f"{self._key} not set", None)
-
-        value = cmdline.params.get(self._key)
-        if value == self._expected:
-            return self._result(Status.OK, f"{self._key}={value}", value)
-        return self._result(Status.FAIL, f"{self._key}={value}", value)
-
-
-class MetCmdlineMultiCheck(MetCheck):
-    def __init__(
-        self,
-        check_id: str,
-        title: str,
-        description: str,
-        expected: Dict[str, str],
-    ) -> None:
-        self.meta = CheckMeta(
-            check_id=check_id,
-            title=title,
-            description=description,
-            severity="medium",
-            remediation="Set required kernel cmdline parameters",
-        )
-        self._expected = expected
-
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        cmdline = _read_cmdline(ctx)
-        if cmdline is None:
-            return self._result(Status.SKIP, "/proc/cmdline not readable", None)
-
-        missing: List[str] = []
-        for key, expected in self._expected.items():
-            value = cmdline.params.get(key)
-            if value != expected:
-                missing.append(f"{key}={expected}")
-
-        if missing:
-            return self._result(Status.FAIL, "Missing kernel params", ", ".join(missing))
-        return self._result(Status.OK, "Kernel params configured", None)
-
-
-class MetDebugfsCheck(MetCheck):
-    meta = CheckMeta(
-        check_id="met_2_5_3_debugfs",
-        title="2.5.3 Отключение debugfs",
-        description="debugfs должен быть отключен через cmdline",
-        severity="medium",
-        remediation="Set debugfs=off or debugfs=no-mount in kernel cmdline",
-    )
-
-    def check(self, ctx: AuditContextProtocol, params: Dict[str, object]) -> AuditResult:
-        cmdline = _read_cmdline(ctx)
-        if cmdline is None:
-            return self._result(Status.SKIP, "/proc/cmdline not readable", None)
-        value = cmdline.params.get("debugfs")
-        if value in {"off", "no-mount", "nomount"}:
-            return self._result(Status.OK, f"debugfs={value}", value)
-        return self._result(Status.FAIL, f"debugfs={value}", value)
+            return self._result(Status.FAIL, f"Home directories are too permissive{note}", evidence)
+        return self._result(Status.OK, f"Home directory permissions OK{note}", None)
 
 
 def register(registry) -> None:
+    # Один обход файловой системы на все проверки, которые в нём нуждаются.
+    fs_scanner = FsScanEngine(workers=os.cpu_count() or 1)
+
     registry.register(MetNoEmptyPasswordsCheck())
     registry.register(MetSshRootLoginCheck())
     registry.register(MetSuWheelCheck())
@@ -673,230 +818,11 @@ def register(registry) -> None:
     registry.register(MetRcServicePermsCheck())
     registry.register(MetSystemCronPermsCheck())
     registry.register(MetUserCronPermsCheck())
-    registry.register(MetSystemBinsPermsCheck())
-    registry.register(MetSuidSgidPermsCheck())
+    registry.register(MetSystemBinsPermsCheck(fs_scanner))
+    registry.register(MetSuidSgidPermsCheck(fs_scanner))
     registry.register(MetHomeFilesPermsCheck())
     registry.register(MetHomeDirsPermsCheck())
 
-    registry.register(
-        MetSysctlCheck(
-            "met_2_4_1_kernel_dmesg_restrict",
-            "2.4.1 Ограничение dmesg",
-            "kernel.dmesg_restrict=1",
-            "kernel.dmesg_restrict",
-            "1",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_4_2_kernel_kptr_restrict",
-            "2.4.2 Ограничение kptr",
-            "kernel.kptr_restrict=2",
-            "kernel.kptr_restrict",
-            "2",
-        )
-    )
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_4_3_init_on_alloc",
-            "2.4.3 init_on_alloc",
-            "init_on_alloc=1",
-            "init_on_alloc",
-            "1",
-        )
-    )
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_4_4_slab_nomerge",
-            "2.4.4 slab_nomerge",
-            "slab_nomerge",
-            "slab_nomerge",
-            None,
-        )
-    )
-    registry.register(
-        MetCmdlineMultiCheck(
-            "met_2_4_5_iommu",
-            "2.4.5 IOMMU",
-            "iommu=force, iommu.strict=1, iommu.passthrough=0",
-            {
-                "iommu": "force",
-                "iommu.strict": "1",
-                "iommu.passthrough": "0",
-            },
-        )
-    )
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_4_6_randomize_kstack_offset",
-            "2.4.6 randomize_kstack_offset",
-            "randomize_kstack_offset=1",
-            "randomize_kstack_offset",
-            "1",
-        )
-    )
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_4_7_mitigations",
-            "2.4.7 mitigations",
-            "mitigations=auto,nosmt",
-            "mitigations",
-            "auto,nosmt",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_4_8_bpf_jit_harden",
-            "2.4.8 bpf_jit_harden",
-            "net.core.bpf_jit_harden=2",
-            "net.core.bpf_jit_harden",
-            "2",
-        )
-    )
-
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_5_1_vsyscall",
-            "2.5.1 vsyscall",
-            "vsyscall=none",
-            "vsyscall",
-            "none",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_2_perf_event_paranoid",
-            "2.5.2 perf_event_paranoid",
-            "kernel.perf_event_paranoid=3",
-            "kernel.perf_event_paranoid",
-            "3",
-        )
-    )
-    registry.register(MetDebugfsCheck())
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_4_kexec_disabled",
-            "2.5.4 kexec_load_disabled",
-            "kernel.kexec_load_disabled=1",
-            "kernel.kexec_load_disabled",
-            "1",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_5_user_namespaces",
-            "2.5.5 user namespaces",
-            "user.max_user_namespaces=0",
-            "user.max_user_namespaces",
-            "0",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_6_unpriv_bpf",
-            "2.5.6 unprivileged bpf",
-            "kernel.unprivileged_bpf_disabled=1",
-            "kernel.unprivileged_bpf_disabled",
-            "1",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_7_userfaultfd",
-            "2.5.7 userfaultfd",
-            "vm.unprivileged_userfaultfd=0",
-            "vm.unprivileged_userfaultfd",
-            "0",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_8_tty_ldisc_autoload",
-            "2.5.8 tty ldisc autoload",
-            "dev.tty.ldisc_autoload=0",
-            "dev.tty.ldisc_autoload",
-            "0",
-        )
-    )
-    registry.register(
-        MetCmdlineCheck(
-            "met_2_5_9_tsx",
-            "2.5.9 tsx=off",
-            "tsx=off",
-            "tsx",
-            "off",
-        )
-    )
-    registry.register(
-        MetSysctlMinCheck(
-            "met_2_5_10_mmap_min_addr",
-            "2.5.10 mmap_min_addr",
-            "vm.mmap_min_addr >= 4096",
-            "vm.mmap_min_addr",
-            4096,
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_5_11_randomize_va_space",
-            "2.5.11 randomize_va_space",
-            "kernel.randomize_va_space=2",
-            "kernel.randomize_va_space",
-            "2",
-        )
-    )
-
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_1_ptrace_scope",
-            "2.6.1 ptrace_scope",
-            "kernel.yama.ptrace_scope=3",
-            "kernel.yama.ptrace_scope",
-            "3",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_2_protected_symlinks",
-            "2.6.2 protected_symlinks",
-            "fs.protected_symlinks=1",
-            "fs.protected_symlinks",
-            "1",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_3_protected_hardlinks",
-            "2.6.3 protected_hardlinks",
-            "fs.protected_hardlinks=1",
-            "fs.protected_hardlinks",
-            "1",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_4_protected_fifos",
-            "2.6.4 protected_fifos",
-            "fs.protected_fifos=2",
-            "fs.protected_fifos",
-            "2",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_5_protected_regular",
-            "2.6.5 protected_regular",
-            "fs.protected_regular=2",
-            "fs.protected_regular",
-            "2",
-        )
-    )
-    registry.register(
-        MetSysctlCheck(
-            "met_2_6_6_suid_dumpable",
-            "2.6.6 suid_dumpable",
-            "fs.suid_dumpable=0",
-            "fs.suid_dumpable",
-            "0",
-        )
-    )
+    # Правила sysctl/cmdline описаны таблицей и оцениваются за один снимок /proc.
+    for check in build_kernel_checks(load_kernel_rules(KERNEL_RULES_PATH)):
+        registry.register(check)
@@ -0,0 +1,248 @@
+# История прогонов аудита в SQLite: результаты с длительностями, изменения статусов и хранение.
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from securitm_audit_agent.core.report import AuditReport
+
+DAY_SECONDS = 24 * 3600
+
+# results денормализована (hostname, finished_at в каждой строке), чтобы запросы по хосту,
+# проверке и периоду шли по индексу без соединения с runs.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    hostname TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    duration_seconds REAL NOT NULL,
+    throttled_seconds REAL NOT NULL,
+    agent_version TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_host_time ON runs (hostname, finished_at);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    hostname TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    previous_status TEXT,
+    evidence_hash TEXT,
+    duration_seconds REAL,
+    changed INTEGER NOT NULL,
+    PRIMARY KEY (run_id, check_id)
+);
+CREATE INDEX IF NOT EXISTS results_host_check_time ON results (hostname, check_id, finished_at);
+CREATE INDEX IF NOT EXISTS results_check_time ON results (check_id, finished_at);
+CREATE TABLE IF NOT EXISTS latest (
+    hostname TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    evidence_hash TEXT,
+    PRIMARY KEY (hostname, check_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _evidence_hash(evidence: Optional[str]) -> Optional[str]:
+    # Evidence бывает длинным; для поиска изменений достаточно хеша.
+    if evidence is None:
+        return None
+    return hashlib.sha1(evidence.encode("utf-8", "replace")).hexdigest()[:16]
+
+
+def _isoformat(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class RunHistory:
+    """Локальное хранилище истории прогонов аудита (SQLite, WAL).
+
+    record добавляет прогон и его результаты; изменение статуса или evidence
+    относительно прошлого прогона хоста помечается в строке (changed), так что
+    «когда проверка последний раз менялась» — один индексный запрос. prune
+    удаляет прогоны старше retain_days и сжимает историю старше
+    compact_after_days до строк с изменениями; граница сжатия хранится в meta,
+    и перцентили длительностей считаются только по несжатой части истории.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunHistory":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def record(self, report: AuditReport) -> int:
+        """Добавляет прогон; возвращает его id."""
+        hostname = str(report.host.get("hostname") or "")
+        finished_at = report.finished_at.timestamp()
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (hostname, started_at, finished_at, duration_seconds, throttled_seconds,"
+                " agent_version) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    hostname,
+                    report.started_at.timestamp(),
+                    finished_at,
+                    report.duration_seconds,
+                    report.throttled_seconds,
+                    report.agent_version,
+                ),
+            )
+            run_id = int(cursor.lastrowid)
+            latest = {
+                row["check_id"]: (row["status"], row["evidence_hash"])
+                for row in self._conn.execute(
+                    "SELECT check_id, status, evidence_hash FROM latest WHERE hostname = ?", (hostname,)
+                )
+            }
+            rows = []
+            for result in report.results:
+                evidence_hash = _evidence_hash(result.evidence)
+                previous = latest.get(result.check_id)
+                changed = previous is None or previous != (result.status.value, evidence_hash)
+                rows.append(
+                    (
+                        run_id,
+                        hostname,
+                        result.check_id,
+                        finished_at,
+                        result.status.value,
+                        previous[0] if previous else None,
+                        evidence_hash,
+                        result.duration_seconds,
+                        int(changed),
+                    )
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (run_id, hostname, check_id, finished_at, status, previous_status,"
+                " evidence_hash, duration_seconds, changed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO latest (hostname, check_id, status, evidence_hash) VALUES (?, ?, ?, ?)",
+                [(hostname, row[2], row[4], row[6]) for row in rows],
+            )
+        return run_id
+
+    def last_change(self, hostname: str, check_id: str) -> Optional[Dict[str, Any]]:
+        """Последнее изменение статуса или evidence проверки на хосте."""
+        row = self._conn.execute(
+            "SELECT finished_at, status, previous_status FROM results"
+            " WHERE hostname = ? AND check_id = ? AND changed = 1 ORDER BY finished_at DESC LIMIT 1",
+            (hostname, check_id),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "finished_at": _isoformat(row["finished_at"]),
+            "status": row["status"],
+            "previous_status": row["previous_status"],
+        }
+
+    def duration_percentile(
+        self,
+        check_id: str,
+        percentile: float = 95.0,
+        days: float = 30.0,
+        hostname: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> Optional[float]:
+        """Длительность проверки по ближайшему рангу за последние days дней (по всем хостам или одному).
+
+        Сжатая prune история не учитывается: в ней остались только строки с
+        изменениями, и перцентиль по ним был бы смещён. Окно обрезается по
+        compacted_before.
+        """
+        since = max((now if now is not None else time.time()) - days * DAY_SECONDS, self.compacted_before())
+        where = "check_id = ? AND finished_at >= ? AND duration_seconds IS NOT NULL"
+        params: List[Any] = [check_id, since]
+        if hostname is not None:
+            where += " AND hostname = ?"
+            params.append(hostname)
+        count = self._conn.execute(f"SELECT COUNT(*) FROM results WHERE {where}", params).fetchone()[0]
+        if not count:
+            return None
+        rank = max(int(-(-percentile * count // 100)), 1)
+        row = self._conn.execute(
+            f"SELECT duration_seconds FROM results WHERE {where} ORDER BY duration_seconds LIMIT 1 OFFSET ?",
+            [*params, min(rank, count) - 1],
+        ).fetchone()
+        return float(row[0])
+
+    def compacted_before(self) -> float:
+        """Граница сжатия истории (epoch): раньше неё хранятся только изменения."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_before'").fetchone()
+        return float(row[0]) if row is not None else 0.0
+
+    def status_history(self, hostname: str, check_id: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """Последние результаты проверки на хосте, от новых к старым (для графиков тренда)."""
+        rows = self._conn.execute(
+            "SELECT finished_at, status, duration_seconds, changed FROM results"
+            " WHERE hostname = ? AND check_id = ? ORDER BY finished_at DESC LIMIT ?",
+            (hostname, check_id, limit),
+        )
+        return [
+            {
+                "finished_at": _isoformat(row["finished_at"]),
+                "status": row["status"],
+                "duration_seconds": row["duration_seconds"],
+                "changed": bool(row["changed"]),
+            }
+            for row in rows
+        ]
+
+    def prune(
+        self,
+        retain_days: Optional[float] = None,
+        compact_after_days: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """Удаляет прогоны старше retain_days и строки без изменений старше compact_after_days."""
+        current = now if now is not None else time.time()
+        removed = {"runs": 0, "results": 0}
+        with self._conn:
+            if compact_after_days is not None:
+                compact_before = current - compact_after_days * DAY_SECONDS
+                cursor = self._conn.execute(
+                    "DELETE FROM results WHERE finished_at < ? AND changed = 0",
+                    (compact_before,),
+                )
+                removed["results"] += cursor.rowcount
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('compacted_before', ?)"
+                    " ON CONFLICT (key) DO UPDATE SET value = max(value, excluded.value)",
+                    (compact_before,),
+                )
+            if retain_days is not None:
+                cutoff = current - retain_days * DAY_SECONDS
+                cursor = self._conn.execute("DELETE FROM results WHERE finished_at < ?", (cutoff,))
+                removed["results"] += cursor.rowcount
+                removed["runs"] = self._conn.execute("DELETE FROM runs WHERE finished_at < ?", (cutoff,)).rowcount
+        return removed
+
+    def vacuum(self) -> None:
+        self._conn.execute("VACUUM")
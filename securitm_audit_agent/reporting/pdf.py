@@ -61,6 +61,7 @@ def _build_story(report: AuditReport, font_name: str) -> List[object]:
         Paragraph(f"Начало: {_escape(report.started_at.isoformat())}", body_style),
         Paragraph(f"Окончание: {_escape(report.finished_at.isoformat())}", body_style),
         Paragraph(f"Длительность: {_escape(report.duration_seconds)} сек.", body_style),
+        Paragraph(f"Из них ожидание ограничителя нагрузки: {_escape(round(report.throttled_seconds, 3))} сек.", body_style),
         Paragraph(f"Версия агента: {_escape(report.agent_version)}", body_style),
         Spacer(1, 8),
         Paragraph("Результаты", section_style),
@@ -0,0 +1,266 @@
+# Хранилище результатов аудита всего парка в SQLite со словарным кодированием и запросами по срезам.
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from securitm_audit_agent.core.base import Status
+
+DEFAULT_INGEST_BATCH = 500
+UNKNOWN_OS = "unknown"
+
+# Статус хранится кодом: строка результата — несколько целых чисел.
+STATUS_CODES = {Status.OK.value: 0, Status.FAIL.value: 1, Status.ERROR.value: 2, Status.SKIP.value: 3}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# Словари (check_id, severity, remediation, os_release) — отдельные таблицы, results хранит их id.
+# latest = 1 у результатов последнего отчёта хоста; частичные индексы по ним покрывают запросы по парку.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS severities (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS remediations (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS os_releases (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    hostname TEXT NOT NULL UNIQUE,
+    latest_report_id INTEGER,
+    latest_finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    host_id INTEGER NOT NULL,
+    os_id INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    agent_version TEXT NOT NULL,
+    UNIQUE (host_id, finished_at)
+);
+CREATE TABLE IF NOT EXISTS results (
+    report_id INTEGER NOT NULL,
+    host_id INTEGER NOT NULL,
+    os_id INTEGER NOT NULL,
+    check_key INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    severity_key INTEGER NOT NULL,
+    remediation_key INTEGER NOT NULL,
+    latest INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_report ON results (report_id);
+CREATE INDEX IF NOT EXISTS results_latest_check ON results (check_key, status, host_id) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS results_latest_severity ON results (severity_key, status) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS results_latest_os ON results (os_id, status, host_id) WHERE latest = 1;
+"""
+
+DICTIONARIES = ("checks", "severities", "remediations", "os_releases")
+
+logger = logging.getLogger(__name__)
+
+
+def os_release_name(host: Mapping[str, Any]) -> str:
+    """Метка ОС хоста из os_release: "ID VERSION_ID", иначе PRETTY_NAME."""
+    release = host.get("os_release") or {}
+    if not isinstance(release, Mapping):
+        return UNKNOWN_OS
+    name = " ".join(str(release[key]) for key in ("ID", "VERSION_ID") if release.get(key))
+    return name or str(release.get("PRETTY_NAME") or UNKNOWN_OS)
+
+
+def iter_report_files(paths: Iterable[str]) -> Iterator[Path]:
+    """JSON-файлы отчётов: файлы как есть, каталоги — рекурсивно по *.json."""
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            yield from sorted(path.rglob("*.json"))
+        else:
+            yield path
+
+
+class ResultsWarehouse:
+    """Хранилище результатов аудита парка.
+
+    ingest читает отчёты по одному и пишет их пакетами по batch_size в одной
+    транзакции. check_id, severity, remediation и метка ОС кодируются
+    словарями, статус — числом. Повторный отчёт хоста с тем же finished_at
+    пропускается. Запросы по парку смотрят на последний отчёт каждого хоста.
+    """
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Транзакции ведутся явно: ingest фиксирует их пакетами по batch_size отчётов.
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._dictionaries: Dict[str, Dict[str, int]] = {
+            table: {name: key for key, name in self._conn.execute(f"SELECT id, name FROM {table}")}
+            for table in DICTIONARIES
+        }
+        self._hosts: Dict[str, Tuple[int, Optional[int], Optional[float]]] = {
+            hostname: (host_id, report_id, finished_at)
+            for host_id, hostname, report_id, finished_at in self._conn.execute(
+                "SELECT id, hostname, latest_report_id, latest_finished_at FROM hosts"
+            )
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ResultsWarehouse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _key(self, table: str, name: str) -> int:
+        values = self._dictionaries[table]
+        key = values.get(name)
+        if key is None:
+            key = int(self._conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid)
+            values[name] = key
+        return key
+
+    def _host(self, hostname: str) -> Tuple[int, Optional[int], Optional[float]]:
+        host = self._hosts.get(hostname)
+        if host is None:
+            host_id = int(self._conn.execute("INSERT INTO hosts (hostname) VALUES (?)", (hostname,)).lastrowid)
+            host = self._hosts[hostname] = (host_id, None, None)
+        return host
+
+    def add_report(self, data: Mapping[str, Any]) -> bool:
+        """Добавляет отчёт (словарь в формате AuditReport.to_dict); False, если он уже загружен."""
+        host = data.get("host") or {}
+        hostname = str(host.get("hostname") or "").strip().lower()
+        if not hostname:
+            raise ValueError("host.hostname is missing")
+        finished_at = datetime.fromisoformat(str(data["finished_at"])).timestamp()
+        # Отчёт разбирается целиком до первой записи: испорченный файл не оставляет частичных строк.
+        results = [
+            (str(item["check_id"]), STATUS_CODES.get(str(item.get("status"))), item)
+            for item in data.get("results") or []
+        ]
+        host_id, latest_report_id, latest_finished_at = self._host(hostname)
+        os_id = self._key("os_releases", os_release_name(host))
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO reports (host_id, os_id, finished_at, agent_version) VALUES (?, ?, ?, ?)",
+            (host_id, os_id, finished_at, str(data.get("agent_version") or "")),
+        )
+        if not cursor.rowcount:
+            return False
+        report_id = int(cursor.lastrowid)
+        latest = latest_finished_at is None or finished_at > latest_finished_at
+        if latest:
+            if latest_report_id is not None:
+                self._conn.execute("UPDATE results SET latest = 0 WHERE report_id = ?", (latest_report_id,))
+            self._conn.execute(
+                "UPDATE hosts SET latest_report_id = ?, latest_finished_at = ? WHERE id = ?",
+                (report_id, finished_at, host_id),
+            )
+            self._hosts[hostname] = (host_id, report_id, finished_at)
+        rows = []
+        for check_id, status, item in results:
+            if status is None:
+                continue
+            rows.append(
+                (
+                    report_id,
+                    host_id,
+                    os_id,
+                    self._key("checks", check_id),
+                    status,
+                    self._key("severities", str(item.get("severity") or "")),
+                    self._key("remediations", str(item.get("remediation") or "")),
+                    int(latest),
+                )
+            )
+        self._conn.executemany(
+            "INSERT INTO results (report_id, host_id, os_id, check_key, status, severity_key, remediation_key,"
+            " latest) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        return True
+
+    def ingest(self, files: Iterable[Path], batch_size: int = DEFAULT_INGEST_BATCH) -> Dict[str, int]:
+        """Загружает отчёты из файлов; возвращает число загруженных, повторных и нечитаемых."""
+        summary = {"ingested": 0, "duplicates": 0, "errors": 0}
+        pending = 0
+        self._conn.execute("BEGIN")
+        try:
+            for path in files:
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                    added = self.add_report(data)
+                except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+                    logger.warning("Skipping report %s: %s", path, exc)
+                    summary["errors"] += 1
+                    continue
+                summary["ingested" if added else "duplicates"] += 1
+                pending += 1
+                if pending >= batch_size:
+                    self._conn.execute("COMMIT")
+                    self._conn.execute("BEGIN")
+                    pending = 0
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("ANALYZE")
+        return summary
+
+    def failing_hosts(self, check_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Без check_id — проверки с числом хостов в FAIL; с check_id — хосты, где она в FAIL."""
+        fail = STATUS_CODES[Status.FAIL.value]
+        if check_id is None:
+            rows = self._conn.execute(
+                "SELECT c.name, COUNT(*) AS hosts FROM results r JOIN checks c ON c.id = r.check_key"
+                " WHERE r.latest = 1 AND r.status = ? GROUP BY r.check_key ORDER BY hosts DESC, c.name LIMIT ?",
+                (fail, limit),
+            )
+            return [{"check_id": name, "failing_hosts": hosts} for name, hosts in rows]
+        check_key = self._dictionaries["checks"].get(check_id)
+        if check_key is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT h.hostname FROM results r JOIN hosts h ON h.id = r.host_id"
+            " WHERE r.latest = 1 AND r.check_key = ? AND r.status = ? ORDER BY h.hostname LIMIT ?",
+            (check_key, fail, limit),
+        )
+        return [{"hostname": hostname} for (hostname,) in rows]
+
+    def severity_breakdown(self) -> List[Dict[str, Any]]:
+        """Число результатов последних отчётов по severity и статусу."""
+        breakdown: Dict[str, Dict[str, Any]] = {}
+        rows = self._conn.execute(
+            "SELECT s.name, r.status, COUNT(*) FROM results r JOIN severities s ON s.id = r.severity_key"
+            " WHERE r.latest = 1 GROUP BY r.severity_key, r.status"
+        )
+        for severity, status, count in rows:
+            entry = breakdown.setdefault(severity, {"severity": severity, **{name: 0 for name in STATUS_CODES}})
+            entry[STATUS_NAMES[status]] = count
+        return sorted(breakdown.values(), key=lambda entry: -entry[Status.FAIL.value])
+
+    def compliance_by_os(self) -> List[Dict[str, Any]]:
+        """Доля OK среди OK и FAIL в последних отчётах по меткам ОС."""
+        ok, fail = STATUS_CODES[Status.OK.value], STATUS_CODES[Status.FAIL.value]
+        rows = self._conn.execute(
+            "SELECT o.name, COUNT(DISTINCT r.host_id), SUM(r.status = ?), SUM(r.status = ?)"
+            " FROM results r JOIN os_releases o ON o.id = r.os_id WHERE r.latest = 1 GROUP BY r.os_id",
+            (ok, fail),
+        )
+        output = []
+        for name, hosts, passed, failed in rows:
+            evaluated = (passed or 0) + (failed or 0)
+            output.append(
+                {
+                    "os_release": name,
+                    "hosts": hosts,
+                    "ok": passed or 0,
+                    "fail": failed or 0,
+                    "compliance_pct": round(100.0 * (passed or 0) / evaluated, 2) if evaluated else None,
+                }
+            )
+        return sorted(output, key=lambda entry: entry["os_release"])
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from types import SimpleNamespace
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Tuple
+
+from securitm_audit_agent.platform.mounts import MountTable, read_mount_table
 
 
 @dataclass
@@ -19,6 +21,9 @@ class FakeContext:
     files: Dict[str, str] = field(default_factory=dict)
     modes: Dict[str, int] = field(default_factory=dict)
     directories: Dict[str, list[str]] = field(default_factory=dict)
+    xattrs: Dict[str, Dict[str, bytes]] = field(default_factory=dict)
+    owners: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    links: Dict[str, str] = field(default_factory=dict)
     host_facts: Dict[str, str] = field(
         default_factory=lambda: {
             "hostname": "test-host",
@@ -27,15 +32,26 @@ class FakeContext:
         }
     )
     agent_version: str = "test"
+    governor: Optional[object] = None
+    run_id: int = 0
 
     def read_file(self, path: str) -> Optional[str]:
         return self.files.get(path)
 
+    def iter_lines(self, path: str) -> Optional[Iterator[str]]:
+        content = self.read_file(path)
+        return iter(content.splitlines()) if content is not None else None
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        content = self.read_file(path)
+        return content.encode("utf-8") if content is not None else None
+
     def stat(self, path: str):
         mode = self.modes.get(path)
         if mode is None:
             return None
-        return SimpleNamespace(st_mode=mode)
+        uid, gid = self.owners.get(path, (0, 0))
+        return SimpleNamespace(st_mode=mode, st_uid=uid, st_gid=gid, st_dev=0)
 
     def list_dir(self, path: str) -> Optional[list[str]]:
         items = self.directories.get(path)
@@ -43,5 +59,39 @@ class FakeContext:
             return None
         return list(items)
 
+    def scan_dir(self, path: str, max_depth: Optional[int] = 0, follow_symlinks: bool = True):
+        items = self.directories.get(path)
+        if items is None:
+            return None
+        entries = []
+        self._scan_into(path, 0, max_depth, entries)
+        return entries
+
+    def _scan_into(self, path: str, depth: int, max_depth: Optional[int], entries: list) -> None:
+        for name in sorted(self.directories.get(path) or []):
+            child = f"{path.rstrip('/')}/{name}"
+            is_dir = child in self.directories
+            entries.append(
+                SimpleNamespace(
+                    path=child,
+                    name=name,
+                    depth=depth,
+                    is_dir=is_dir,
+                    is_symlink=False,
+                    stat=self.stat(child),
+                )
+            )
+            if is_dir and (max_depth is None or depth < max_depth):
+                self._scan_into(child, depth + 1, max_depth, entries)
+
+    def read_link(self, path: str) -> Optional[str]:
+        return self.links.get(path)
+
+    def read_xattr(self, path: str, name: str) -> Optional[bytes]:
+        return self.xattrs.get(path, {}).get(name)
+
+    def mount_table(self) -> MountTable:
+        return read_mount_table(self.read_file)
+
     def run_cmd(self, args: list[str]) -> FakeCommandResult:
         return FakeCommandResult(args=args)
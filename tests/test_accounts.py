@@ -0,0 +1,21 @@
+# Тесты потокового разбора passwd/shadow/group.
+from __future__ import annotations
+
+from securitm_audit_agent.platform.accounts import iter_group, iter_passwd, iter_shadow
+from tests.helpers import FakeContext
+
+
+def test_account_files_are_parsed_lazily() -> None:
+    ctx = FakeContext(
+        files={
+            "/etc/passwd": "# comment\nroot:x:0:0:root:/root:/bin/bash\n\nbroken\ntoor:x:0\n",
+            "/etc/shadow": "root::19000:0:99999:7:::\nuser:$6$hash:19000::::::\n",
+            "/etc/group": "wheel:x:10:alice,bob\nusers:x:100:\n",
+        }
+    )
+
+    passwd = list(iter_passwd(ctx))
+    assert [(entry.name, entry.uid, entry.home) for entry in passwd] == [("root", "0", "/root"), ("toor", "0", "")]
+    assert [entry.name for entry in iter_shadow(ctx) if not entry.password] == ["root"]
+    assert [(group.name, group.members) for group in iter_group(ctx)] == [("wheel", ("alice", "bob")), ("users", ())]
+    assert iter_passwd(FakeContext()) is None
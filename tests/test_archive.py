@@ -0,0 +1,139 @@
+# Тесты аудита образов напрямую из tar/OCI-архивов.
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+
+from securitm_audit_agent.platform.archive import ArchiveAuditContext
+
+
+def _tar(entries, compress: bool = False) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as archive:
+        for name, kind, value, mode in entries:
+            info = tarfile.TarInfo(name)
+            info.mode = mode
+            if kind == "dir":
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            elif kind == "symlink":
+                info.type = tarfile.SYMTYPE
+                info.linkname = value
+                archive.addfile(info)
+            elif kind == "hardlink":
+                info.type = tarfile.LNKTYPE
+                info.linkname = value
+                archive.addfile(info)
+            else:
+                data = value.encode()
+                info.size = len(data)
+                if name == "usr/bin/ping":
+                    info.pax_headers = {"SCHILY.xattr.security.capability": "cap"}
+                archive.addfile(info, io.BytesIO(data))
+    data = buffer.getvalue()
+    return gzip.compress(data) if compress else data
+
+
+BASE = _tar(
+    [
+        ("etc", "dir", None, 0o755),
+        ("etc/passwd", "file", "root:x:0:0:root:/root:/bin/bash\n", 0o644),
+        ("etc/shadow", "file", "root:*:1::::::\n", 0o640),
+        ("etc/old", "dir", None, 0o755),
+        ("etc/old/stale", "file", "old\n", 0o644),
+        ("usr/lib/os-release", "file", 'ID="alpine"\n', 0o644),
+        ("usr/bin/ping", "file", "ELF", 0o4755),
+    ]
+)
+TOP = _tar(
+    [
+        ("etc/.wh.shadow", "file", "", 0o644),
+        ("etc/old/.wh..wh..opq", "file", "", 0o644),
+        ("etc/old/fresh", "file", "new\n", 0o666),
+        ("etc/os-release", "symlink", "/usr/lib/os-release", 0o777),
+        ("etc/passwd-", "hardlink", "etc/passwd", 0o644),
+    ],
+    compress=True,
+)
+
+
+def _docker_save(tmp_path):
+    path = tmp_path / "image.tar"
+    with tarfile.open(path, "w") as archive:
+        for name, data in [
+            ("base/layer.tar", BASE),
+            ("top/layer.tar", TOP),
+            ("manifest.json", json.dumps([{"Layers": ["base/layer.tar", "top/layer.tar"]}]).encode()),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def _oci_layout(tmp_path):
+    path = tmp_path / "oci"
+    blobs = path / "blobs" / "sha256"
+    blobs.mkdir(parents=True)
+
+    def blob(data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        (blobs / digest).write_bytes(data)
+        return f"sha256:{digest}"
+
+    manifest = json.dumps({"layers": [{"digest": blob(BASE)}, {"digest": blob(TOP)}]}).encode()
+    (path / "index.json").write_text(json.dumps({"manifests": [{"digest": blob(manifest)}]}), encoding="utf-8")
+    (path / "oci-layout").write_text('{"imageLayoutVersion": "1.0.0"}', encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("build", [_docker_save, _oci_layout])
+def test_archive_context_applies_layers_and_whiteouts(tmp_path, build) -> None:
+    with ArchiveAuditContext(build(tmp_path), "test") as ctx:
+        assert ctx.read_file("/etc/passwd").startswith("root:x:0:0")
+        assert ctx.read_file("/etc/shadow") is None
+        assert ctx.list_dir("/etc/old") == ["fresh"]
+        assert ctx.read_file("/etc/os-release") == 'ID="alpine"\n'
+        assert ctx.read_link("/etc/os-release") == "/usr/lib/os-release"
+        assert ctx.stat("/etc/passwd-").st_ino == ctx.stat("/etc/passwd").st_ino
+        assert ctx.stat("/usr/bin/ping").st_mode == 0o104755
+        assert ctx.read_xattr("/usr/bin/ping", "security.capability") == b"cap"
+        assert ctx.stat("/usr").st_mode & 0o40000
+
+        entries = ctx.scan_dir("/etc", max_depth=None)
+        assert [entry.path for entry in entries] == [
+            "/etc/old",
+            "/etc/old/fresh",
+            "/etc/os-release",
+            "/etc/passwd",
+            "/etc/passwd-",
+        ]
+        assert entries[2].is_symlink and entries[2].stat.st_size == len('ID="alpine"\n')
+        assert ctx.host_facts["os_release"] == {"ID": "alpine"}
+
+
+def test_archive_context_reads_single_layer_tar(tmp_path) -> None:
+    path = tmp_path / "layer.tar"
+    path.write_bytes(BASE)
+
+    with ArchiveAuditContext(str(path), "test", {"/proc/cmdline": "quiet"}) as ctx:
+        assert ctx.read_file("/etc/shadow") == "root:*:1::::::\n"
+        assert ctx.read_file("/proc/cmdline") == "quiet"
+        assert ctx.stat("/proc") is None
+        assert ctx.run_cmd(["id"]).returncode == 127
+
+
+def test_archive_context_streams_lines_across_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("securitm_audit_agent.platform.archive._LINE_CHUNK", 7)
+    passwd = "".join(f"user{index}:x:{1000 + index}:100::/home/user{index}:/bin/sh\r\n" for index in range(50))
+    path = tmp_path / "layer.tar.gz"
+    path.write_bytes(_tar([("etc/passwd", "file", passwd, 0o644)], compress=True))
+
+    with ArchiveAuditContext(str(path), "test") as ctx:
+        assert list(ctx.iter_lines("/etc/passwd")) == passwd.splitlines()
+        assert ctx.iter_lines("/etc/missing") is None
@@ -0,0 +1,52 @@
+# Тесты пакетного импорта активов SecurITM с отправкой только изменений.
+from __future__ import annotations
+
+from securitm_audit_agent.integrations.assets import AssetBatchSync, AssetSyncState
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator, SimulatorProfile, simulated_host
+
+
+def _fleet(count: int, ip_suffix: int = 1):
+    return {simulated_host(i): {"name": simulated_host(i), "IP": f"10.0.{i}.{ip_suffix}"} for i in range(count)}
+
+
+def test_asset_sync_imports_in_chunks_and_then_only_changes(tmp_path) -> None:
+    path = str(tmp_path / "assets.json")
+    with SecurITMSimulator() as simulator:
+        client = SecurITMClient(simulator.url, "token")
+        first = AssetBatchSync(client, "computers", AssetSyncState(path), chunk_size=40)
+        summary = first.sync(_fleet(100))
+        first.state.save()
+
+        fleet = _fleet(100)
+        fleet[simulated_host(7)]["IP"] = "10.9.9.9"
+        fleet[simulated_host(70)]["IP"] = "10.9.9.10"
+        second = AssetBatchSync(client, "computers", AssetSyncState(path), chunk_size=40)
+        changed = second.sync(fleet)
+        unchanged = second.sync(fleet)
+
+    assert (summary["imported"], summary["chunks"]) == (100, 3)
+    assert (changed["changed"], changed["imported"], changed["chunks"]) == (2, 2, 1)
+    assert unchanged["changed"] == 0
+    assert simulator.calls["assets.import"] == 4
+    assert len(simulator.assets) == 100
+    assert (simulator.assets[7]["IP"], simulator.assets[70]["IP"]) == ("10.9.9.9", "10.9.9.10")
+
+
+def test_asset_sync_keeps_failed_chunk_pending(tmp_path) -> None:
+    state = AssetSyncState(str(tmp_path / "assets.json"))
+    with SecurITMSimulator(SimulatorProfile(error_rate=1.0)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+        summary = AssetBatchSync(client, "computers", state).sync(_fleet(3))
+
+    assert summary["imported"] == 0 and len(summary["errors"]) == 1
+    assert len(state) == 0
+
+
+def test_asset_sync_without_state_sends_only_forced_assets() -> None:
+    with SecurITMSimulator() as simulator:
+        client = SecurITMClient(simulator.url, "token")
+        summary = AssetBatchSync(client, "computers").sync(_fleet(5), force=[simulated_host(2).upper()])
+
+    assert summary["imported"] == 1
+    assert [asset["name"] for asset in simulator.assets] == [simulated_host(2)]
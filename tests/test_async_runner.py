@@ -0,0 +1,69 @@
+# Тесты асинхронного пути выполнения проверок.
+from __future__ import annotations
+
+import asyncio
+from typing import Mapping
+
+from securitm_audit_agent.core import AsyncAuditRunner, CheckMeta, CheckRegistry, Status
+from securitm_audit_agent.core.base import BaseCheck
+from securitm_audit_agent.platform import AsyncAuditContext, AuditContext
+from tests.helpers import FakeContext
+
+
+def _meta(check_id: str) -> CheckMeta:
+    return CheckMeta(check_id=check_id, title=check_id, description="", severity="low", remediation="None")
+
+
+class SyncFileCheck(BaseCheck):
+    meta = _meta("sync_file")
+
+    def check(self, ctx, params: Mapping[str, object]):
+        return self._result(Status.OK, ctx.read_file("/etc/hostname") or "", None)
+
+
+class SlowAsyncCheck(BaseCheck):
+    meta = _meta("slow_async")
+
+    def check(self, ctx, params: Mapping[str, object]):
+        raise AssertionError("sync path must not be used")
+
+    async def acheck(self, actx, params: Mapping[str, object]):
+        await asyncio.sleep(0.01)
+        content = await actx.read_file("/etc/hostname")
+        return self._result(Status.FAIL, f"async {content}", None)
+
+
+class BoomAsyncCheck(BaseCheck):
+    meta = _meta("boom_async")
+
+    def check(self, ctx, params: Mapping[str, object]):
+        raise RuntimeError("boom")
+
+
+def test_async_runner_keeps_order_and_wraps_errors() -> None:
+    registry = CheckRegistry()
+    for check in (SyncFileCheck(), SlowAsyncCheck(), BoomAsyncCheck()):
+        registry.register(check)
+    actx = AsyncAuditContext(FakeContext(files={"/etc/hostname": "web01"}))
+
+    report = asyncio.run(
+        AsyncAuditRunner(registry, concurrency=2).run(actx, ["slow_async", "sync_file", "boom_async", "missing"], {})
+    )
+
+    assert [result.check_id for result in report.results] == ["slow_async", "sync_file", "boom_async", "missing"]
+    assert [result.status for result in report.results] == [Status.FAIL, Status.OK, Status.ERROR, Status.ERROR]
+    assert report.results[0].message == "async web01"
+    assert report.results[2].message == "Unhandled error: boom"
+    assert report.host["hostname"] == "test-host"
+
+
+def test_async_context_runs_commands_via_event_loop() -> None:
+    actx = AsyncAuditContext(AuditContext(agent_version="test"))
+
+    async def scenario():
+        return await asyncio.gather(actx.run_cmd(["sh", "-c", "echo out; echo err >&2; exit 3"]), actx.stat("/"))
+
+    result, root_stat = asyncio.run(scenario())
+
+    assert (result.returncode, result.stdout, result.stderr) == (3, "out\n", "err\n")
+    assert root_stat is not None
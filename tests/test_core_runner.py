@@ -83,3 +83,14 @@ def test_report_contains_duration_seconds() -> None:
 
     assert "duration_seconds" in payload
     assert payload["duration_seconds"] >= 0
+
+
+def test_runner_records_check_durations() -> None:
+    registry = CheckRegistry()
+    registry.register(OkCheck())
+
+    report = AuditRunner(registry).run(FakeContext(), ["ok_check", "missing_check"], {})
+
+    assert report.results[0].duration_seconds is not None and report.results[0].duration_seconds >= 0
+    assert report.results[1].duration_seconds is None
+    assert "duration_seconds" in report.to_dict()["results"][0]
@@ -0,0 +1,109 @@
+# Тесты разбора crontab и проверки файлов заданий cron.
+from __future__ import annotations
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from securitm_audit_agent.core import Status
+from securitm_audit_agent.platform import cron
+from securitm_audit_agent.platform.cron import command_targets, load_crontab, parse_crontab
+from securitm_audit_agent.plugins.met_rekom_linux import MetCronJobsPermsCheck
+from tests.helpers import FakeContext
+
+
+def test_parse_crontab_handles_system_format_env_and_specials() -> None:
+    text = "\n".join(
+        [
+            "SHELL=/bin/sh",
+            "PATH=/usr/local/bin:/usr/bin",
+            "# comment",
+            "*/5 * * * * root /usr/local/bin/backup --full",
+            "@reboot www-data /srv/app/start.sh % ignored stdin",
+        ]
+    )
+
+    jobs = parse_crontab(text, "/etc/cron.d/app", system=True)
+
+    assert [(job.user, job.command) for job in jobs] == [
+        ("root", "/usr/local/bin/backup --full"),
+        ("www-data", "/srv/app/start.sh"),
+    ]
+    assert jobs[0].search_path == "/usr/local/bin:/usr/bin"
+
+
+def test_command_targets_resolve_path_wrappers_scripts_and_cd() -> None:
+    known = {"/usr/bin/bash", "/usr/bin/test", "/usr/bin/php"}
+
+    targets = command_targets(
+        "test -x /opt/x && FOO=1 nice -n 10 bash /opt/job.sh arg; cd /srv/app && ./run >/dev/null 2>&1",
+        "/usr/bin:/bin",
+        known.__contains__,
+    )
+
+    assert targets == ["/usr/bin/test", "/usr/bin/bash", "/opt/job.sh", "/srv/app/run"]
+
+
+class MtimeContext(FakeContext):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.mtime = 1
+        self.reads = 0
+
+    def stat(self, path):
+        if path not in self.files:
+            return super().stat(path)
+        return SimpleNamespace(st_mode=0o100644, st_dev=1, st_ino=2, st_mtime_ns=self.mtime, st_size=10)
+
+    def read_file(self, path):
+        self.reads += 1
+        return super().read_file(path)
+
+
+def test_load_crontab_is_memoized_by_mtime(monkeypatch) -> None:
+    monkeypatch.setattr(cron, "_CRONTAB_CACHE", OrderedDict())
+    ctx = MtimeContext(files={"/etc/crontab": "* * * * * root /usr/bin/true\n"})
+
+    first = load_crontab(ctx, "/etc/crontab", system=True)
+    second = load_crontab(ctx, "/etc/crontab", system=True)
+    ctx.mtime = 2
+    load_crontab(ctx, "/etc/crontab", system=True)
+
+    assert first is second
+    assert ctx.reads == 2
+
+
+def test_cron_jobs_check_flags_writable_targets() -> None:
+    ctx = FakeContext(
+        files={
+            "/etc/crontab": "0 * * * * root /usr/local/sbin/rotate\n",
+            "/var/spool/cron/crontabs/alice": "@daily python3 /home/alice/sync.py\n",
+        },
+        directories={"/etc/cron.d": [], "/var/spool/cron/crontabs": ["alice"]},
+        modes={
+            "/usr/local/sbin/rotate": 0o100755,
+            "/usr/bin/python3": 0o100755,
+            "/home/alice/sync.py": 0o100666,
+        },
+    )
+
+    result = MetCronJobsPermsCheck().check(ctx, {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == "/home/alice/sync.py (0o666, /var/spool/cron/crontabs/alice:1)"
+
+
+def test_crontab_cache_is_bounded_and_keeps_other_roots(monkeypatch) -> None:
+    monkeypatch.setattr(cron, "_CRONTAB_CACHE", OrderedDict())
+    monkeypatch.setattr(cron, "CRONTAB_CACHE_MAX_ENTRIES", 2)
+    first, second = (MtimeContext(files={"/etc/crontab": "* * * * * root /usr/bin/true\n"}) for _ in range(2))
+    second.mtime = 5
+
+    # Одинаковый путь в двух контекстах с разными файлами не вытесняет запись другого контекста.
+    jobs = load_crontab(first, "/etc/crontab", system=True)
+    load_crontab(second, "/etc/crontab", system=True)
+    assert load_crontab(first, "/etc/crontab", system=True) is jobs
+
+    second.mtime = 6
+    load_crontab(second, "/etc/crontab", system=True)
+    assert len(cron._CRONTAB_CACHE) == 2
+    assert first.reads == 1
@@ -0,0 +1,73 @@
+# Тесты сбора фактов о хосте без subprocess и с таймаутом DNS.
+from __future__ import annotations
+
+import time
+
+from securitm_audit_agent.platform import facts
+from securitm_audit_agent.platform.facts import (
+    HostFacts,
+    get_primary_ip_proc,
+    parse_default_gateway,
+    parse_fib_trie_local,
+    resolve_fqdn,
+)
+
+ROUTE = "\n".join(
+    [
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT",
+        "wlan0\t00000000\t0100A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0",
+        "eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0",
+        "eth0\t0001A8C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0",
+    ]
+)
+
+FIB_TRIE = """Main:
+  +-- 0.0.0.0/0 3 0 5
+     |-- 127.0.0.1
+        /32 host LOCAL
+     |-- 10.20.0.7
+        /32 link BROADCAST
+        /32 host LOCAL
+"""
+
+
+def test_parse_default_gateway_prefers_lowest_metric() -> None:
+    assert parse_default_gateway(ROUTE) == ("eth0", "192.168.1.1")
+    assert parse_default_gateway(ROUTE.splitlines()[0]) is None
+
+
+def test_parse_fib_trie_skips_loopback() -> None:
+    assert parse_fib_trie_local(FIB_TRIE) == "10.20.0.7"
+
+
+def test_primary_ip_falls_back_to_fib_trie_without_default_route() -> None:
+    files = {"/proc/net/fib_trie": FIB_TRIE}
+
+    assert get_primary_ip_proc(files.get) == ("10.20.0.7", "/proc/net/fib_trie")
+    assert get_primary_ip_proc({}.get) == (None, "unavailable")
+
+
+def test_resolve_fqdn_returns_hostname_on_dns_timeout(monkeypatch) -> None:
+    monkeypatch.setattr(facts.socket, "getfqdn", lambda name: time.sleep(1) or "late.example")
+
+    started = time.monotonic()
+    assert resolve_fqdn("host", timeout=0.05) == ("host", "hostname (dns timeout)")
+    assert time.monotonic() - started < 0.5
+
+
+def test_host_facts_record_sources(monkeypatch) -> None:
+    monkeypatch.setattr(facts.socket, "gethostname", lambda: "node1")
+    monkeypatch.setattr(facts.socket, "getfqdn", lambda name: f"{name}.corp")
+    files = {"/proc/net/fib_trie": FIB_TRIE, "/etc/os-release": 'ID="debian"\n'}
+
+    collected = HostFacts(files.get).get()
+
+    assert collected["fqdn"] == "node1.corp"
+    assert collected["ip"] == "10.20.0.7"
+    assert collected["os_release"] == {"ID": "debian"}
+    assert collected["facts_sources"] == {
+        "hostname": "gethostname",
+        "fqdn": "dns",
+        "ip": "/proc/net/fib_trie",
+        "os_release": "/etc/os-release",
+    }
@@ -0,0 +1,130 @@
+# Тесты общего обхода файловой системы.
+from __future__ import annotations
+
+from securitm_audit_agent.core import Status
+from securitm_audit_agent.platform.fsscan import FsPredicate, FsScanEngine
+from securitm_audit_agent.plugins.met_rekom_linux import MetSuidSgidPermsCheck
+from tests.helpers import FakeContext
+
+
+class CountingContext(FakeContext):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.scanned: list[str] = []
+
+    def scan_dir(self, path, max_depth=0, follow_symlinks=True):
+        self.scanned.append(path)
+        return super().scan_dir(path, max_depth, follow_symlinks)
+
+
+def _tree() -> CountingContext:
+    return CountingContext(
+        directories={
+            "/": ["usr", "proc", "home"],
+            "/usr": ["bin"],
+            "/usr/bin": ["passwd", "ping", "ls"],
+            "/proc": ["1"],
+            "/home": ["user"],
+            "/home/user": ["notes"],
+        },
+        modes={
+            "/": 0o40755,
+            "/usr": 0o40755,
+            "/usr/bin": 0o40755,
+            "/usr/bin/passwd": 0o104777,
+            "/usr/bin/ping": 0o100755,
+            "/usr/bin/ls": 0o100755,
+            "/proc": 0o40555,
+            "/proc/1": 0o100666,
+            "/home": 0o40755,
+            "/home/user": 0o40700,
+            "/home/user/notes": 0o100666,
+        },
+        xattrs={"/usr/bin/ping": {"security.capability": b"\x01"}},
+    )
+
+
+def test_engine_feeds_all_predicates_from_one_walk() -> None:
+    ctx = _tree()
+    engine = FsScanEngine()
+    engine.register(FsPredicate(name="suid", mode_masks=(0o6000, 0o022)))
+    engine.register(FsPredicate(name="world_writable", mode_masks=(0o002,)))
+    engine.register(FsPredicate(name="caps", xattr="security.capability", prefixes=("/usr",)))
+
+    suid = engine.results(ctx, "suid")
+    world = engine.results(ctx, "world_writable")
+    caps = engine.results(ctx, "caps")
+
+    assert suid.paths == ["/usr/bin/passwd"]
+    assert world.paths == ["/home/user/notes", "/usr/bin/passwd"]
+    assert caps.paths == ["/usr/bin/ping"]
+    # Каждый каталог читается один раз, /proc исключён из обхода.
+    assert sorted(ctx.scanned) == ["/", "/home", "/home/user", "/usr", "/usr/bin"]
+
+
+def test_engine_rescans_for_next_run_on_same_context() -> None:
+    ctx = _tree()
+    engine = FsScanEngine()
+    engine.register(FsPredicate(name="suid", mode_masks=(0o6000, 0o022)))
+    engine.register(FsPredicate(name="world_writable", mode_masks=(0o002,)))
+
+    engine.results(ctx, "suid")
+    # Прошлый прогон не забрал world_writable; следующий не должен получить его старый результат.
+    ctx.modes["/home/user/notes"] = 0o100600
+    ctx.run_id += 1
+    world = engine.results(ctx, "world_writable")
+
+    assert world.paths == ["/usr/bin/passwd"]
+
+
+def test_engine_prunes_subtrees_outside_predicate_prefixes() -> None:
+    ctx = _tree()
+    engine = FsScanEngine()
+    engine.register(FsPredicate(name="bins", prefixes=("/usr/bin",), mode_masks=(0o022,)))
+
+    result = engine.results(ctx, "bins")
+
+    assert result.paths == ["/usr/bin/passwd"]
+    assert "/home" not in ctx.scanned
+
+
+def test_parallel_engine_finds_same_paths_as_sequential() -> None:
+    sequential, parallel = FsScanEngine(), FsScanEngine(workers=4)
+    for engine in (sequential, parallel):
+        engine.register(FsPredicate(name="world_writable", mode_masks=(0o002,), limit=None))
+
+    expected = sequential.results(_tree(), "world_writable")
+    result = parallel.results(_tree(), "world_writable")
+
+    assert sorted(result.paths) == sorted(expected.paths) == ["/home/user/notes", "/usr/bin/passwd"]
+    assert result.complete
+
+
+def test_suid_check_reports_writable_suid_files() -> None:
+    result = MetSuidSgidPermsCheck().check(_tree(), {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == "/usr/bin/passwd"
+
+
+def test_suid_check_skips_when_root_is_not_readable() -> None:
+    result = MetSuidSgidPermsCheck().check(FakeContext(), {})
+
+    assert result.status == Status.SKIP
+
+
+def test_engine_does_not_descend_into_network_mounts() -> None:
+    ctx = _tree()
+    ctx.files["/proc/self/mountinfo"] = "\n".join(
+        [
+            "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw",
+            "40 22 0:50 / /home rw,relatime shared:20 - nfs4 nas:/export/home rw",
+        ]
+    )
+    engine = FsScanEngine()
+    engine.register(FsPredicate(name="world_writable", mode_masks=(0o002,)))
+
+    result = engine.results(ctx, "world_writable")
+
+    assert result.paths == ["/usr/bin/passwd"]
+    assert "/home" not in ctx.scanned
@@ -0,0 +1,158 @@
+# Сквозные тесты шлюза синхронизации с SecurITM на локальном симуляторе API.
+from __future__ import annotations
+
+import threading
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.gateway import GatewayClient, GatewayServer, SyncGateway
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator
+
+SECURITM_CFG = {
+    "assets": {
+        "asset_type_slug": "computer",
+        "import_template": "Agents",
+        "name_field": "name",
+        "import_name_field": "name",
+        "import_fields": {"name": "{hostname}"},
+    },
+    "tasks": {"enabled": True, "desc_template": "Host: {hostname}\nCheck: {check_id}"},
+}
+
+
+def _report(hostname: str) -> AuditReport:
+    now = datetime.now(timezone.utc)
+    return AuditReport(
+        host={"hostname": hostname, "fqdn": f"{hostname}.local", "ip": "10.0.0.1"},
+        started_at=now,
+        finished_at=now,
+        agent_version="test",
+        results=[
+            AuditResult("ssh.root", Status.FAIL, "root login", "PermitRootLogin yes", "high", "Disable"),
+            AuditResult("fs.tmp", Status.FAIL, "tmp", None, "medium", "Mount noexec"),
+            AuditResult("uid0", Status.OK, "ok", None, "high", ""),
+        ],
+    )
+
+
+def _serve(gateway: SyncGateway, token=None) -> GatewayServer:
+    server = GatewayServer(("127.0.0.1", 0), gateway, token)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_report_from_dict_round_trip() -> None:
+    report = _report("host-a")
+    report.throttled_seconds = 1.5
+
+    restored = AuditReport.from_dict(report.to_dict())
+
+    assert restored.to_dict() == report.to_dict()
+
+
+def test_gateway_batches_assets_and_deduplicates_tasks() -> None:
+    with SecurITMSimulator() as simulator:
+        simulator.add_task({"name": "[FAIL] ssh.root", "desc": "Host: host-a\nCheck: ssh.root"})
+        gateway = SyncGateway(SecurITMClient(simulator.url, "token"), SECURITM_CFG, batch_window=0.5)
+        server = _serve(gateway, token="secret")
+        client = GatewayClient(f"http://127.0.0.1:{server.server_address[1]}", token="secret")
+        try:
+            reports = [_report(name) for name in ("host-a", "host-b") * 3]
+            with ThreadPoolExecutor(max_workers=len(reports)) as pool:
+                summaries = list(pool.map(client.submit_report, reports))
+        finally:
+            server.shutdown()
+            server.server_close()
+            gateway.close()
+
+    # Шесть отчётов двух хостов: один импорт активов, одна загрузка индекса, без поиска на каждый отчёт.
+    assert simulator.calls["assets.import"] == 1
+    assert gateway.stats["index_loads"] == 1
+    assert sorted(asset["name"] for asset in simulator.assets) == ["host-a", "host-b"]
+    # Открытая задача host-a/ssh.root уже была, остальные три создаются по одному разу.
+    assert simulator.calls["tasks.create"] == 3
+    assert len(simulator.tasks) == 4
+    for summary in summaries:
+        assert sorted(summary["created"] + summary["existing"]) == ["fs.tmp", "ssh.root"]
+        assert summary["unsynced"] == []
+        assert summary["asset_uuid"].startswith("asset-")
+    assert gateway.stats["reports"] == 6
+
+
+def test_gateway_rejects_report_without_token() -> None:
+    with SecurITMSimulator() as simulator:
+        gateway = SyncGateway(SecurITMClient(simulator.url, "token"), SECURITM_CFG)
+        server = _serve(gateway, token="secret")
+        try:
+            client = GatewayClient(f"http://127.0.0.1:{server.server_address[1]}", token="wrong")
+            with pytest.raises(requests.HTTPError) as excinfo:
+                client.submit_report(_report("host-a"))
+        finally:
+            server.shutdown()
+            server.server_close()
+            gateway.close()
+
+    assert excinfo.value.response.status_code == 401
+    assert sum(simulator.calls.values()) == 0
+
+
+def test_gateway_merges_imported_assets_into_index() -> None:
+    with SecurITMSimulator() as simulator:
+        simulator.assets.append({"uuid": "asset-old", "name": "host-old"})
+        gateway = SyncGateway(SecurITMClient(simulator.url, "token"), SECURITM_CFG, batch_window=0.05)
+        try:
+            gateway.refresh_index()
+            simulator.assets.append({"uuid": "asset-late", "name": "host-late"})
+            asset = gateway.ensure_asset({"name": "host-new"}, "host-new")
+        finally:
+            gateway.close()
+
+    assert asset["name"] == "host-new"
+    # В индекс добавлен только импортированный актив, остальной индекс не перезагружался.
+    assert sorted(gateway._assets) == ["host-new", "host-old"]
+
+
+# Исключение повторно поднимается в потоке Timer после того, как ожидающие получили его.
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_gateway_fails_waiting_reports_on_unexpected_flush_error(monkeypatch) -> None:
+    with SecurITMSimulator() as simulator:
+        client = SecurITMClient(simulator.url, "token")
+        gateway = SyncGateway(client, SECURITM_CFG, batch_window=0.05, wait_timeout=30)
+
+        def broken_import(template, assets):
+            raise KeyError("template")
+
+        monkeypatch.setattr(client, "import_assets", broken_import)
+        try:
+            with pytest.raises(KeyError):
+                gateway.ensure_asset({"name": "host-a"}, "host-a")
+        finally:
+            gateway.close()
+
+
+def test_gateway_closes_tasks_of_resolved_results() -> None:
+    report = _report("host-a")
+    resolved, still_failing = report.results[0], report.results[1]
+    with SecurITMSimulator() as simulator:
+        simulator.add_task({"name": "[FAIL] ssh.root", "desc": "Host: host-a\nCheck: ssh.root"})
+        gateway = SyncGateway(SecurITMClient(simulator.url, "token"), SECURITM_CFG)
+        server = _serve(gateway)
+        client = GatewayClient(f"http://127.0.0.1:{server.server_address[1]}")
+        try:
+            summary = client.submit_report(replace(report, results=[still_failing]), [resolved])
+        finally:
+            server.shutdown()
+            server.server_close()
+            gateway.close()
+
+    assert summary["closed"] == ["ssh.root"]
+    assert summary["created"] == ["fs.tmp"]
+    assert simulator.tasks[0]["is_done"] == 1
+    assert gateway.stats["tasks_closed"] == 1
@@ -0,0 +1,83 @@
+# Тесты ограничителя нагрузки аудита.
+from __future__ import annotations
+
+from typing import Mapping
+
+from securitm_audit_agent.core import AuditRunner, CheckMeta, CheckRegistry, Status
+from securitm_audit_agent.core.base import BaseCheck
+from securitm_audit_agent.platform import AuditContext
+from securitm_audit_agent.platform.governor import ResourceGovernor, parse_psi_avg10
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_parse_psi_avg10() -> None:
+    text = "some avg10=12.50 avg60=3.00 avg300=1.00 total=100\nfull avg10=90.00 avg60=0 avg300=0 total=5\n"
+    assert parse_psi_avg10(text) == 12.5
+    assert parse_psi_avg10(None) is None
+
+
+def test_token_bucket_limits_operations_per_second() -> None:
+    clock = FakeClock()
+    governor = ResourceGovernor(ops_per_second=10, burst=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        governor.acquire()
+
+    assert len(clock.sleeps) == 3
+    assert round(governor.throttled_seconds, 6) == 0.3
+
+
+def test_backoff_waits_while_host_is_overloaded() -> None:
+    clock = FakeClock()
+    pressure = iter(["some avg10=80.0 avg60=0 avg300=0 total=1", "some avg10=50.0", "some avg10=1.0"])
+    governor = ResourceGovernor(
+        max_io_pressure=20,
+        backoff_seconds=0.5,
+        sample_interval=10,
+        clock=clock,
+        sleep=clock.sleep,
+        read_file=lambda path: next(pressure),
+        loadavg=lambda: (0.0, 0.0, 0.0),
+    )
+
+    governor.acquire()
+    governor.acquire()
+
+    assert clock.sleeps == [0.5, 1.0]
+    assert governor.throttled_seconds == 1.5
+
+
+class StatCheck(BaseCheck):
+    meta = CheckMeta(check_id="stat_check", title="", description="", severity="low", remediation="")
+
+    def check(self, ctx, params: Mapping[str, object]):
+        for _ in range(3):
+            ctx.stat(str(params["path"]))
+        return self._result(Status.OK, "ok", None)
+
+
+def test_report_records_throttled_time(tmp_path) -> None:
+    clock = FakeClock()
+    ctx = AuditContext(agent_version="test")
+    assert ctx.host_facts
+    ctx.governor = ResourceGovernor(ops_per_second=1, burst=1, clock=clock, sleep=clock.sleep)
+    registry = CheckRegistry()
+    registry.register(StatCheck())
+
+    report = AuditRunner(registry).run(ctx, None, {"stat_check": {"path": str(tmp_path)}})
+
+    assert clock.sleeps == [1.0, 1.0]
+    assert report.throttled_seconds == 2.0
+    assert report.to_dict()["throttled_seconds"] == 2.0
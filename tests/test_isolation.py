@@ -0,0 +1,120 @@
+# Тесты выполнения проверок в изолированных процессах.
+from __future__ import annotations
+
+import os
+import signal
+from typing import Mapping
+
+from securitm_audit_agent.core import AuditRunner, CheckMeta, CheckRegistry, IsolationPolicy, Status
+from securitm_audit_agent.core.base import BaseCheck
+from tests.helpers import FakeContext
+
+
+def _meta(check_id: str, tags=()) -> CheckMeta:
+    return CheckMeta(check_id=check_id, title=check_id, description="", severity="low", remediation="None", tags=tags)
+
+
+class PidCheck(BaseCheck):
+    def __init__(self, check_id: str, tags=("heavy",)) -> None:
+        self.meta = _meta(check_id, tags)
+
+    def check(self, ctx, params: Mapping[str, object]):
+        return self._result(Status.OK, str(os.getpid()), ctx.read_file("/etc/hostname"))
+
+
+class MemoryHogCheck(BaseCheck):
+    meta = _meta("memory_hog", ("heavy",))
+
+    def check(self, ctx, params: Mapping[str, object]):
+        data = bytearray(1024 * 1024 * 1024)
+        return self._result(Status.OK, str(len(data)), None)
+
+
+class CpuHogCheck(BaseCheck):
+    meta = _meta("cpu_hog", ("heavy",))
+
+    def check(self, ctx, params: Mapping[str, object]):
+        while True:
+            pass
+
+
+class SuicideCheck(BaseCheck):
+    meta = _meta("suicide", ("heavy",))
+
+    def check(self, ctx, params: Mapping[str, object]):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+class ThrottledCheck(BaseCheck):
+    meta = _meta("throttled", ("heavy",))
+
+    def check(self, ctx, params: Mapping[str, object]):
+        ctx.governor.throttled_seconds += 0.25
+        return self._result(Status.OK, "", None)
+
+
+class _Governor:
+    throttled_seconds = 0.0
+
+
+def _registry(*checks: BaseCheck) -> CheckRegistry:
+    registry = CheckRegistry()
+    for check in checks:
+        registry.register(check)
+    return registry
+
+
+def test_policy_selects_by_tag_and_plugin_module() -> None:
+    assert IsolationPolicy(tags=("heavy",)).selects(PidCheck("a"))
+    assert not IsolationPolicy(tags=("other",)).selects(PidCheck("a"))
+    assert IsolationPolicy(plugins=("tests",)).selects(PidCheck("a", tags=()))
+
+
+def test_runner_executes_selected_checks_in_recycled_workers() -> None:
+    registry = _registry(PidCheck("first"), PidCheck("local", tags=()), PidCheck("second"), PidCheck("third"))
+    policy = IsolationPolicy(tags=("heavy",), workers=1, max_checks_per_worker=1)
+    ctx = FakeContext(files={"/etc/hostname": "web01"})
+
+    report = AuditRunner(registry, policy).run(ctx, ["first", "local", "second", "third", "missing"], {})
+
+    assert [result.check_id for result in report.results] == ["first", "local", "second", "third", "missing"]
+    pids = {result.check_id: result.message for result in report.results}
+    assert pids["local"] == str(os.getpid())
+    assert len({pids["first"], pids["second"], pids["third"], pids["local"]}) == 4
+    assert report.results[0].evidence == "web01"
+    assert report.results[-1].status == Status.ERROR
+
+
+def test_resource_limits_turn_into_error_results() -> None:
+    registry = _registry(MemoryHogCheck(), CpuHogCheck(), SuicideCheck(), PidCheck("after"))
+    policy = IsolationPolicy(tags=("heavy",), workers=2, memory_mb=768, cpu_seconds=1)
+
+    report = AuditRunner(registry, policy).run(FakeContext(), None, {})
+
+    messages = {result.check_id: (result.status, result.message) for result in report.results}
+    assert messages["memory_hog"] == (Status.ERROR, "Unhandled error: MemoryError")
+    assert messages["cpu_hog"] == (Status.ERROR, "Unhandled error: CPU time limit exceeded")
+    assert messages["suicide"] == (Status.ERROR, "Isolated worker killed by SIGKILL")
+    assert messages["after"][0] == Status.OK
+
+
+def test_throttled_time_of_isolated_checks_reaches_report() -> None:
+    registry = _registry(ThrottledCheck(), PidCheck("local", tags=()))
+    ctx = FakeContext(governor=_Governor())
+
+    report = AuditRunner(registry, IsolationPolicy(tags=("heavy",))).run(ctx, None, {})
+
+    assert ctx.governor.throttled_seconds == 0.0
+    assert report.throttled_seconds == 0.25
+
+
+def test_checks_of_one_isolation_group_run_in_one_worker() -> None:
+    first, second = PidCheck("first"), PidCheck("second")
+    first.isolation_group = second.isolation_group = "scanner"
+    registry = _registry(first, PidCheck("other"), second)
+    policy = IsolationPolicy(tags=("heavy",), workers=2, max_checks_per_worker=1)
+
+    report = AuditRunner(registry, policy).run(FakeContext(), None, {})
+
+    pids = {result.check_id: result.message for result in report.results}
+    assert pids["first"] == pids["second"] != pids["other"]
@@ -0,0 +1,46 @@
+# Тесты потокового разбора JSON-ответов SecurITM.
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from securitm_audit_agent.integrations.jsonstream import iter_json_items
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+
+
+def _chunks(payload, size: int):
+    text = json.dumps(payload, ensure_ascii=False)
+    return (text[index : index + size] for index in range(0, len(text), size))
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        [{"uuid": "a"}, 1, {"uuid": "b"}],
+        {"total": 12345, "data": [{"uuid": "a", "name": "Хост"}, {"uuid": "b"}]},
+        {"meta": {"data": [{"uuid": "skip"}]}, "data": {"count": 2, "objects": [{"uuid": "a"}, {"uuid": "b"}]}},
+        {"items": [{"uuid": "a", "nested": {"data": [1, 2]}}], "objects": [{"uuid": "ignored"}]},
+        {"message": "no items"},
+    ],
+)
+def test_iter_json_items_matches_extract_items_for_any_chunking(payload) -> None:
+    expected = SecurITMClient("https://example.test", "token")._extract_items(payload)
+
+    for size in (1, 3, 1024):
+        assert list(iter_json_items(_chunks(payload, size))) == expected
+
+
+def test_iter_json_items_stops_reading_after_early_exit() -> None:
+    consumed = []
+
+    def chunks():
+        for index in range(1000):
+            consumed.append(index)
+            yield ("[" if index == 0 else ",") + json.dumps({"uuid": f"task-{index}"})
+        yield "]"
+
+    first = next(iter_json_items(chunks()))
+
+    assert first == {"uuid": "task-0"}
+    assert len(consumed) <= 2
@@ -0,0 +1,103 @@
+# Тесты табличного движка правил ядра.
+from __future__ import annotations
+
+import pytest
+
+from securitm_audit_agent.checks.kernel_rules import build_kernel_checks, load_kernel_rules, parse_kernel_rule
+from securitm_audit_agent.core import AuditRunner, CheckRegistry, Status
+from securitm_audit_agent.plugins.met_rekom_linux import KERNEL_RULES_PATH
+from tests.helpers import FakeContext
+
+
+class CountingContext(FakeContext):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.reads: list[str] = []
+
+    def read_file(self, path: str):
+        self.reads.append(path)
+        return super().read_file(path)
+
+
+def _registry(rules) -> CheckRegistry:
+    registry = CheckRegistry()
+    for check in build_kernel_checks(rules):
+        registry.register(check)
+    return registry
+
+
+def test_bundled_kernel_rules_load() -> None:
+    rules = load_kernel_rules(KERNEL_RULES_PATH)
+    ids = [rule.check_id for rule in rules]
+
+    assert "met_2_4_1_kernel_dmesg_restrict" in ids
+    assert "met_2_5_3_debugfs" in ids
+    assert len(ids) == len(set(ids))
+
+
+def test_kernel_rules_read_each_source_once_per_run() -> None:
+    rules = [
+        parse_kernel_rule({"check_id": "a", "type": "sysctl", "key": "kernel.x", "expected": "1"}),
+        parse_kernel_rule({"check_id": "b", "type": "sysctl_min", "key": "kernel.x", "min": 2}),
+        parse_kernel_rule({"check_id": "c", "type": "cmdline", "key": "slab_nomerge"}),
+        parse_kernel_rule(
+            {"check_id": "d", "type": "cmdline_all", "expected": {"iommu": "force", "iommu.strict": "1"}}
+        ),
+        parse_kernel_rule({"check_id": "e", "type": "cmdline_any", "key": "debugfs", "values": ["off"]}),
+    ]
+    ctx = CountingContext(
+        files={
+            "/proc/sys/kernel/x": "1\n",
+            "/proc/cmdline": "ro slab_nomerge iommu=force debugfs=off\n",
+        }
+    )
+    runner = AuditRunner(_registry(rules))
+
+    report = runner.run(ctx, None, {})
+    statuses = {result.check_id: result.status for result in report.results}
+
+    assert statuses == {
+        "a": Status.OK,
+        "b": Status.FAIL,
+        "c": Status.OK,
+        "d": Status.FAIL,
+        "e": Status.OK,
+    }
+    assert sorted(ctx.reads) == ["/proc/cmdline", "/proc/sys/kernel/x"]
+
+    # Следующий прогон снимает новый снимок, а не отдаёт старые результаты.
+    ctx.files["/proc/sys/kernel/x"] = "5\n"
+    report = runner.run(ctx, ["b"], {})
+    assert report.results[0].status == Status.OK
+
+
+def test_kernel_rules_partial_run_does_not_leak_into_next_run() -> None:
+    rules = [
+        parse_kernel_rule({"check_id": "a", "type": "sysctl", "key": "kernel.x", "expected": "1"}),
+        parse_kernel_rule({"check_id": "b", "type": "sysctl", "key": "kernel.x", "expected": "1"}),
+    ]
+    ctx = FakeContext(files={"/proc/sys/kernel/x": "1\n"})
+    runner = AuditRunner(_registry(rules))
+
+    runner.run(ctx, ["a"], {})
+    ctx.files["/proc/sys/kernel/x"] = "0\n"
+    report = runner.run(ctx, ["b"], {})
+
+    assert report.results[0].status == Status.FAIL
+
+
+def test_kernel_rules_skip_when_source_not_readable() -> None:
+    rules = [
+        parse_kernel_rule({"check_id": "a", "type": "sysctl", "key": "kernel.x", "expected": "1"}),
+        parse_kernel_rule({"check_id": "b", "type": "cmdline", "key": "tsx", "expected": "off"}),
+    ]
+
+    report = AuditRunner(_registry(rules)).run(FakeContext(), None, {})
+
+    assert [result.status for result in report.results] == [Status.SKIP, Status.SKIP]
+    assert report.results[1].message == "/proc/cmdline not readable"
+
+
+def test_kernel_rule_rejects_unquoted_yaml_bool() -> None:
+    with pytest.raises(ValueError, match="quoted string"):
+        parse_kernel_rule({"check_id": "a", "type": "cmdline", "key": "tsx", "expected": False})
@@ -0,0 +1,106 @@
+# Тесты локального журнала задач SecurITM.
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from securitm_audit_agent.cli import _sync_fail_tasks
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.ledger import TaskLedger
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator
+
+TASKS_CFG = {"desc_template": "Host: {hostname}\nCheck: {check_id}"}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _report() -> AuditReport:
+    now = datetime.now(timezone.utc)
+    return AuditReport(
+        host={"hostname": "web-1"},
+        started_at=now,
+        finished_at=now,
+        agent_version="test",
+        results=[
+            AuditResult("ssh.root", Status.FAIL, "", None, "high", ""),
+            AuditResult("fs.tmp", Status.FAIL, "", None, "medium", ""),
+        ],
+    )
+
+
+def _task_calls(simulator: SecurITMSimulator) -> int:
+    return sum(count for endpoint, count in simulator.calls.items() if endpoint.startswith("tasks."))
+
+
+def _run(simulator: SecurITMSimulator, ledger: TaskLedger) -> None:
+    client = SecurITMClient(simulator.url, "token", ledger=ledger)
+    assert _sync_fail_tasks(client, _report(), TASKS_CFG, {"hostname": "web-1"}, "asset-1") == []
+    ledger.save()
+
+
+def test_rerun_with_same_fails_makes_no_task_calls(tmp_path) -> None:
+    path = str(tmp_path / "ledger.json")
+    clock = _Clock()
+    with SecurITMSimulator() as simulator:
+        _run(simulator, TaskLedger(path, clock=clock))
+        first_run_calls = _task_calls(simulator)
+
+        ledger = TaskLedger(path, clock=clock)
+        _run(simulator, ledger)
+
+        assert first_run_calls == 4
+        assert _task_calls(simulator) == first_run_calls
+        assert ledger.hits == 2
+
+        # Запись старше ttl перепроверяется поиском, но задача не создаётся заново.
+        clock.now += ledger.ttl_seconds
+        _run(simulator, TaskLedger(path, clock=clock))
+
+    assert simulator.calls["tasks.get"] == 4
+    assert simulator.calls["tasks.create"] == 2
+
+
+def test_reconcile_drops_closed_tasks(tmp_path) -> None:
+    path = str(tmp_path / "ledger.json")
+    clock = _Clock()
+    with SecurITMSimulator() as simulator:
+        _run(simulator, TaskLedger(path, clock=clock))
+        simulator.tasks[0]["is_done"] = 1
+
+        clock.now += TaskLedger(path).reconcile_seconds
+        ledger = TaskLedger(path, clock=clock)
+        assert ledger.reconcile_due()
+        removed = ledger.reconcile(SecurITMClient(simulator.url, "token"))
+        _run(simulator, ledger)
+
+    assert removed == 1
+    assert len(ledger) == 2
+    assert not ledger.reconcile_due()
+    # Закрытая задача создаётся заново, открытая берётся из журнала.
+    assert simulator.calls["tasks.create"] == 3
+    assert ledger.hits == 1
+
+
+def test_unreadable_ledger_starts_empty(tmp_path) -> None:
+    path = tmp_path / "ledger.json"
+    path.write_text("{broken", encoding="utf-8")
+
+    ledger = TaskLedger(str(path))
+
+    assert len(ledger) == 0
+
+
+def test_ledger_skips_tasks_without_uuid(tmp_path) -> None:
+    ledger = TaskLedger(str(tmp_path / "ledger.json"))
+
+    ledger.record("asset-1", "FAIL ssh.root", "web-1", {"name": "[FAIL] ssh.root"})
+
+    assert len(ledger) == 0
+    assert ledger.ttl_seconds == ledger.reconcile_seconds
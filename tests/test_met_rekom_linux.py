@@ -5,8 +5,13 @@ from securitm_audit_agent.core import Status
 from securitm_audit_agent.plugins.met_rekom_linux import (
     MetHomeDirsPermsCheck,
     MetPasswdGroupShadowPermsCheck,
+    MetRcServicePermsCheck,
+    MetRunningProcessPermsCheck,
+    MetSystemBinsPermsCheck,
+    MetSuidSgidPermsCheck,
     MetSystemCronPermsCheck,
 )
+from securitm_audit_agent.platform.fsscan import FsScanEngine
 from tests.helpers import FakeContext
 
 
@@ -71,3 +76,174 @@ def test_home_dirs_check_ignores_system_accounts() -> None:
     result = MetHomeDirsPermsCheck().check(ctx, {})
 
     assert result.status == Status.OK
+
+
+def test_rc_service_check_flags_other_writable_units() -> None:
+    ctx = FakeContext(
+        modes={
+            "/etc/systemd/system/good.service": 0o100644,
+            "/etc/systemd/system/bad.service": 0o100666,
+            "/etc/systemd/system/notes.txt": 0o100666,
+        },
+        directories={"/etc/systemd/system": ["good.service", "bad.service", "notes.txt"]},
+    )
+
+    result = MetRcServicePermsCheck().check(ctx, {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == "/etc/systemd/system/bad.service (0o666)"
+
+
+def test_system_bins_check_flags_writable_files_dirs_and_foreign_owner() -> None:
+    ctx = FakeContext(
+        directories={
+            "/": ["usr"],
+            "/usr": ["bin", "lib"],
+            "/usr/bin": ["ls", "tool"],
+            "/usr/lib": ["modules"],
+            "/usr/lib/modules": ["evil.ko"],
+        },
+        modes={
+            "/": 0o40755,
+            "/usr": 0o40755,
+            "/usr/bin": 0o40755,
+            "/usr/bin/ls": 0o100755,
+            "/usr/bin/tool": 0o100775,
+            "/usr/lib": 0o40755,
+            "/usr/lib/modules": 0o40777,
+            "/usr/lib/modules/evil.ko": 0o100644,
+        },
+        owners={"/usr/lib/modules/evil.ko": (1000, 1000)},
+    )
+
+    result = MetSystemBinsPermsCheck().check(ctx, {"workers": 2})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == (
+        "/usr/bin/tool (writable 0o775); "
+        "/usr/lib/modules (writable dir 0o777); "
+        "/usr/lib/modules/evil.ko (owner uid 1000)"
+    )
+
+
+def test_system_bins_check_passes_for_root_owned_readonly_tree() -> None:
+    ctx = FakeContext(
+        directories={"/": ["usr"], "/usr": ["bin"], "/usr/bin": ["ls"]},
+        modes={"/": 0o40755, "/usr": 0o40755, "/usr/bin": 0o40755, "/usr/bin/ls": 0o100755},
+    )
+
+    result = MetSystemBinsPermsCheck().check(ctx, {})
+
+    assert result.status == Status.OK
+
+
+class ScanCountingContext(FakeContext):
+    def __init__(self, devices=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.devices = devices or {}
+        self.scanned: list[str] = []
+
+    def stat(self, path: str):
+        result = super().stat(path)
+        if result is not None:
+            result.st_dev = next((dev for prefix, dev in self.devices.items() if path.startswith(prefix)), 0)
+        return result
+
+    def scan_dir(self, path: str, max_depth=0, follow_symlinks: bool = True):
+        self.scanned.append(path)
+        return super().scan_dir(path, max_depth, follow_symlinks)
+
+
+def _system_tree(**kwargs) -> ScanCountingContext:
+    return ScanCountingContext(
+        directories={"/": ["usr"], "/usr": ["bin"], "/usr/bin": ["ls", "passwd"]},
+        modes={
+            "/": 0o40755,
+            "/usr": 0o40755,
+            "/usr/bin": 0o40755,
+            "/usr/bin/ls": 0o100775,
+            "/usr/bin/passwd": 0o104777,
+        },
+        **kwargs,
+    )
+
+
+def test_system_bins_and_suid_checks_share_one_walk() -> None:
+    scanner = FsScanEngine()
+    bins, suid = MetSystemBinsPermsCheck(scanner), MetSuidSgidPermsCheck(scanner)
+    ctx = _system_tree()
+
+    bins_result = bins.check(ctx, {})
+    suid_result = suid.check(ctx, {})
+
+    assert bins_result.evidence == "/usr/bin/ls (writable 0o775); /usr/bin/passwd (writable 0o4777)"
+    assert suid_result.status == Status.FAIL
+    assert ctx.scanned.count("/usr/bin") == 1
+
+
+def test_system_bins_check_walks_separately_mounted_usr() -> None:
+    ctx = _system_tree(devices={"/usr": 1})
+
+    result = MetSystemBinsPermsCheck().check(ctx, {})
+
+    assert result.evidence == "/usr/bin/ls (writable 0o775); /usr/bin/passwd (writable 0o4777)"
+
+
+def test_system_bins_check_verifies_every_candidate_with_allowed_uids() -> None:
+    names = [f"tool{index}" for index in range(1500)]
+    ctx = ScanCountingContext(
+        directories={"/": ["usr"], "/usr": ["bin"], "/usr/bin": names},
+        modes={"/": 0o40755, "/usr": 0o40755, "/usr/bin": 0o40755, **{f"/usr/bin/{name}": 0o100755 for name in names}},
+        owners={f"/usr/bin/{name}": (2, 2) for name in names},
+    )
+    scanner = FsScanEngine(workers=2)
+    bins = MetSystemBinsPermsCheck(scanner)
+
+    # Все кандидаты общего обхода перепроверяются; предела буфера, после которого они считались бы нарушениями, нет.
+    assert bins.check(ctx, {"allowed_uids": [0, 2]}).status == Status.OK
+    ctx.run_id += 1
+    # Без root среди разрешённых владельцев корни обходятся напрямую.
+    assert bins.check(ctx, {"allowed_uids": [2]}).evidence == "/ (owner uid 0); /usr (owner uid 0); /usr/bin (owner uid 0)"
+
+
+class StatCountingContext(FakeContext):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.stat_calls: list[str] = []
+
+    def stat(self, path: str):
+        self.stat_calls.append(path)
+        return super().stat(path)
+
+
+def test_running_process_check_dedups_paths_before_stat() -> None:
+    maps = "\n".join(
+        [
+            "55c3cd620000-55c3cd626000 r-xp 00002000 fe:00 467394   /usr/bin/app",
+            "7f0000000000-7f0000001000 r-xp 00000000 fe:00 100      /usr/lib/libc.so.6",
+            "7f0000001000-7f0000002000 rw-p 00000000 fe:00 100      /usr/lib/libc.so.6",
+            "7ffd00000000-7ffd00001000 r-xp 00000000 00:00 0        [vdso]",
+        ]
+    )
+    ctx = StatCountingContext(
+        directories={"/proc": ["1", "2", "3", "self"]},
+        links={
+            "/proc/1/exe": "/usr/bin/app",
+            "/proc/1/cwd": "/tmp",
+            "/proc/2/exe": "/usr/bin/app",
+            "/proc/2/cwd": "/srv/shared",
+        },
+        files={"/proc/1/maps": maps, "/proc/2/maps": maps},
+        modes={
+            "/usr/bin/app": 0o100755,
+            "/usr/lib/libc.so.6": 0o100757,
+            "/tmp": 0o41777,
+            "/srv/shared": 0o40777,
+        },
+    )
+
+    result = MetRunningProcessPermsCheck().check(ctx, {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == "/usr/lib/libc.so.6 (0o757, pid 1); cwd /srv/shared (0o777, pid 2)"
+    assert sorted(ctx.stat_calls) == ["/srv/shared", "/tmp", "/usr/bin/app", "/usr/lib/libc.so.6"]
@@ -0,0 +1,148 @@
+# Тесты таблицы монтирования и проверок home-каталогов на autofs/NFS.
+from __future__ import annotations
+
+from securitm_audit_agent.core import Status
+from securitm_audit_agent.platform.mounts import parse_mountinfo
+from securitm_audit_agent.plugins.met_rekom_linux import MetHomeDirsPermsCheck, MetHomeFilesPermsCheck
+from tests.helpers import FakeContext
+
+MOUNTINFO = "\n".join(
+    [
+        "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw,errors=remount-ro",
+        "30 22 0:40 / /home rw,relatime shared:10 - autofs auto.home rw,fd=7,indirect",
+        "41 30 0:51 / /home/bob rw,relatime shared:21 - nfs4 nas:/export/bob rw,vers=4.2",
+        "45 22 8:2 / /srv/my\\040data rw,relatime - xfs /dev/sda2 rw",
+        "malformed line",
+    ]
+)
+
+
+def test_parse_mountinfo_finds_longest_prefix_mount() -> None:
+    table = parse_mountinfo(MOUNTINFO)
+
+    assert len(table.entries) == 4
+    assert table.find("/home/bob/.bashrc").fstype == "nfs4"
+    assert table.find("/home/alice").fstype == "autofs"
+    assert table.find("/srv/my data/file").source == "/dev/sda2"
+    assert table.find("/etc/passwd").mount_point == "/"
+    assert table.is_remote("/home/alice")
+    assert not table.is_remote("/root")
+    assert not parse_mountinfo("").is_remote("/home/alice")
+
+
+class CountingContext(FakeContext):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.touched: list[str] = []
+        self.listed: list[str] = []
+
+    def stat(self, path):
+        self.touched.append(path)
+        return super().stat(path)
+
+    def scan_dir(self, path, max_depth=0, follow_symlinks=True):
+        self.touched.append(path)
+        return super().scan_dir(path, max_depth, follow_symlinks)
+
+    def list_dir(self, path):
+        self.listed.append(path)
+        return super().list_dir(path)
+
+
+def _ctx() -> CountingContext:
+    return CountingContext(
+        files={
+            "/proc/self/mountinfo": MOUNTINFO,
+            "/etc/passwd": "\n".join(
+                [
+                    "root:x:0:0:root:/root:/bin/bash",
+                    "alice:x:1000:1000::/home/alice:/bin/bash",
+                    "bob:x:1001:1001::/home/bob:/bin/bash",
+                ]
+            ),
+        },
+        directories={"/": ["root"], "/root": [".bashrc", ".profile"], "/home": [], "/home/bob": [".bashrc"]},
+        modes={
+            "/root": 0o40755,
+            "/root/.bashrc": 0o100644,
+            "/root/.profile": 0o100600,
+            "/home/alice": 0o40777,
+            "/home/bob": 0o40700,
+            "/home/bob/.bashrc": 0o100666,
+        },
+    )
+
+
+def test_home_checks_skip_remote_homes_by_default() -> None:
+    ctx = _ctx()
+
+    files = MetHomeFilesPermsCheck().check(ctx, {})
+    dirs = MetHomeDirsPermsCheck().check(ctx, {})
+
+    assert files.status == Status.FAIL
+    assert files.message == "Home files have wide permissions (2 remote homes skipped)"
+    assert files.evidence == "root:/root/.bashrc (0o644)"
+    assert dirs.evidence == "root:/root (0o755)"
+    assert not [path for path in ctx.touched + ctx.listed if path.startswith("/home")]
+
+
+def test_home_checks_bound_remote_homes() -> None:
+    ctx = _ctx()
+
+    result = MetHomeDirsPermsCheck().check(ctx, {"max_remote_homes": 1})
+
+    assert result.message == "Home directories are too permissive (1 remote homes skipped)"
+    assert result.evidence == "root:/root (0o755); alice:/home/alice (0o777)"
+
+
+def test_home_checks_skip_when_every_home_is_remote() -> None:
+    ctx = _ctx()
+    ctx.files["/etc/passwd"] = "alice:x:1000:1000::/home/alice:/bin/bash"
+
+    files = MetHomeFilesPermsCheck().check(ctx, {})
+    dirs = MetHomeDirsPermsCheck().check(ctx, {})
+
+    assert (files.status, dirs.status) == (Status.SKIP, Status.SKIP)
+    assert dirs.message == "No home directories checked (1 remote homes skipped)"
+
+
+def test_home_dirs_check_stats_only_selected_homes() -> None:
+    ctx = CountingContext(
+        files={"/etc/passwd": "carol:x:1000:1000::/home/carol:/bin/bash\ndave:x:1001:1001::/home/dave:/bin/bash"},
+        directories={"/home": ["carol"] + [f"user{index}" for index in range(50)]},
+        modes={"/home/carol": 0o40750, **{f"/home/user{index}": 0o40700 for index in range(50)}},
+    )
+
+    result = MetHomeDirsPermsCheck().check(ctx, {})
+
+    assert result.evidence == "carol:/home/carol (0o750)"
+    assert ctx.touched == ["/home/carol"]
+
+
+def test_binfmt_misc_autofs_does_not_mark_table_remote() -> None:
+    table = parse_mountinfo(
+        "\n".join(
+            [
+                "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw",
+                "35 24 0:32 / /proc/sys/fs/binfmt_misc rw,relatime shared:13 - autofs systemd-1 rw,fd=29,direct",
+            ]
+        )
+    )
+
+    assert not table.has_remote
+    assert not table.is_remote("/home/alice")
+
+
+def test_home_files_check_stats_only_present_targets() -> None:
+    names = [".bashrc"] + [f"file{index}" for index in range(50)]
+    ctx = CountingContext(
+        files={"/etc/passwd": "carol:x:1000:1000::/home/carol:/bin/bash"},
+        directories={"/home/carol": names},
+        modes={"/home/carol/.bashrc": 0o100640, **{f"/home/carol/file{index}": 0o100644 for index in range(50)}},
+    )
+
+    result = MetHomeFilesPermsCheck().check(ctx, {})
+
+    assert result.evidence == "carol:/home/carol/.bashrc (0o640)"
+    assert ctx.listed == ["/home/carol"]
+    assert ctx.touched == ["/home/carol/.bashrc"]
@@ -0,0 +1,50 @@
+# Тесты платформенного контекста аудита.
+from __future__ import annotations
+
+import os
+
+from securitm_audit_agent.platform import AuditContext
+
+
+def test_scan_dir_returns_entries_with_stat(tmp_path) -> None:
+    (tmp_path / "b.service").write_text("x", encoding="utf-8")
+    (tmp_path / "a.service").write_text("x", encoding="utf-8")
+    os.chmod(tmp_path / "b.service", 0o666)
+    nested = tmp_path / "sub"
+    nested.mkdir()
+    (nested / "deep").mkdir()
+    (nested / "deep" / "file").write_text("x", encoding="utf-8")
+
+    ctx = AuditContext(agent_version="test")
+    entries = ctx.scan_dir(str(tmp_path))
+
+    assert [entry.name for entry in entries] == ["a.service", "b.service", "sub"]
+    assert entries[1].stat.st_mode & 0o777 == 0o666
+    assert entries[2].is_dir is True
+
+    recursive = ctx.scan_dir(str(tmp_path), max_depth=1)
+    assert [entry.path for entry in recursive][-1] == str(nested / "deep")
+
+    unlimited = ctx.scan_dir(str(tmp_path), max_depth=None)
+    assert unlimited[-1].path == str(nested / "deep" / "file")
+    assert unlimited[-1].depth == 2
+
+
+def test_scan_dir_returns_none_for_missing_directory(tmp_path) -> None:
+    ctx = AuditContext(agent_version="test")
+
+    assert ctx.scan_dir(str(tmp_path / "missing")) is None
+
+
+def test_iter_lines_and_read_bytes(tmp_path) -> None:
+    path = tmp_path / "passwd"
+    path.write_text("root:x:0:0::/root:/bin/bash\r\nuser:x:1000:1000::/home/user:/bin/sh", encoding="utf-8")
+    (tmp_path / "empty").write_bytes(b"")
+    ctx = AuditContext(agent_version="test")
+
+    assert list(ctx.iter_lines(str(path))) == ["root:x:0:0::/root:/bin/bash", "user:x:1000:1000::/home/user:/bin/sh"]
+    view = ctx.read_bytes(str(path))
+    assert view[:4] == b"root" and view.find(b"user:") > 0
+    assert ctx.read_bytes(str(tmp_path / "empty")) == b""
+    assert ctx.iter_lines(str(tmp_path / "missing")) is None
+    assert ctx.read_bytes(str(tmp_path)) is None
@@ -0,0 +1,92 @@
+# Тесты сверки задач SecurITM по отчётам всего парка.
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.reconcile import FleetReconciler, load_reports
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator
+
+SECURITM_CFG = {
+    "assets": {
+        "asset_type_slug": "computer",
+        "import_template": "computer",
+        "import_fields": {"name": "{hostname}"},
+    },
+    "tasks": {"desc_template": "Host: {hostname}\nCheck: {check_id}"},
+}
+
+
+def _report(hostname: str, statuses, finished_at=None) -> AuditReport:
+    now = finished_at or datetime.now(timezone.utc)
+    return AuditReport(
+        host={"hostname": hostname},
+        started_at=now,
+        finished_at=now,
+        agent_version="test",
+        results=[AuditResult(check_id, status, "", None, "high", "") for check_id, status in statuses.items()],
+    )
+
+
+def _open_task(simulator: SecurITMSimulator, hostname: str, check_id: str) -> dict:
+    return simulator.add_task({"name": f"[FAIL] {check_id}", "desc": f"Host: {hostname}\nCheck: {check_id}"})
+
+
+def test_reconcile_creates_closes_and_dedupes_tasks() -> None:
+    reports = [
+        _report("web-1", {"ssh.root": Status.FAIL, "fs.tmp": Status.OK, "pkg.updates": Status.FAIL}),
+        _report("web-2", {"ssh.root": Status.OK, "fs.tmp": Status.ERROR}),
+    ]
+    with SecurITMSimulator() as simulator:
+        kept = _open_task(simulator, "web-1", "pkg.updates")
+        duplicate = _open_task(simulator, "web-1", "pkg.updates")
+        fixed = _open_task(simulator, "web-1", "fs.tmp")
+        fixed_other = _open_task(simulator, "web-2", "ssh.root")
+        errored = _open_task(simulator, "web-2", "fs.tmp")
+        unreported = _open_task(simulator, "db-1", "ssh.root")
+        client = SecurITMClient(simulator.url, "token")
+
+        summary = FleetReconciler(client, SECURITM_CFG, concurrency=4).run(reports)
+
+        seeded = {task["uuid"] for task in (kept, duplicate, fixed, fixed_other, errored, unreported)}
+        open_uuids = {task["uuid"] for task in simulator.tasks if not task["is_done"]}
+        created = [task for task in simulator.tasks if task["uuid"] not in seeded]
+
+    assert summary["open_tasks"] == 6
+    assert (summary["create"], summary["close"], summary["duplicates"], summary["keep"]) == (1, 2, 1, 1)
+    assert (summary["created"], summary["closed"], summary["errors"]) == (1, 3, [])
+    assert [task["name"] for task in created] == ["[FAIL] ssh.root"]
+    assert open_uuids == {kept["uuid"], errored["uuid"], unreported["uuid"], created[0]["uuid"]}
+    assert simulator.calls["assets.import"] == 1
+
+
+def test_reconcile_dry_run_does_not_change_tasks() -> None:
+    with SecurITMSimulator() as simulator:
+        _open_task(simulator, "web-1", "fs.tmp")
+        client = SecurITMClient(simulator.url, "token")
+
+        summary = FleetReconciler(client, SECURITM_CFG).run(
+            [_report("web-1", {"fs.tmp": Status.OK, "ssh.root": Status.FAIL})], dry_run=True
+        )
+
+    assert (summary["create"], summary["close"]) == (1, 1)
+    assert "created" not in summary
+    assert simulator.calls["tasks.create"] == simulator.calls["tasks.update"] == 0
+    assert simulator.calls["assets.import"] == 0
+
+
+def test_load_reports_keeps_latest_report_per_host(tmp_path) -> None:
+    now = datetime.now(timezone.utc)
+    old = _report("Web-1", {"ssh.root": Status.FAIL}, finished_at=now - timedelta(days=1))
+    new = _report("web-1", {"ssh.root": Status.OK}, finished_at=now)
+    (tmp_path / "a.json").write_text(json.dumps(new.to_dict()), encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps(old.to_dict()), encoding="utf-8")
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+    reports = load_reports(str(tmp_path))
+
+    assert len(reports) == 1
+    assert reports[0].results[0].status == Status.OK
@@ -0,0 +1,116 @@
+# Тесты сравнения отчётов и синхронизации SecurITM по изменениям.
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from securitm_audit_agent.cli import _close_resolved_tasks, _sync_fail_tasks
+from securitm_audit_agent.core import Status, diff_reports
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator
+
+TASKS_CFG = {"desc_template": "Host: {hostname}\nCheck: {check_id}"}
+HOST = {"hostname": "web-1"}
+
+
+def _report(results, finished_at=None) -> AuditReport:
+    now = finished_at or datetime.now(timezone.utc)
+    return AuditReport(host=dict(HOST), started_at=now, finished_at=now, agent_version="test", results=results)
+
+
+def _result(check_id: str, status: Status, evidence=None) -> AuditResult:
+    return AuditResult(check_id, status, "", evidence, "high", "")
+
+
+def test_diff_reports_status_transitions_and_evidence_changes() -> None:
+    now = datetime.now(timezone.utc)
+    previous = _report(
+        [
+            _result("ssh.root", Status.OK),
+            _result("fs.tmp", Status.FAIL),
+            _result("pkg.updates", Status.FAIL, "3 packages"),
+            _result("cron.perms", Status.OK),
+            _result("legacy.check", Status.SKIP),
+        ],
+        finished_at=now - timedelta(days=1),
+    )
+    current = _report(
+        [
+            _result("ssh.root", Status.FAIL),
+            _result("fs.tmp", Status.OK),
+            _result("pkg.updates", Status.FAIL, "5 packages"),
+            _result("cron.perms", Status.OK),
+            _result("new.check", Status.FAIL),
+        ],
+        finished_at=now,
+    )
+
+    diff = diff_reports(previous, current)
+
+    transitions = {change.check_id: (change.kind, change.transition) for change in diff.changes}
+    assert transitions == {
+        "ssh.root": ("status", "OK->FAIL"),
+        "fs.tmp": ("status", "FAIL->OK"),
+        "pkg.updates": ("evidence", "FAIL->FAIL"),
+        "new.check": ("new", "-->FAIL"),
+        "legacy.check": ("removed", "SKIP->-"),
+    }
+    assert diff.summary() == {"new": 1, "removed": 1, "status": 2, "evidence": 1, "unchanged": 1}
+    assert [result.check_id for result in diff.new_failures()] == ["ssh.root", "new.check"]
+    assert [result.check_id for result in diff.resolved()] == ["fs.tmp"]
+    lines = [json.loads(line) for line in diff.iter_jsonl()]
+    assert lines[2]["previous_evidence"] == "3 packages" and lines[2]["result"]["evidence"] == "5 packages"
+    assert {line["hostname"] for line in lines} == {"web-1"}
+
+
+def test_diff_without_baseline_treats_all_results_as_new() -> None:
+    diff = diff_reports(None, _report([_result("ssh.root", Status.FAIL), _result("fs.tmp", Status.OK)]))
+
+    assert diff.previous_finished_at is None
+    assert diff.summary()["new"] == 2
+    assert [result.check_id for result in diff.new_failures()] == ["ssh.root"]
+
+
+def test_delta_sync_creates_new_failures_and_closes_fixed_checks() -> None:
+    previous = _report([_result("ssh.root", Status.OK), _result("fs.tmp", Status.FAIL)])
+    current = _report([_result("ssh.root", Status.FAIL), _result("fs.tmp", Status.OK)])
+    with SecurITMSimulator() as simulator:
+        open_task = simulator.add_task({"name": "[FAIL] fs.tmp", "desc": "Host: web-1\nCheck: fs.tmp"})
+        client = SecurITMClient(simulator.url, "token")
+        delta = diff_reports(previous, current)
+
+        failures = replace(current, results=delta.new_failures())
+        assert _sync_fail_tasks(client, failures, TASKS_CFG, HOST, None) == []
+        _close_resolved_tasks(client, delta.resolved(), TASKS_CFG, HOST, None)
+
+    assert open_task["is_done"] == 1
+    assert [task["name"] for task in simulator.tasks if not task["is_done"]] == ["[FAIL] ssh.root"]
+    assert (simulator.calls["tasks.create"], simulator.calls["tasks.update"]) == (1, 1)
+
+
+def test_close_resolved_tasks_matches_task_rendered_from_baseline_failure() -> None:
+    tasks_cfg = {"name_template": "[{status}] {check_id}: {message}", "desc_template": "Host: {hostname}\n{evidence}"}
+    previous = _report([AuditResult("fs.tmp", Status.FAIL, "noexec missing", "/tmp rw", "high", "")])
+    current = _report([AuditResult("fs.tmp", Status.OK, "all set", "/tmp noexec", "high", "")])
+    with SecurITMSimulator() as simulator:
+        open_task = simulator.add_task({"name": "[FAIL] fs.tmp: noexec missing", "desc": "Host: web-1\n/tmp rw"})
+        client = SecurITMClient(simulator.url, "token")
+        unsynced = _close_resolved_tasks(client, diff_reports(previous, current).resolved(), tasks_cfg, HOST, None)
+
+    assert unsynced == []
+    assert open_task["is_done"] == 1
+
+
+def test_close_resolved_tasks_returns_failed_closes() -> None:
+    class _FailingClient:
+        def close_open_task(self, payload):
+            raise RuntimeError("gateway 502")
+
+    resolved = [_result("fs.tmp", Status.FAIL)]
+    unsynced = _close_resolved_tasks(_FailingClient(), resolved, TASKS_CFG, HOST, None)
+
+    assert [(item["check_id"], item["action"], item["error"]) for item in unsynced] == [
+        ("fs.tmp", "close", "gateway 502")
+    ]
@@ -0,0 +1,73 @@
+# Тесты кеша и объединения GET-запросов клиента SecurITM.
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from securitm_audit_agent.integrations.cache import CacheEntry, ResponseCache, cache_key
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator, SimulatorProfile
+
+
+def test_cache_coalesces_inflight_requests_and_evicts_oldest() -> None:
+    cache = ResponseCache(max_entries=1)
+    release = threading.Event()
+    calls = []
+
+    def fetch(stale):
+        calls.append(stale)
+        release.wait(5)
+        return CacheEntry({"data": []}, None, 0.0)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_fetch, cache_key("https://x/a"), fetch) for _ in range(4)]
+        deadline = time.monotonic() + 5
+        while cache.stats["coalesced"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        sources = sorted(future.result()[1] for future in futures)
+
+    assert len(calls) == 1
+    assert sources == ["coalesced", "coalesced", "coalesced", "miss"]
+
+    cache.get_or_fetch(cache_key("https://x/b"), fetch)
+    assert cache.stats["evictions"] == 1
+    assert cache.get_or_fetch(cache_key("https://x/a"), fetch)[1] == "miss"
+
+
+def test_client_caches_task_pages_and_revalidates_with_etag() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=3, tasks=30)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        first = client.get_tasks(filters={"fields": [{"is_done": 0, "op": "eq"}]})
+        second = client.get_tasks(filters={"fields": [{"is_done": 0, "op": "eq"}]})
+        client.invalidate_cache()
+        third = client.get_tasks(filters={"fields": [{"is_done": 0, "op": "eq"}]})
+        client.create_task({"name": "[FAIL] new", "desc": "Host: host-00000"})
+        fourth = client.get_tasks(filters={"fields": [{"is_done": 0, "op": "eq"}]})
+
+    assert first == second == third
+    assert len(fourth) == len(first) + 1
+    assert simulator.calls["tasks.get"] == 3
+    assert simulator.calls["not_modified"] == 1
+    assert client.cache_metrics()["hits"] == 1
+    assert client.cache_metrics()["revalidated"] == 1
+
+
+def test_asset_listing_is_cached_only_on_request() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=100)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        created = client.ensure_asset("computer", "name", "Agents", {"name": "new-host"}, "new-host")
+        existing = client.ensure_asset("computer", "name", "Agents", {"name": "host-00001"}, "host-00001")
+        cached = client.get_assets("computer", cache=True)
+        again = client.get_assets("computer", cache=True)
+
+    assert created["name"] == "new-host"
+    assert existing["uuid"] == "asset-2"
+    assert cached == again and len(cached) == 101
+    # Поиск актива читает выгрузку потоком без буфера кеша; кешируется только выгрузка с cache=True.
+    assert simulator.calls["assets.get"] == 3 + 1
+    assert simulator.calls["assets.import"] == 1
+    assert client.cache_metrics()["hits"] == 1
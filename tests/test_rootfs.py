@@ -0,0 +1,80 @@
+# Тесты офлайн-аудита смонтированного rootfs.
+from __future__ import annotations
+
+import json
+import os
+
+from securitm_audit_agent.cli import _audit_offline, _run_offline_batch
+from securitm_audit_agent.platform.rootfs import RootfsAuditContext
+
+
+def _make_rootfs(base, hostname: str = "golden") -> str:
+    root = base / "rootfs"
+    (root / "etc").mkdir(parents=True)
+    (root / "usr" / "lib").mkdir(parents=True)
+    (root / "etc" / "hostname").write_text(f"{hostname}\n", encoding="utf-8")
+    (root / "usr" / "lib" / "os-release").write_text('ID="alpine"\n', encoding="utf-8")
+    (root / "etc" / "sudoers").write_text("deploy ALL = ALL\n", encoding="utf-8")
+    os.symlink("/usr/lib/os-release", root / "etc" / "os-release")
+    os.symlink("../../../../etc/hostname", root / "usr" / "lib" / "up")
+    return str(root)
+
+
+def test_rootfs_context_resolves_symlinks_inside_root(tmp_path) -> None:
+    outside = tmp_path / "secret"
+    outside.write_text("host data", encoding="utf-8")
+    root = _make_rootfs(tmp_path)
+    os.symlink(str(outside), os.path.join(root, "etc", "escape"))
+
+    ctx = RootfsAuditContext(root, "test")
+
+    assert ctx.read_file("/etc/os-release") == 'ID="alpine"\n'
+    assert ctx.read_file("/usr/lib/up") == "golden\n"
+    assert ctx.read_file("/etc/escape") is None
+    assert ctx.read_link("/etc/os-release") == "/usr/lib/os-release"
+    entries = {entry.path: entry for entry in ctx.scan_dir("/etc")}
+    assert entries["/etc/os-release"].is_symlink is True
+    assert entries["/etc/os-release"].stat.st_size == len('ID="alpine"\n')
+    assert entries["/etc/escape"].stat is None
+
+
+def test_rootfs_context_uses_supplied_host_values(tmp_path) -> None:
+    ctx = RootfsAuditContext(_make_rootfs(tmp_path), "test", {"/proc/sys/kernel/kptr_restrict": 2})
+
+    assert ctx.read_file("/proc/sys/kernel/kptr_restrict") == "2"
+    assert ctx.read_file("/proc/cmdline") is None
+    assert ctx.list_dir("/proc") is None
+    assert ctx.run_cmd(["id"]).returncode == 127
+    assert ctx.host_facts["hostname"] == "golden"
+    assert ctx.host_facts["os_release"] == {"ID": "alpine"}
+    assert ctx.host_facts["facts_sources"]["ip"] == "unavailable (offline)"
+
+
+CONFIG = {
+    "audit": {
+        "checks": {"builtin": False, "enabled": ["met_2_2_2_sudo_restrictions", "met_2_4_1_kernel_dmesg_restrict"]},
+        "plugins": ["securitm_audit_agent.plugins.met_rekom_linux"],
+        "offline": {"host_values": {"/proc/sys/kernel/dmesg_restrict": "1"}},
+    }
+}
+
+
+def test_audit_offline_writes_report_and_summary(tmp_path) -> None:
+    root = _make_rootfs(tmp_path)
+
+    summary = _audit_offline(CONFIG, root, str(tmp_path))
+
+    report = json.loads(open(summary["report"], encoding="utf-8").read())
+    assert summary["FAIL"] == 1 and summary["OK"] == 1
+    assert report["host"]["hostname"] == "golden"
+    assert [item["status"] for item in report["results"]] == ["FAIL", "OK"]
+
+
+def test_rootfs_batch_counts_failed_roots(tmp_path, capsys) -> None:
+    good = _make_rootfs(tmp_path / "one")
+
+    failed = _run_offline_batch(CONFIG, [good, str(tmp_path / "missing")], 2, str(tmp_path / "out"))
+
+    assert failed == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["root"] for line in lines] == [good]
@@ -0,0 +1,90 @@
+# Тесты локальной истории прогонов аудита в SQLite.
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from securitm_audit_agent.core import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.reporting.history import RunHistory
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _report(day: int, statuses, durations=None, hostname: str = "web-1") -> AuditReport:
+    moment = START + timedelta(days=day)
+    results = [
+        AuditResult(check_id, status, "", evidence, "high", "", (durations or {}).get(check_id))
+        for check_id, (status, evidence) in statuses.items()
+    ]
+    return AuditReport(
+        host={"hostname": hostname}, started_at=moment, finished_at=moment, agent_version="t", results=results
+    )
+
+
+def test_last_change_tracks_status_and_evidence_transitions(tmp_path) -> None:
+    with RunHistory(str(tmp_path / "history.db")) as history:
+        history.record(_report(0, {"ssh.root": (Status.OK, None), "pkg": (Status.FAIL, "a")}))
+        history.record(_report(1, {"ssh.root": (Status.FAIL, None), "pkg": (Status.FAIL, "a")}))
+        history.record(_report(2, {"ssh.root": (Status.FAIL, None), "pkg": (Status.FAIL, "b")}))
+        history.record(_report(3, {"ssh.root": (Status.FAIL, None), "pkg": (Status.FAIL, "b")}))
+        history.record(_report(3, {"ssh.root": (Status.OK, None)}, hostname="web-2"))
+
+        ssh = history.last_change("web-1", "ssh.root")
+        pkg = history.last_change("web-1", "pkg")
+        trend = history.status_history("web-1", "ssh.root", limit=2)
+
+    assert ssh == {"finished_at": (START + timedelta(days=1)).isoformat(), "status": "FAIL", "previous_status": "OK"}
+    assert pkg is not None and pkg["finished_at"] == (START + timedelta(days=2)).isoformat()
+    assert [(item["status"], item["changed"]) for item in trend] == [("FAIL", False), ("FAIL", False)]
+
+
+def test_duration_percentile_over_period(tmp_path) -> None:
+    now = (START + timedelta(days=40)).timestamp()
+    with RunHistory(str(tmp_path / "history.db")) as history:
+        for day in range(40):
+            history.record(_report(day, {"fs.scan": (Status.OK, None)}, {"fs.scan": float(day)}))
+
+        p95 = history.duration_percentile("fs.scan", 95, days=10, now=now)
+        p50_all = history.duration_percentile("fs.scan", 50, days=100, now=now)
+        missing = history.duration_percentile("other", now=now)
+
+    # За 10 дней — длительности 30..39; p95 по ближайшему рангу — 10-е значение.
+    assert p95 == 39.0
+    assert p50_all == 19.0
+    assert missing is None
+
+
+def test_prune_compacts_unchanged_rows_and_applies_retention(tmp_path) -> None:
+    with RunHistory(str(tmp_path / "history.db")) as history:
+        for day in range(10):
+            status = Status.FAIL if day == 5 else Status.OK
+            history.record(_report(day, {"ssh.root": (status, None)}))
+        now = (START + timedelta(days=10)).timestamp()
+
+        removed = history.prune(retain_days=8, compact_after_days=4, now=now)
+        trend = history.status_history("web-1", "ssh.root", limit=100)
+        change = history.last_change("web-1", "ssh.root")
+
+    # Старше 8 дней (дни 0-1) удалены целиком, из дней 2-5 остались только изменения (5).
+    assert removed["runs"] == 2
+    assert [item["finished_at"][:10] for item in trend] == [
+        "2026-01-10", "2026-01-09", "2026-01-08", "2026-01-07", "2026-01-06"
+    ]
+    assert change is not None and change["finished_at"][:10] == "2026-01-07"
+
+
+
+def test_duration_percentile_ignores_compacted_history(tmp_path) -> None:
+    now = (START + timedelta(days=20)).timestamp()
+    with RunHistory(str(tmp_path / "history.db")) as history:
+        for day in range(20):
+            status = Status.FAIL if day in (2, 3) else Status.OK
+            history.record(_report(day, {"fs.scan": (status, None)}, {"fs.scan": 100.0 if day < 10 else 1.0}))
+
+        history.prune(compact_after_days=10, now=now)
+        p90 = history.duration_percentile("fs.scan", 90, days=30, now=now)
+        compacted_before = history.compacted_before()
+
+    # Оставшиеся после сжатия строки изменений (дни 0, 2, 4 по 100 с) не смещают перцентиль.
+    assert p90 == 1.0
+    assert compacted_before == (START + timedelta(days=10)).timestamp()
@@ -4,6 +4,7 @@ from __future__ import annotations
 import requests
 
 from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator, SimulatorProfile
 
 
 def test_create_task_if_missing_returns_created_marker_when_response_empty(monkeypatch) -> None:
@@ -100,7 +101,7 @@ def test_find_open_task_accepts_filtered_result_and_matches_host_from_desc(monke
             ]
         return []
 
-    monkeypatch.setattr(client, "get_tasks", _get_tasks)
+    monkeypatch.setattr(client, "get_task_page", lambda *args: (_get_tasks(*args), None, None))
 
     task = client.find_open_task("[FAIL] check", host_name="kalipurple")
 
@@ -122,7 +123,7 @@ def test_find_open_task_uses_name_and_status_filters_without_asset(monkeypatch)
         calls.append({"filters": filters, "page": page, "per_page": per_page})
         return [{"uuid": "task-existing", "name": "[FAIL] check", "is_done": False}]
 
-    monkeypatch.setattr(client, "get_tasks", _get_tasks)
+    monkeypatch.setattr(client, "get_task_page", lambda *args: (_get_tasks(*args), None, None))
 
     task = client.find_open_task("[FAIL] check", host_name=None)
 
@@ -197,12 +198,12 @@ def test_find_asset_by_name_requests_minimal_fields(monkeypatch) -> None:
     client = SecurITMClient(base_url="https://example.test", token="token")
     captured = {}
 
-    def _get_assets(asset_type_slug, fields=None):
+    def _iter_assets(asset_type_slug, fields=None):
         captured["asset_type_slug"] = asset_type_slug
         captured["fields"] = fields
-        return [{"uuid": "asset-1", "Hostname": "host-1"}]
+        return iter([{"uuid": "asset-1", "Hostname": "host-1"}])
 
-    monkeypatch.setattr(client, "get_assets", _get_assets)
+    monkeypatch.setattr(client, "iter_assets", _iter_assets)
 
     asset = client.find_asset_by_name("computer-1", "host-1", name_field="Hostname")
 
@@ -319,3 +320,48 @@ def test_create_task_reposts_after_redirect(monkeypatch) -> None:
         "https://example.test/api/v2/tasks/create",
         "https://example.test/api/v2/tasks/",
     ]
+
+
+def test_find_open_task_searches_beyond_first_page() -> None:
+    with SecurITMSimulator() as simulator:
+        for index in range(250):
+            simulator.add_task({"name": "[FAIL] check", "desc": f"Host: host-{index}"})
+        client = SecurITMClient(simulator.url, "token")
+
+        task = client.find_open_task("[FAIL] check", host_name="host-230")
+
+    assert task is not None and task["desc"] == "Host: host-230"
+    assert simulator.calls["tasks.get"] == 3
+
+
+def test_iter_tasks_prefetch_returns_all_pages_in_order() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=10, tasks=450)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        sequential = [task["uuid"] for task in client.iter_tasks(per_page=100)]
+        prefetched = [task["uuid"] for task in client.iter_tasks(per_page=100, prefetch=3)]
+        first_page_only = [task["uuid"] for _, task in zip(range(50), client.iter_tasks(per_page=100))]
+
+    assert sequential == prefetched == [f"task-{index}" for index in range(1, 451)]
+    assert len(first_page_only) == 50
+
+
+def test_iter_tasks_reads_past_short_pages_when_server_caps_per_page() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=10, tasks=450, max_per_page=40)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        sequential = [task["uuid"] for task in client.iter_tasks(per_page=100)]
+        prefetched = [task["uuid"] for task in client.iter_tasks(per_page=100, prefetch=3)]
+
+    assert sequential == prefetched == [f"task-{index}" for index in range(1, 451)]
+
+
+def test_iter_assets_streams_until_match() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=5000)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        asset = client.find_asset_by_name("computer", "HOST-00010")
+        assets = client.get_assets("computer")
+
+    assert asset == {"uuid": "asset-11", "name": "host-00010"}
+    assert len(assets) == 5000
@@ -0,0 +1,57 @@
+# Тесты симулятора API SecurITM и нагрузочного драйвера синхронизации.
+from __future__ import annotations
+
+import pytest
+import requests
+
+from securitm_audit_agent.integrations.securitm import SecurITMClient
+from securitm_audit_agent.integrations.simulator import SecurITMSimulator, SimulatorProfile
+from securitm_audit_agent.loadtest import percentile, run_load_test
+
+
+def test_simulator_dataset_and_open_task_lookup() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=10, tasks=100)) as simulator:
+        client = SecurITMClient(simulator.url, "token")
+
+        assert client.find_asset_by_name("computer", "host-00003")["uuid"] == "asset-4"
+        # Задача 0 (host-00000, check_0) открыта, задача 1 (host-00001, check_0) закрыта.
+        assert client.find_open_task("[FAIL] check_0", host_name="host-00000") is not None
+        assert client.find_open_task("[FAIL] check_0", host_name="host-00001") is None
+
+
+def test_simulator_redirects_task_creation_and_throttles() -> None:
+    with SecurITMSimulator(SimulatorProfile(redirect_task_create=True)) as simulator:
+        task = SecurITMClient(simulator.url, "token").create_task({"name": "[FAIL] x"})
+
+    assert task["name"] == "[FAIL] x"
+    assert simulator.calls["tasks.create.redirect"] == 1
+    assert simulator.calls["tasks.create"] == 1
+
+    with SecurITMSimulator(SimulatorProfile(throttle_rate=1.0, retry_after=7, tasks=5)) as simulator:
+        with pytest.raises(requests.HTTPError) as excinfo:
+            SecurITMClient(simulator.url, "token").get_tasks()
+
+    assert excinfo.value.response.status_code == 429
+    assert excinfo.value.response.headers["Retry-After"] == "7"
+    assert len(simulator.tasks) == 5
+
+
+def test_load_test_counts_calls_per_host_sync() -> None:
+    with SecurITMSimulator(SimulatorProfile(assets=2, tasks=4)) as simulator:
+        result = run_load_test(simulator.url, hosts=3, concurrency=3, fails_per_host=2).to_dict()
+
+    # host-00002 импортируется (GET, import, GET), остальные уже есть; на задачу — поиск и создание.
+    assert result["hosts"] == 3
+    assert result["failed_syncs"] == 0
+    assert result["endpoints"]["POST /api/v1/assets/import"] == 1
+    assert result["calls_per_sync_max"] == 3 + 2 * 2
+    assert result["requests"] == sum(result["endpoints"].values())
+    assert result["status_codes"] == {"200": result["requests"]}
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
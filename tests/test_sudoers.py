@@ -0,0 +1,150 @@
+# Тесты разбора sudoers и проверок sudo.
+from __future__ import annotations
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from securitm_audit_agent.core import Status
+from securitm_audit_agent.platform import sudoers
+from securitm_audit_agent.platform.sudoers import compile_sudoers
+from securitm_audit_agent.plugins.met_rekom_linux import MetSudoExecPermsCheck, MetSudoRestrictionsCheck
+from tests.helpers import FakeContext
+
+SUDOERS = "\n".join(
+    [
+        "Defaults env_reset",
+        "User_Alias ADMINS = alice, %wheel",
+        "Cmnd_Alias BACKUP = /usr/local/bin/backup, \\",
+        "    /usr/bin/rsync",
+        "Cmnd_Alias SHELLS = /bin/sh : NOLOGIN = /bin/false",
+        "root ALL=(ALL:ALL) ALL",
+        "ADMINS ALL = (root) NOPASSWD: BACKUP, !SHELLS  # comment",
+        "#1000 ALL = /usr/bin/id",
+        "@includedir /etc/sudoers.d",
+    ]
+)
+
+
+def _ctx(**kwargs) -> FakeContext:
+    files = {
+        "/etc/sudoers": SUDOERS,
+        "/etc/sudoers.d/deploy": "deploy web1, web2 = (www-data) /srv/app/deploy.sh --now\n#include extra\n",
+        "/etc/sudoers.d/extra": "bob ALL = NOPASSWD:ALL\n",
+        "/etc/sudoers.d/skip.bak": "mallory ALL = ALL\n",
+    }
+    return FakeContext(
+        files=files,
+        directories={"/etc/sudoers.d": ["deploy", "extra", "skip.bak"]},
+        **kwargs,
+    )
+
+
+def test_compile_sudoers_expands_aliases_includes_and_continuations() -> None:
+    policy = compile_sudoers(_ctx())
+
+    assert policy is not None
+    assert policy.files == ("/etc/sudoers", "/etc/sudoers.d/deploy", "/etc/sudoers.d/extra")
+    assert policy.commands_for("alice") == ["/usr/local/bin/backup", "/usr/bin/rsync"]
+    assert policy.commands_for("%wheel") == policy.commands_for("alice")
+    assert policy.commands_for("#1000") == ["/usr/bin/id"]
+    assert policy.commands_for("bob") == ["ALL"]
+    assert "mallory" not in policy.by_user
+
+    deploy = policy.by_user["deploy"][0]
+    assert deploy.hosts == ("web1", "web2")
+    assert deploy.runas == ("www-data",)
+    assert deploy.executable == "/srv/app/deploy.sh"
+    backup = policy.by_user["alice"][0]
+    assert backup.tags == frozenset({"NOPASSWD"})
+    assert backup.line_no == 7
+    negated = [rule.command for rule in policy.by_user["alice"] if rule.negated]
+    assert negated == ["/bin/sh"]
+
+
+def test_compile_sudoers_is_cached_by_file_stats(monkeypatch) -> None:
+    monkeypatch.setattr(sudoers, "_POLICY_CACHE", OrderedDict())
+
+    class MtimeContext(FakeContext):
+        mtime = 1
+        reads = 0
+
+        def stat(self, path):
+            return SimpleNamespace(st_mode=0o100440, st_dev=1, st_ino=len(path), st_mtime_ns=self.mtime, st_size=1)
+
+        def read_file(self, path):
+            self.reads += 1
+            return super().read_file(path)
+
+    ctx = MtimeContext(files={"/etc/sudoers": "root ALL = ALL\n"})
+
+    first = compile_sudoers(ctx)
+    second = compile_sudoers(ctx)
+    ctx.mtime = 2
+    third = compile_sudoers(ctx)
+
+    assert first is second
+    assert third is not first
+    assert ctx.reads == 2
+
+
+def test_policy_cache_is_bounded_and_keeps_other_roots(monkeypatch) -> None:
+    monkeypatch.setattr(sudoers, "_POLICY_CACHE", OrderedDict())
+    monkeypatch.setattr(sudoers, "POLICY_CACHE_MAX_ENTRIES", 2)
+
+    class DeviceContext(FakeContext):
+        def __init__(self, device: int) -> None:
+            super().__init__(files={"/etc/sudoers": "root ALL = ALL\n"})
+            self.device = device
+            self.reads = 0
+
+        def stat(self, path):
+            return SimpleNamespace(st_mode=0o100440, st_dev=self.device, st_ino=1, st_mtime_ns=1, st_size=1)
+
+        def read_file(self, path):
+            self.reads += 1
+            return super().read_file(path)
+
+    first, second, third = DeviceContext(1), DeviceContext(2), DeviceContext(3)
+
+    # Один путь в контекстах разных корней: записи не вытесняют друг друга, пока есть место.
+    policy = compile_sudoers(first)
+    compile_sudoers(second)
+    assert compile_sudoers(first) is policy
+    compile_sudoers(third)
+
+    assert len(sudoers._POLICY_CACHE) == 2
+    assert first.reads == 1
+    compile_sudoers(second)
+    assert second.reads == 2
+
+
+def test_sudo_restrictions_check_flags_all_command_rules() -> None:
+    result = MetSudoRestrictionsCheck().check(_ctx(), {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == "/etc/sudoers: root ALL=(ALL:ALL) ALL; /etc/sudoers.d/extra: bob ALL = NOPASSWD:ALL"
+
+
+def test_sudo_exec_check_flags_foreign_owner_and_writable_files() -> None:
+    ctx = _ctx(
+        modes={
+            "/usr/local/bin/backup": 0o100775,
+            "/usr/bin/rsync": 0o100755,
+            "/usr/bin/id": 0o100755,
+            "/srv/app/deploy.sh": 0o100755,
+        },
+        owners={"/srv/app/deploy.sh": (33, 33)},
+    )
+
+    result = MetSudoExecPermsCheck().check(ctx, {})
+
+    assert result.status == Status.FAIL
+    assert result.evidence == (
+        "/srv/app/deploy.sh (uid 33, /etc/sudoers.d/deploy:1); "
+        "/usr/local/bin/backup (0o775, /etc/sudoers:7)"
+    )
+
+
+def test_sudo_checks_skip_when_sudoers_unreadable() -> None:
+    assert MetSudoExecPermsCheck().check(FakeContext(), {}).status == Status.SKIP
+    assert MetSudoRestrictionsCheck().check(FakeContext(), {}).status == Status.SKIP
@@ -0,0 +1,86 @@
+# Тесты хранилища результатов аудита парка.
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from securitm_audit_agent.core.base import Status
+from securitm_audit_agent.core.report import AuditReport, AuditResult
+from securitm_audit_agent.reporting.warehouse import ResultsWarehouse, iter_report_files
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+OS_RELEASES = {
+    "debian": {"ID": "debian", "VERSION_ID": "12"},
+    "astra": {"ID": "astra", "VERSION_ID": "1.7"},
+}
+
+
+def _write(path, hostname: str, os_name: str, statuses, days_ago: int = 0) -> None:
+    moment = NOW - timedelta(days=days_ago)
+    report = AuditReport(
+        host={"hostname": hostname, "os_release": OS_RELEASES[os_name]},
+        started_at=moment,
+        finished_at=moment,
+        agent_version="test",
+        results=[
+            AuditResult(check_id, status, "", None, severity, f"fix {check_id}")
+            for check_id, (status, severity) in statuses.items()
+        ],
+    )
+    path.write_text(json.dumps(report.to_dict()), encoding="utf-8")
+
+
+def _fleet(tmp_path):
+    reports = tmp_path / "reports"
+    (reports / "day1").mkdir(parents=True)
+    (reports / "day2").mkdir()
+    high_fail, high_ok = (Status.FAIL, "high"), (Status.OK, "high")
+    # Старый отчёт web-1 с FAIL по fs.tmp заменяется более свежим.
+    _write(reports / "day1" / "web-1.json", "web-1", "debian", {"ssh.root": high_fail, "fs.tmp": high_fail}, 1)
+    _write(reports / "day2" / "web-1.json", "web-1", "debian", {"ssh.root": high_fail, "fs.tmp": high_ok})
+    _write(reports / "day2" / "web-2.json", "web-2", "debian", {"ssh.root": high_ok, "fs.tmp": high_ok})
+    _write(
+        reports / "day2" / "db-1.json",
+        "db-1",
+        "astra",
+        {"ssh.root": high_fail, "fs.tmp": (Status.SKIP, "medium"), "pkg": (Status.FAIL, "low")},
+    )
+    (reports / "day2" / "broken.json").write_text("{", encoding="utf-8")
+    return reports
+
+
+def test_ingest_and_query_latest_report_per_host(tmp_path) -> None:
+    reports = _fleet(tmp_path)
+    with ResultsWarehouse(str(tmp_path / "warehouse.db")) as warehouse:
+        summary = warehouse.ingest(iter_report_files([str(reports)]), batch_size=2)
+
+        per_check = warehouse.failing_hosts()
+        ssh_hosts = warehouse.failing_hosts("ssh.root")
+        severity = warehouse.severity_breakdown()
+        compliance = warehouse.compliance_by_os()
+
+    assert summary == {"ingested": 4, "duplicates": 0, "errors": 1}
+    assert per_check == [{"check_id": "ssh.root", "failing_hosts": 2}, {"check_id": "pkg", "failing_hosts": 1}]
+    assert ssh_hosts == [{"hostname": "db-1"}, {"hostname": "web-1"}]
+    assert severity[0] == {"severity": "high", "OK": 3, "FAIL": 2, "ERROR": 0, "SKIP": 0}
+    assert compliance == [
+        {"os_release": "astra 1.7", "hosts": 1, "ok": 0, "fail": 2, "compliance_pct": 0.0},
+        {"os_release": "debian 12", "hosts": 2, "ok": 3, "fail": 1, "compliance_pct": 75.0},
+    ]
+
+
+def test_reingest_skips_loaded_reports_and_keeps_dictionaries_compact(tmp_path) -> None:
+    reports = _fleet(tmp_path)
+    path = str(tmp_path / "warehouse.db")
+    with ResultsWarehouse(path) as warehouse:
+        warehouse.ingest(iter_report_files([str(reports)]))
+    with ResultsWarehouse(path) as warehouse:
+        summary = warehouse.ingest(iter_report_files([str(reports / "day1"), str(reports / "day2" / "web-2.json")]))
+        checks = warehouse._conn.execute("SELECT COUNT(*) FROM checks").fetchone()[0]
+        remediations = warehouse._conn.execute("SELECT COUNT(*) FROM remediations").fetchone()[0]
+        rows = warehouse._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        per_check = warehouse.failing_hosts()
+
+    assert summary == {"ingested": 0, "duplicates": 2, "errors": 0}
+    assert (checks, remediations, rows) == (3, 3, 9)
+    assert per_check[0] == {"check_id": "ssh.root", "failing_hosts": 2}